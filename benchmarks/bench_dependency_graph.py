@@ -0,0 +1,84 @@
+"""
+Benchmarks `DependencyGraph` on large synthetic graphs.
+
+Usage: python benchmarks/bench_dependency_graph.py [NODES]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src-v2"))
+
+from zs.dependency_graph import DependencyGraph
+from zs.processing import State
+
+
+def layered(nodes: int, fan_out: int = 4, seed: int = 0) -> DependencyGraph[int]:
+    """Random DAG, every node depends on up to `fan_out` earlier nodes (with repeated edges)."""
+    rng = random.Random(seed)
+    graph = DependencyGraph[int]()
+    for node in range(nodes):
+        graph.add(node, *(rng.randrange(node) for _ in range(fan_out if node else 0)))
+    return graph
+
+
+def chain(nodes: int) -> DependencyGraph[int]:
+    """A single dependency chain, as deep as the graph is large."""
+    graph = DependencyGraph[int]()
+    for node in range(1, nodes):
+        graph.add(node, node - 1)
+    return graph
+
+
+def cyclic(nodes: int, cycle_every: int = 1000) -> DependencyGraph[int]:
+    """A chain with a back edge every `cycle_every` nodes."""
+    graph = chain(nodes)
+    for node in range(cycle_every, nodes, cycle_every):
+        graph.add(node - cycle_every + 1, node)
+    return graph
+
+
+def bench(name: str, build):
+    start = time.perf_counter()
+    graph = build()
+    built = time.perf_counter()
+    state = State()
+    order = graph.get_dependency_order(state)
+    done = time.perf_counter()
+    print(
+        f"{name:<10} build {1000 * (built - start):8.1f} ms   "
+        f"order {1000 * (done - built):8.1f} ms   "
+        f"levels {len(order):>7}   cycles {len(state.messages):>4}"
+    )
+
+
+def bench_update(name: str, build, changes: int = 100):
+    graph = build()
+    graph.get_dependency_order(State())
+    items = list(graph.levels)
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    relevelled = 0
+    for _ in range(changes):
+        graph.mark_dirty(items[rng.randrange(len(items))])
+        relevelled += sum(map(len, graph.update(State())))
+    done = time.perf_counter()
+    print(
+        f"{name:<10} update {1000 * (done - start) / changes:7.2f} ms   "
+        f"relevelled {relevelled // changes:>7} items per change"
+    )
+
+
+def main(nodes: int = 100_000):
+    print(f"DependencyGraph with {nodes} nodes")
+    bench("layered", lambda: layered(nodes))
+    bench("chain", lambda: chain(nodes))
+    bench("cyclic", lambda: cyclic(nodes))
+    bench_update("layered", lambda: layered(nodes))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
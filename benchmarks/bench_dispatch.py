@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of overload dispatch in a method group of mixed native and Z# overloads.
+
+Usage: python benchmarks/bench_dispatch.py [OVERLOADS] [CALLS]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src-v2"))
+
+from zs import Object
+from zs.base import NativeFunction
+from zs.std.objects.function import Function
+from zs.std.objects.type import MethodGroup
+
+
+def _function(arity: int) -> Function:
+    function = Function(f"zs{arity}")
+    for i in range(arity):
+        function.add_parameter(f"p{i}", None)
+    return function
+
+
+def _native(arity: int) -> NativeFunction:
+    namespace = {}
+    exec(f"def native{arity}({', '.join(f'p{i}' for i in range(arity))}): ...", namespace)
+    return NativeFunction(namespace[f"native{arity}"])
+
+
+def group(overloads: int) -> MethodGroup:
+    # Z# overloads take an even number of parameters, natives an odd one
+    return MethodGroup("f", *(
+        _function(arity) if arity % 2 == 0 else _native(arity) for arity in range(overloads)
+    ))
+
+
+def bench(name: str, fn, calls: int):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {1_000_000 * elapsed / calls:9.2f} us/call")
+
+
+def main(overloads: int = 200, calls: int = 2_000):
+    print(f"MethodGroup with {overloads} overloads")
+    g = group(overloads)
+    arguments = [[Object()] * arity for arity in range(8)]
+
+    def cold():
+        g.invalidate()
+        for args in arguments:
+            g.find_overloads(args)
+
+    def warm():
+        for args in arguments:
+            g.find_overloads(args)
+
+    natives = [overload for overload in g.overloads if isinstance(overload, NativeFunction)]
+    signatures = [native.signature for native in natives]
+
+    def bind():
+        for args in arguments:
+            for sig in signatures:
+                try:
+                    sig.bind(*args)
+                except TypeError:
+                    ...
+
+    def shape():
+        for args in arguments:
+            for native in natives:
+                native.get_match_score(*args)
+
+    bench("dispatch (cold)", cold, calls // 10)
+    bench("dispatch (memoized)", warm, calls)
+    bench("natives, Signature.bind", bind, calls // 10)
+    bench("natives, call shape", shape, calls // 10)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,95 @@
+"""
+Measures what toolchain hooks cost: without hooks, after every event had a subscriber that unsubscribed
+again (which must cost nothing), and with a no-op subscriber on every event. Both a tight loop of
+`Interpreter.execute` calls (the hottest hooked method) and compiling a synthetic corpus are measured.
+
+Usage: python benchmarks/bench_hooks.py [SCALE] [REPEAT]
+"""
+
+import gc
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src-v2"))
+
+from corpus import SCALES, generate
+from main import create_compiler
+
+
+def _noop(*_):
+    ...
+
+
+def run(corpus, setup=None) -> float:
+    compiler = create_compiler()
+    compiler.toolchain.import_system.add_directory(corpus.root)
+    if setup is not None:
+        setup(compiler.toolchain.hooks)
+
+    gc.collect()
+    start = time.perf_counter()
+    compiler.compile_many(corpus.entries)
+    return time.perf_counter() - start
+
+
+def execute_loop(setup=None, calls: int = 200_000) -> float:
+    compiler = create_compiler()
+    if setup is not None:
+        setup(compiler.toolchain.hooks)
+    execute = compiler.toolchain.interpreter.execute
+
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(calls):
+        execute(None, runtime=False)
+    return (time.perf_counter() - start) / calls
+
+
+def _subscribed(hooks):
+    for event in hooks.EVENTS:
+        hooks.subscribe(event, _noop)
+
+
+def _unsubscribed(hooks):
+    _subscribed(hooks)
+    for event in hooks.EVENTS:
+        hooks.unsubscribe(event, _noop)
+
+
+def main(scale: str = "small", repeat: int = 5):
+    modes = {
+        "no hooks": None,
+        "hooks removed": _unsubscribed,
+        "no-op hook on every event": _subscribed,
+    }
+
+    print(f"Interpreter.execute, best of {repeat}")
+    best = dict.fromkeys(modes, float("inf"))
+    for _ in range(repeat):
+        for name, setup in modes.items():
+            best[name] = min(best[name], execute_loop(setup))
+    for name, time_ in best.items():
+        print(f"{name:<28} {1_000_000_000 * time_:10.1f} ns {100 * (time_ - best['no hooks']) / best['no hooks']:+7.1f}%")
+
+    with tempfile.TemporaryDirectory(prefix="zs-bench-") as directory:
+        corpus = generate(directory, **SCALES[scale])
+        print(f"Compiling the \"{scale}\" corpus ({corpus.size} bytes), median of {repeat}")
+
+        # the modes take turns, so drift over time affects all of them alike
+        runs = {name: [] for name in modes}
+        for _ in range(repeat):
+            for name, setup in modes.items():
+                runs[name].append(run(corpus, setup))
+
+        baseline = statistics.median(runs["no hooks"])
+        for name, times in runs.items():
+            median = statistics.median(times)
+            print(f"{name:<28} {1000 * median:10.2f} ms {100 * (median - baseline) / baseline:+7.1f}%")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2], *map(int, sys.argv[2:3]))
@@ -0,0 +1,163 @@
+"""
+Generates synthetic Z# projects for the benchmarks.
+
+A corpus is a directory of documents arranged in `depth` levels. Documents on the first level import
+nothing, every other document imports functions from up to `imports` documents of the level below it,
+so the import tree is `depth` documents deep. Every document defines `functions` functions and ends with
+a variable initialized by a nested call expression with `expression` leaves.
+
+The generated code only uses what the compiler provides without a bootstrap environment.
+
+Usage: python benchmarks/corpus.py DIRECTORY [DOCUMENTS] [DEPTH] [FUNCTIONS] [EXPRESSION]
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+
+__all__ = [
+    "Corpus",
+    "SCALES",
+    "generate",
+]
+
+
+SCALES = {
+    "tiny": dict(documents=6, depth=3, functions=4, expression=8),
+    "small": dict(documents=40, depth=5, functions=25, expression=64),
+    "medium": dict(documents=150, depth=10, functions=100, expression=256),
+    "large": dict(documents=300, depth=15, functions=200, expression=512),
+}
+
+
+class Corpus:
+    _root: Path
+    _levels: list[list[Path]]
+    _imports: dict[Path, list[Path]]
+    _parameters: dict[str, int]
+
+    def __init__(self, root: Path, levels: list[list[Path]], imports: dict[Path, list[Path]], parameters: dict[str, int]):
+        self._root = root
+        self._levels = levels
+        self._imports = imports
+        self._parameters = parameters
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def levels(self):
+        return self._levels
+
+    @property
+    def imports(self):
+        return self._imports
+
+    @property
+    def parameters(self):
+        return self._parameters
+
+    @property
+    def documents(self) -> list[Path]:
+        return [document for level in self._levels for document in level]
+
+    @property
+    def entries(self) -> list[Path]:
+        """
+        The documents that no other document imports.
+        """
+        imported = {dependency for dependencies in self._imports.values() for dependency in dependencies}
+        return [document for document in self.documents if document not in imported]
+
+    @property
+    def size(self) -> int:
+        return sum(document.stat().st_size for document in self.documents)
+
+
+def _function_name(document: int, index: int) -> str:
+    return f"f{document}_{index}"
+
+
+def _expression(functions: list[str], leaves: int, rng: random.Random) -> str:
+    # a balanced tree of calls, so long expressions don't become deeply recursive
+    if leaves <= 1:
+        return str(rng.randrange(1000))
+    left = leaves // 2
+    return f"{rng.choice(functions)}({_expression(functions, left, rng)}, {_expression(functions, leaves - left, rng)})"
+
+
+def _document(index: int, dependencies: list[tuple[int, str]], functions: int, expression: int, rng: random.Random) -> str:
+    lines = ["import { Function } from __srf__.builtins;"]
+
+    imported = []
+    for dependency, name in dependencies:
+        names = [_function_name(dependency, i) for i in rng.sample(range(functions), min(3, functions))]
+        lines.append(f"import {{ {', '.join(names)} }} from \"{name}\";")
+        imported.extend(names)
+
+    lines.append("")
+
+    local = []
+    for i in range(functions):
+        name = _function_name(index, i)
+        if imported and i % 2 == 0:
+            body = f"{rng.choice(imported)}(b, a)"
+        else:
+            body = rng.choice("ab")
+        lines.append(f"fun {name}(a, b) {{ {body} }}")
+        local.append(name)
+
+    lines.append("")
+    lines.append(f"var result{index} = {_expression(local, expression, rng)}")
+    return '\n'.join(lines) + '\n'
+
+
+def generate(
+        root: str | Path,
+        documents: int = 40,
+        depth: int = 5,
+        functions: int = 25,
+        expression: int = 64,
+        *,
+        imports: int = 2,
+        seed: int = 0
+) -> Corpus:
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    depth = max(1, min(depth, documents))
+    functions = max(1, functions)
+
+    levels: list[list[Path]] = [[] for _ in range(depth)]
+    indices: dict[Path, int] = {}
+    dependencies: dict[Path, list[Path]] = {}
+
+    for index in range(documents):
+        # the first `depth` documents make sure every level is used, the rest are spread at random
+        level = index if index < depth else rng.randrange(depth)
+        path = root / f"doc{index}.zs"
+        levels[level].append(path)
+        indices[path] = index
+
+        below = levels[level - 1] if level else []
+        dependencies[path] = rng.sample(below, min(imports, len(below)))
+
+        path.write_text(_document(
+            index,
+            [(indices[dependency], dependency.name) for dependency in dependencies[path]],
+            functions, expression, rng
+        ))
+
+    parameters = dict(documents=documents, depth=depth, functions=functions, expression=expression, imports=imports, seed=seed)
+    (root / "corpus.json").write_text(json.dumps(parameters, indent=2))
+
+    return Corpus(root, levels, dependencies, parameters)
+
+
+if __name__ == '__main__':
+    corpus = generate(sys.argv[1], *map(int, sys.argv[2:]))
+    print(f"Generated {len(corpus.documents)} documents ({corpus.size} bytes) in {corpus.root}")
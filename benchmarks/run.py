@@ -0,0 +1,278 @@
+"""
+Runs the benchmark scenarios on a synthetic corpus and records the results as JSON, so runs of different
+commits can be compared.
+
+Usage:
+    python benchmarks/run.py [--scale SCALE] [--repeat N] [--only NAME ...] [--output PATH] [--compare PATH]
+
+Every scenario prepares its input once and then times `repeat` runs. The recorded statistics are in
+seconds. With `--compare`, the median of every scenario is compared to the one in the given results file.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src-v2"))
+
+from corpus import Corpus, SCALES, generate
+
+
+Scenario = Callable[[Corpus], Callable[[], object]]
+
+_scenarios: dict[str, Scenario] = {}
+
+
+def scenario(name: str):
+    """
+    Register a scenario. A scenario receives the corpus, does its setup, and returns the function to time.
+    """
+    def register(fn: Scenario) -> Scenario:
+        _scenarios[name] = fn
+        return fn
+
+    return register
+
+
+def _compiler(corpus: Corpus):
+    from main import create_compiler
+
+    compiler = create_compiler()
+    compiler.toolchain.import_system.add_directory(corpus.root)
+    return compiler
+
+
+def _tokens(compiler, path: Path) -> list:
+    from zs.text.file_info import SourceFile
+
+    return list(compiler.toolchain.tokenizer.tokenize(SourceFile.from_path(path)))
+
+
+@scenario("tokenizer")
+def _(corpus: Corpus):
+    compiler = _compiler(corpus)
+    documents = corpus.documents
+
+    def run():
+        for path in documents:
+            _tokens(compiler, path)
+
+    return run
+
+
+@scenario("parser")
+def _(corpus: Corpus):
+    from zs.text.token_stream import TokenStream
+
+    compiler = _compiler(corpus)
+    parser = compiler.toolchain.parser
+    tokens = [_tokens(compiler, path) for path in corpus.documents]
+
+    def run():
+        for document in tokens:
+            parser.parse(TokenStream(document))
+
+    return run
+
+
+@scenario("preprocessor")
+def _(corpus: Corpus):
+    compiler = _compiler(corpus)
+    preprocessor = compiler.toolchain.preprocessor
+    documents = [compiler.toolchain.parse_document(path) for path in corpus.documents]
+
+    def run():
+        for nodes in documents:
+            for node in nodes:
+                preprocessor.preprocess(node)
+
+    return run
+
+
+@scenario("interpreter")
+def _(corpus: Corpus):
+    # only documents without imports, so that nothing but their own instructions is executed
+    compiler = _compiler(corpus)
+    toolchain = compiler.toolchain
+    documents = [
+        [toolchain.preprocessor.preprocess(node) for node in toolchain.parse_document(path)]
+        for path in corpus.levels[0]
+    ]
+
+    def run():
+        for instructions in documents:
+            with toolchain.engine.document(compiler.context):
+                for instruction in instructions:
+                    toolchain.interpreter.execute(instruction, runtime=False)
+
+    return run
+
+
+@scenario("compile")
+def _(corpus: Corpus):
+    entries = corpus.entries
+
+    def run():
+        results = _compiler(corpus).compile_many(entries)
+        if failed := [result for result in results if not result.success]:
+            raise RuntimeError(f"Compiling {failed[0].path} failed: {failed[0].error or failed[0].messages}")
+
+    return run
+
+
+@scenario("coverage")
+def _(corpus: Corpus):
+    # the "compile" scenario with coverage being collected, to keep an eye on what collecting it costs
+    from zs.ctrt.coverage import Coverage
+
+    entries = corpus.entries
+
+    def run():
+        compiler = _compiler(corpus)
+        with Coverage() as coverage:
+            coverage.attach(compiler.toolchain)
+            compiler.compile_many(entries)
+        return coverage
+
+    return run
+
+
+@scenario("imports")
+def _(corpus: Corpus):
+    # every document is already cached, so this measures finding and validating cached imports
+    compiler = _compiler(corpus)
+    import_system = compiler.toolchain.import_system
+    import_system.caching = True
+    names = [Path(path.name) for path in corpus.documents]
+    for name in names:
+        import_system.import_from(name)
+
+    def run():
+        import_system.invalidate_stale()
+        for name in names:
+            import_system.import_from(name)
+
+    return run
+
+
+@scenario("dependency_graph")
+def _(corpus: Corpus):
+    from bench_dependency_graph import layered
+    from zs.processing import State
+
+    nodes = 1000 * sum(map(len, corpus.levels))
+
+    def run():
+        layered(nodes).get_dependency_order(State())
+
+    return run
+
+
+@scenario("dispatch")
+def _(corpus: Corpus):
+    from bench_dispatch import group
+    from zs import Object
+
+    methods = group(corpus.parameters["functions"])
+    arguments = [[Object()] * arity for arity in range(8)]
+
+    def run():
+        methods.invalidate()
+        for _ in range(10):
+            for args in arguments:
+                methods.find_overloads(args)
+
+    return run
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict[str, object]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "runs": runs,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale: str = "small", repeat: int = 5, only: list[str] = None, directory: str | Path = None) -> dict[str, object]:
+    names = only or list(_scenarios)
+    if unknown := [name for name in names if name not in _scenarios]:
+        raise ValueError(f"Unknown scenarios: {', '.join(unknown)} (available: {', '.join(_scenarios)})")
+
+    with tempfile.TemporaryDirectory(prefix="zs-bench-") as temporary:
+        corpus = generate(Path(directory or temporary) / scale, **SCALES[scale])
+
+        results = {}
+        for name in names:
+            fn = _scenarios[name](corpus)
+            results[name] = measure(fn, repeat)
+            print(f"{name:<20} {1000 * results[name]['median']:12.2f} ms (median of {repeat})", file=sys.stderr)
+
+        return {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+            "corpus": {**corpus.parameters, "bytes": corpus.size},
+            "results": results,
+        }
+
+
+def compare(results: dict, baseline: dict) -> str:
+    lines = [f"{'scenario':<20} {'baseline ms':>12} {'current ms':>12} {'change':>8}"]
+    for name, result in results["results"].items():
+        if (before := baseline["results"].get(name)) is None:
+            continue
+        old, new = before["median"], result["median"]
+        lines.append(f"{name:<20} {1000 * old:12.2f} {1000 * new:12.2f} {100 * (new - old) / old:+7.1f}%")
+    return '\n'.join(lines)
+
+
+def main(args: list[str] = None):
+    parser = argparse.ArgumentParser(description="Z# compiler benchmarks")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs='+', choices=list(_scenarios), default=None)
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="compare against the results in this JSON file")
+    parser.add_argument("--corpus", default=None, help="generate the corpus in this directory and keep it")
+    options = parser.parse_args(args)
+
+    results = run(options.scale, options.repeat, options.only, options.corpus)
+
+    if options.output is not None:
+        Path(options.output).write_text(json.dumps(results, indent=2))
+
+    if options.compare is not None:
+        baseline = json.loads(Path(options.compare).read_text())
+        if baseline.get("scale") != results["scale"]:
+            print(f"warning: comparing the \"{results['scale']}\" scale to \"{baseline.get('scale')}\"", file=sys.stderr)
+        print(compare(results, baseline))
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
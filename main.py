@@ -1,14 +1,17 @@
 import sys
 
+from contextlib import ExitStack
 from functools import partial, partialmethod
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterable
 
+from zs import EmptyObject
 from zs.base import NativeFunction
-from zs.cli.options import Options, get_options
+from zs.cli.options import Options, ServeOptions, ClientOptions, get_options
 from zs.ctrt.lib import Function, ExObj, Field, CodeGenFunction
-from zs.processing import State, StatefulProcessor
-from zs.std.importers import ZSImporter
+from zs.ctrt.memo import MemoizedFunction
+from zs.processing import State, StatefulProcessor, Message, MessageType
+from zs.std.importers import ZSImporter, ZSAImporter
 from zs.std.objects.compilation_environment import Document, ContextManager
 from zs.std.parsers.std import get_standard_parser
 from zs.std.processing.import_system import ImportResult
@@ -39,7 +42,7 @@ class Compiler(StatefulProcessor):
         super().__init__(state or State())
         self._context = context or ContextManager()
         self._toolchain_factory = toolchain_factory or (lambda _: Toolchain(state=self.state, context=self._context))
-        self._toolchain = toolchain_factory(self)
+        self._toolchain = self._toolchain_factory(self)
         self.builtins = Builtins()
 
     @property
@@ -62,22 +65,143 @@ class Compiler(StatefulProcessor):
 
         return toolchain.compile_document(path)
 
+    def natives(self) -> dict[str, object]:
+        """
+        Host objects that Z# code can reach but which are owned by this process, keyed by a stable name.
+        """
+        toolchain = self._toolchain
+        natives = {
+            "compiler": self,
+            "state": self.state,
+            "context": self._context,
+            "builtins": self.builtins,
+            "toolchain": toolchain,
+            "tokenizer": toolchain.tokenizer,
+            "parser": toolchain.parser,
+            "import_system": toolchain.import_system,
+        }
+        if (preprocessor := toolchain.preprocessor) is not None:
+            natives["preprocessor"] = preprocessor
+        if (interpreter := toolchain.interpreter) is not None:
+            natives["interpreter"] = interpreter
+            natives["interpreter.x"] = interpreter.x
+            natives["interpreter.global"] = interpreter.x.global_scope
+        for name, item in self.builtins.all().items():
+            natives[f"builtins.{name}"] = item
+        if interpreter is not None:
+            for name, item in interpreter.x.global_scope.items.items():
+                natives.setdefault(f"global.{name}", item)
+        for parser in toolchain.parser.parsers:
+            natives[f"parser.{parser.name}"] = parser
+        return natives
+
+    def compile_many(self, paths: Iterable[str | Path]) -> list["CompilationResult"]:
+        """
+        Compile each of the given files with the current toolchain.
+
+        All targets share the toolchain's parser, and import results are cached for the whole batch, so a
+        library imported by many targets is only compiled once. Unless caching was already on, the cache is
+        dropped after the batch. Every target is compiled in its own document scope and gets its own result,
+        even if compiling it failed.
+        """
+        results = []
+        toolchain = self._toolchain
+        messages = self.state.messages
+
+        with toolchain.import_system.cached():
+            for path in paths:
+                super().run()
+
+                path = Path(path)
+                start, errors = messages.checkpoint(), messages.count(MessageType.Error)
+                document = error = None
+                try:
+                    document = toolchain.compile_document(path)
+                except Exception as e:
+                    error = e
+                results.append(CompilationResult(
+                    path, document, list(messages[start:]), error, errors=messages.count(MessageType.Error) - errors
+                ))
+
+        return results
+
+
+class CompilationResult(EmptyObject):
+    _path: Path
+    _document: Document | None
+    _messages: list[Message]
+    _error: Exception | None
+    _errors: int
+
+    def __init__(
+            self,
+            path: Path,
+            document: Document | None,
+            messages: list[Message],
+            error: Exception | None = None,
+            *,
+            errors: int = None
+    ):
+        super().__init__()
+        self._path = path
+        self._document = document
+        self._messages = messages
+        self._error = error
+        # errors that weren't recorded (because the message limit was reached) still count
+        if errors is None:
+            errors = sum(message.type == MessageType.Error for message in messages)
+        self._errors = errors
 
-def main(options: Options):
-    state = State()
-    context = ContextManager()
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def document(self):
+        return self._document
+
+    @property
+    def messages(self):
+        return self._messages
+
+    @property
+    def error(self):
+        return self._error
+
+    @property
+    def errors(self):
+        return self._errors
+
+    @property
+    def success(self):
+        return self._error is None and not self._errors
+
+
+def create_compiler(
+        state: State = None,
+        context: ContextManager = None,
+        engine: str = "run",
+        limits: "ExecutionLimits" = None
+) -> Compiler:
+    state = state or State()
+    context = context or ContextManager()
 
     parser = get_standard_parser(state)
 
     parser.setup()
 
-    compiler = Compiler(state=state, context=context, toolchain_factory=lambda c: Toolchain(state=c.state, parser=parser, context=context))
-    import_system = compiler.toolchain.interpreter.import_system
-    context.global_context.add(compiler, "__srf__")
+    def create_toolchain(c: Compiler):
+        toolchain = Toolchain(state=c.state, parser=parser, context=context, engine=engine)
+        if limits is not None:
+            toolchain.engine.limits = limits
+        return toolchain
 
-    import_system.add_directory("./tests/test_project_v2/")
+    compiler = Compiler(state=state, context=context, toolchain_factory=create_toolchain)
+    import_system = compiler.toolchain.import_system
+    context.global_context.add(compiler, "__srf__")
 
     import_system.add_importer(ZSImporter(import_system, compiler), ".zs")
+    import_system.add_importer(ZSAImporter(import_system, compiler), ".zsa")
 
     builtins = compiler.builtins
 
@@ -93,6 +217,9 @@ def main(options: Options):
         setattr(o, str(n), v)
         return v
 
+    def _call(fn, *args):
+        return compiler.toolchain.interpreter.execute(fn, *args, execute=True, runtime=False)
+
     def _get(obj, n):
         try:
             return getattr(obj, str(n))
@@ -109,11 +236,65 @@ def main(options: Options):
     }))
     builtins.partial = partial
     builtins.partialmethod = partialmethod
+    builtins.memoize = lambda fn, max_size=128: MemoizedFunction(fn, _call, max_size)
+    builtins.gather = lambda *functions: compiler.toolchain.interpreter.gather(*functions)
+
+    engine = compiler.toolchain.engine
+    engine.define("__srf__", compiler)
+    engine.define("_._", _get)
+    engine.define("_=_", _assign)
+    engine.define("_;_", lambda l, r: (compiler.toolchain.interpreter.execute(l, runtime=False), compiler.toolchain.interpreter.execute(r, runtime=False))[1])
 
-    compiler.toolchain.interpreter.x.local("__srf__", compiler)
-    compiler.toolchain.interpreter.x.local("_._", _get)
-    compiler.toolchain.interpreter.x.local("_=_", _assign)
-    compiler.toolchain.interpreter.x.local("_;_", lambda l, r: (compiler.toolchain.interpreter.execute(l, runtime=False), compiler.toolchain.interpreter.execute(r, runtime=False))[1])
+    return compiler
+
+
+def main(options: Options):
+    state = State()
+
+    compiler = create_compiler(state, engine=options.engine, limits=options.limits)
+
+    import_system = compiler.toolchain.import_system
+    import_system.add_directory("./tests/test_project_v2/")
+    if options.snapshot is not None:
+        # the snapshot is made of the cached results of the bootstrap
+        import_system.caching = True
+
+    tracing = ExitStack()
+    if options.timings is not None or options.memory_profile is not None:
+        from zs.instrumentation import Instrumentation
+        instrumentation = Instrumentation(memory=options.memory_profile is not None)
+        compiler.toolchain.instrumentation = instrumentation
+        tracing.enter_context(instrumentation.tracing())
+
+    bootstrap = options.bootstrap
+    if options.snapshot is not None and Path(options.snapshot).exists():
+        from zs.ctrt.snapshot import Snapshot
+        if Snapshot.is_current(options.snapshot, bootstrap):
+            Snapshot.load(options.snapshot, import_system, compiler.natives())
+            bootstrap = None
+        elif bootstrap is None and (header := Snapshot.header(Path(options.snapshot).read_bytes())) is not None:
+            # the sources changed since the snapshot was made, so it's rebuilt from the same bootstrap
+            bootstrap = header["bootstrap"]
+    if bootstrap is not None:
+        from zs.ctrt.snapshot import Snapshot
+        snapshot = Snapshot(compiler.natives())
+        import_system.import_from(Path(bootstrap))
+        if options.snapshot is not None:
+            snapshot.save(options.snapshot, import_system, bootstrap)
+
+    profiler = None
+    if options.profile is not None:
+        from zs.ctrt.profiler import Profiler
+        if compiler.toolchain.interpreter is None:
+            raise ValueError(f"The \"{options.engine}\" engine can't be profiled")
+        profiler = Profiler(compiler.toolchain.interpreter)
+        profiler.start()
+
+    coverage = None
+    if options.coverage is not None or options.lcov is not None:
+        from zs.ctrt.coverage import Coverage
+        coverage = Coverage()
+        coverage.attach(compiler.toolchain)
 
     try:
         compiler.compile(options.source)
@@ -129,12 +310,148 @@ def main(options: Options):
             for name, member in module.members.items:
                 print('\t', name, " :: ", member)
     finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.write(options.profile)
+
+        if coverage is not None:
+            coverage.detach()
+            if options.coverage == '-':
+                print(coverage.format_summary())
+            elif options.coverage is not None:
+                coverage.save(options.coverage)
+            if options.lcov is not None:
+                coverage.write_lcov(options.lcov)
+
+        tracing.close()
+
         state.reset()
 
         for message in state.messages:
-            print(f"[{message.processor.__class__.__name__}] [{message.type.value}] {message.origin} -> {message.content}")
+            repeated = f" (x{message.count})" if message.count > 1 else ""
+            print(f"[{message.processor.__class__.__name__}] [{message.type.value}] {message.origin} -> {message.content}{repeated}")
+        if (overflow := state.messages.overflow) is not None:
+            print(f"[{overflow.type.value}] {overflow.content}")
+
+        if (instrumentation := compiler.toolchain.instrumentation) is not None:
+            for target in {options.timings, options.memory_profile} - {None}:
+                if target == '-':
+                    print(instrumentation.format_table())
+                    if instrumentation.memory:
+                        print(instrumentation.format_top())
+                else:
+                    Path(target).write_text(instrumentation.to_json(indent=2))
+
+
+def _unsupported_request_options(request: Options, compiler: Compiler) -> list[str]:
+    unsupported = []
+    if request.engine != compiler.toolchain.engine.name:
+        unsupported.append(f"--engine {request.engine} (the server runs \"{compiler.toolchain.engine.name}\")")
+    for option, value in {
+        "--snapshot": request.snapshot,
+        "--timings": request.timings,
+        "--memory-profile": request.memory_profile,
+        "--profile": request.profile,
+        "--coverage": request.coverage,
+        "--lcov": request.lcov,
+    }.items():
+        if value is not None:
+            unsupported.append(option)
+    return unsupported
+
+
+SERVER_NODE_CACHE_SIZE = 1024
+
+
+def create_request_handler(compiler: Compiler):
+    from zs.cli.options import OptionsError
+    from zs.cli.server import encode_message
+
+    import_system = compiler.toolchain.import_system
+    # import results and parsed documents stay cached between requests, and are only dropped when their
+    # sources change (or, for parsed documents, when the cache is full)
+    import_system.caching = True
+    compiler.context.node_cache_size = SERVER_NODE_CACHE_SIZE
+
+    def handle(cwd: str, args: list[str]):
+        try:
+            request = get_options(["c", *args], exit_on_error=False)
+        except OptionsError as e:
+            yield {"done": True, "success": False, "error": f"{e.usage}error: {e}"}
+            return
+        except SystemExit:
+            # e.g. --help, which argparse prints on the server's stdout and then exits
+            yield {"done": True, "success": False, "error": "The compile server can't show help, run the `c` command instead"}
+            return
+
+        if unsupported := _unsupported_request_options(request, compiler):
+            yield {"done": True, "success": False, "error": f"Not supported by the compile server: {', '.join(unsupported)}"}
+            return
+
+        # paths are relative to the client, the server's own working directory is left alone
+        cwd = Path(cwd)
+
+        # sources changed since the last request are re-imported, everything else stays warm
+        import_system.invalidate_stale()
+
+        # every request reports its own messages, and the server doesn't accumulate them
+        compiler.state.messages.clear()
+
+        engine = compiler.toolchain.engine
+        limits = engine.limits
+        engine.limits = request.limits
+        try:
+            if request.bootstrap is not None:
+                import_system.import_from(cwd / request.bootstrap)
+
+            result, = compiler.compile_many([cwd / request.source])
+        finally:
+            engine.limits = limits
+
+        for message in compiler.state.messages:
+            yield encode_message(message)
+        if (overflow := compiler.state.messages.overflow) is not None:
+            yield encode_message(overflow)
+
+        yield {"done": True, "success": result.success, "error": None if result.error is None else str(result.error)}
+
+    return handle
+
+
+def serve(options: ServeOptions):
+    from zs.cli.server import CompileServer
+
+    compiler = create_compiler()
+
+    with CompileServer(options.socket, create_request_handler(compiler)) as server:
+        print("Serving on", options.socket)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            ...
+
+
+def client(options: ClientOptions) -> int:
+    from zs.cli.server import send_request
+
+    for event in send_request(options.socket, options.args):
+        if "message" in event:
+            message = event["message"]
+            print(f"[{message['processor']}] [{message['type']}] {message['origin']} -> {message['content']}")
+        elif event.get("done"):
+            if event["error"] is not None:
+                print(event["error"], file=sys.stderr)
+            return 0 if event["success"] else 1
+    return 1
 
 
 if __name__ == '__main__':
     sys.setrecursionlimit(10000)
-    main(get_options())
+
+    match get_options():
+        case ServeOptions() as options:
+            serve(options)
+        case ClientOptions() as options:
+            sys.exit(client(options))
+        case options:
+            main(options)
@@ -2,3 +2,33 @@ from .base import *
 
 
 __version__ = "0.1.0"
+
+
+# submodules are only loaded when they're first accessed, so `import zs` stays cheap
+_SUBMODULES = {
+    "ast",
+    "cli",
+    "ctrt",
+    "dependency_graph",
+    "engine",
+    "errors",
+    "hooks",
+    "instrumentation",
+    "interop",
+    "objects",
+    "processing",
+    "std",
+    "text",
+    "utils",
+}
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULES:
+        import importlib
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return [*globals(), *_SUBMODULES]
@@ -25,5 +25,9 @@ class Node(Object[None], Generic[TokenInfoT]):
     def token_info(self):
         return self._token_info
 
+    @property
+    def span(self):
+        return getattr(self._token_info, "span", None)
+
     def __str__(self):
         return str(self._token_info)
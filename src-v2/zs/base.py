@@ -1,12 +1,17 @@
+import weakref
 from abc import ABC, abstractmethod
-from inspect import signature, Signature
 from typing import TypeVar, Generic, TYPE_CHECKING, Any, Callable
 
+if TYPE_CHECKING:
+    from inspect import Signature
+
 _T = TypeVar("_T")
 
 
 __all__ = [
+    "CallShape",
     "EmptyObject",
+    "MemberTable",
     "Object",
     "NativeFunction"
 ]
@@ -54,26 +59,157 @@ class EmptyObject(Object[None]):
             return None
 
 
+# bumped whenever the members of any type change. types compare it first, and only check their own versions
+# (see `Type.version`) once it moved
+_epoch = 0
+
+
+def _bump_epoch():
+    global _epoch
+    _epoch += 1
+
+
+def type_epoch() -> int:
+    """
+    A number that changes whenever the members of any type change. It's a cheap check of whether anything
+    changed at all, `Type.version` tells whether a specific type did.
+    """
+    return _epoch
+
+
+class MemberTable(dict):
+    """
+    The members of a type. Every modification bumps the table's version.
+    """
+
+    version = 0
+
+    def _changed(self):
+        self.version += 1
+        _bump_epoch()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._changed()
+        return result
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._changed()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._changed()
+        return result
+
+    def setdefault(self, key, default=None):
+        result = super().setdefault(key, default)
+        self._changed()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+
 class Type(EmptyObject):
-    _members: dict[str, Object]
+    _members: MemberTable
     _base: "Type"
+    _chain: "tuple[Type, ...] | None"
+    _table: dict[str, Object] | None
+    _table_version: int
+    _version: int
+    _version_epoch: int
 
     __base__ = None
 
     def __init__(self, base: "Type" = None, members: dict[str, Object] = None):
         super().__init__()
-        self._members = members if members is not None else {}
+        if members is None:
+            members = MemberTable()
+        elif not isinstance(members, MemberTable):
+            members = MemberTable(members)
+        self._members = members
         base = base or self.__base__
         if self.__base__ is None:
             self.__base__ = self
         self._base = base
+        self._chain = None
+        self._table = None
+        self._table_version = -1
+        self._version = 0
+        self._version_epoch = -1
+
+    @property
+    def version(self) -> int:
+        """
+        A number that changes whenever the members of this type or of one of its bases change. Caches of
+        lookups on this type can compare it to know when they are stale.
+        """
+        if self._version_epoch != _epoch:
+            if self._chain is None:
+                self._chain = self._get_chain()
+            # the versions of member tables only grow, so their sum changes whenever one of them does
+            self._version = sum(typ._members.version for typ in self._chain)
+            self._version_epoch = _epoch
+        return self._version
 
     def get(self, name: str | Any):
+        table = self._table
+        # `version` only sums the versions along the chain when some type changed since it was last asked
+        if table is None or self._table_version != self.version:
+            table = self._flatten()
         try:
-            return self._members[str(name)]
+            return table[name]
         except KeyError:
-            if self._base is not None:
-                return self._base.get(name)
+            if type(name) is str:
+                return None
+        except TypeError:
+            ...
+        return table.get(str(name))
+
+    def _get_chain(self) -> "tuple[Type, ...]":
+        chain = []
+        seen = set()
+        typ = self
+        while typ is not None and id(typ) not in seen:
+            seen.add(id(typ))
+            chain.append(typ)
+            typ = typ._base
+        return tuple(chain)
+
+    def _flatten(self) -> dict[str, Object]:
+        version = self.version
+
+        # members of derived types shadow the ones of their bases
+        table = {}
+        for typ in reversed(self._chain):
+            table.update(typ._members)
+
+        self._table = table
+        self._table_version = version
+        return table
+
+    def __getstate__(self):
+        state = dict(vars(self))
+        state["_chain"] = None
+        state["_table"] = None
+        state["_table_version"] = -1
+        state["_version_epoch"] = -1
+        return state
 
     @property
     def runtime_type(self):
@@ -96,52 +232,241 @@ class IFunction(ABC):
     def get_match_score(self, *args: Object): ...
 
 
-_om = {}
+_om = MemberTable()
 Object_Type = Type(None, _om)
 
 
+class CallShape:
+    """
+    The ways a native function can be called, precomputed from its signature so that matching a call doesn't
+    have to bind the arguments.
+    """
+
+    __slots__ = ("_min_positional", "_max_positional", "_positional_names", "_keywords", "_required_keywords", "_var_keyword")
+
+    _min_positional: int
+    _max_positional: int | None
+    _positional_names: tuple[str, ...]
+    _keywords: frozenset[str]
+    _required_keywords: frozenset[str]
+    _var_keyword: bool
+
+    def __init__(
+            self,
+            min_positional: int,
+            max_positional: int | None,
+            positional_names: tuple[str, ...] = (),
+            keywords: frozenset[str] = frozenset(),
+            required_keywords: frozenset[str] = frozenset(),
+            var_keyword: bool = False
+    ):
+        self._min_positional = min_positional
+        self._max_positional = max_positional
+        self._positional_names = positional_names
+        self._keywords = keywords
+        self._required_keywords = required_keywords
+        self._var_keyword = var_keyword
+
+    @property
+    def min_positional(self):
+        return self._min_positional
+
+    @property
+    def max_positional(self):
+        """
+        The maximum number of positional arguments, or None if the function takes any number of them.
+        """
+        return self._max_positional
+
+    @property
+    def keywords(self):
+        return self._keywords
+
+    @property
+    def required_keywords(self):
+        return self._required_keywords
+
+    @property
+    def var_keyword(self):
+        return self._var_keyword
+
+    @classmethod
+    def from_signature(cls, sig: "Signature", bound: int = 0):
+        """
+        Create the shape of the given signature, where the first `bound` positional parameters are already bound.
+        """
+        required = 0
+        names = []
+        var_positional = var_keyword = False
+        keywords = set()
+        required_keywords = set()
+
+        for parameter in sig.parameters.values():
+            match parameter.kind:
+                case parameter.POSITIONAL_ONLY | parameter.POSITIONAL_OR_KEYWORD:
+                    if parameter.default is parameter.empty:
+                        required = len(names) + 1
+                    names.append(parameter.name if parameter.kind is parameter.POSITIONAL_OR_KEYWORD else None)
+                case parameter.VAR_POSITIONAL:
+                    var_positional = True
+                case parameter.KEYWORD_ONLY:
+                    keywords.add(parameter.name)
+                    if parameter.default is parameter.empty:
+                        required_keywords.add(parameter.name)
+                case parameter.VAR_KEYWORD:
+                    var_keyword = True
+
+        # a negative maximum means the bound arguments already exceed the parameters, so nothing matches
+        max_positional = None if var_positional else len(names) - bound
+        names = names[bound:]
+        keywords.update(name for name in names if name is not None)
+
+        return cls(
+            max(required - bound, 0),
+            max_positional,
+            tuple(names),
+            frozenset(keywords),
+            frozenset(required_keywords),
+            var_keyword
+        )
+
+    def accepts(self, positional: int, keywords: tuple[str, ...] = ()) -> bool:
+        if self._max_positional is not None and positional > self._max_positional:
+            return False
+
+        if not keywords:
+            return positional >= self._min_positional and not self._required_keywords
+
+        filled = positional
+        names = self._positional_names
+        for keyword in keywords:
+            if keyword in names:
+                if names.index(keyword) < positional:
+                    return False
+                filled += 1
+            elif keyword not in self._keywords and not self._var_keyword:
+                return False
+
+        return filled >= self._min_positional and self._required_keywords.issubset(keywords)
+
+
+_signatures: "weakref.WeakKeyDictionary[Callable, Signature]" = weakref.WeakKeyDictionary()
+
+
+def _get_signature(fn: Callable) -> "Signature":
+    from inspect import signature
+
+    try:
+        return _signatures[fn]
+    except KeyError:
+        sig = _signatures[fn] = signature(fn)
+        return sig
+    except TypeError:
+        # can't be weakly referenced (e.g. builtins), so it can't be cached either
+        return signature(fn)
+
+
+# the key of the bound method cache in the __dict__ of instances, see `NativeFunction.__get__`
+_METHODS = "__zs_methods__"
+
+
 class NativeFunction(EmptyObject, IFunction):
     _native: Callable
+    _sig: "Signature | None"
+    _shape: CallShape | None
+    _method_shape: CallShape | None
+    _return_type: Type | None
 
-    def __init__(self, fn: Callable, name=None, sig: Signature = None):
+    def __init__(self, fn: Callable, name=None, sig: "Signature" = None):
         super().__init__()
         self._native = fn
         self._name = name or fn.__name__
 
-        self._sig = sig or signature(fn)
-
-        self._return_type = Object_Type if self._sig.return_annotation == Signature.empty else self._sig.return_annotation.__zs_type__
+        # the signature is computed on first use, most natives are never inspected
+        self._sig = sig
+        self._shape = None
+        self._method_shape = None
+        self._return_type = None
 
     @property
     def name(self):
         return self._name
 
+    @property
+    def signature(self) -> "Signature":
+        if self._sig is None:
+            self._sig = _get_signature(self._native)
+        return self._sig
+
+    @property
+    def shape(self) -> CallShape:
+        if self._shape is None:
+            self._shape = CallShape.from_signature(self.signature)
+        return self._shape
+
     @property
     def return_type(self):
+        if self._return_type is None:
+            sig = self.signature
+            self._return_type = Object_Type if sig.return_annotation is sig.empty else sig.return_annotation.__zs_type__
         return self._return_type
 
-    def get_match_score(self, *args: Object):
-        try:
-            self._sig.bind(*args)
-            return -1
-        except TypeError:
-            return 0
+    def get_match_score(self, *args: Object, **kwargs: Object):
+        # natives match loosely, so they lose against any function that declares its parameters
+        return -1 if self.shape.accepts(len(args), tuple(kwargs)) else 0
 
     def __call__(self, *args, **kwargs):
         return self._native(*args, **kwargs)
 
     def __get__(self, instance, owner):
-        return NativeMethod(self._native, instance, self.name)
+        if instance is None:
+            return self
+
+        # bound methods are cached on the instance itself, so they live exactly as long as it does: a method
+        # refers back to its instance, and a cache anywhere else would keep every instance alive. they're keyed
+        # by the function rather than stored under its name, so no attribute is shadowed and replacing the
+        # function on the class takes effect. instances without a __dict__ get a new method every time
+        try:
+            return instance.__dict__[_METHODS][self]
+        except KeyError:
+            ...
+        except AttributeError:
+            return NativeMethod(self._native, instance, self.name, self)
+
+        method = instance.__dict__.setdefault(_METHODS, {})[self] = NativeMethod(self._native, instance, self.name, self)
+        return method
+
+    def __reduce__(self):
+        return NativeFunction, (self._native, self._name)
 
 
 class NativeMethod(NativeFunction):
-    def __init__(self, fn: Callable, bound=None, name=None):
-        super().__init__(fn, name)
+    _function: NativeFunction | None
+
+    def __init__(self, fn: Callable, bound=None, name=None, function: NativeFunction = None):
+        super().__init__(fn, name, function._sig if function is not None else None)
         self.__self__ = bound
+        self._function = function
+
+    @property
+    def shape(self) -> CallShape:
+        if self._shape is None:
+            function = self._function
+            if function is None:
+                self._shape = CallShape.from_signature(self.signature, bound=1)
+            else:
+                # all methods bound from the same function share its shape
+                if function._method_shape is None:
+                    function._method_shape = CallShape.from_signature(function.signature, bound=1)
+                self._shape = function._method_shape
+        return self._shape
 
     def __call__(self, *args, **kwargs):
         return super().__call__(self.__self__, *args, **kwargs)
 
+    def __reduce__(self):
+        return NativeMethod, (self._native, self.__self__, self._name)
+
 
 _om.update({
     "_._": NativeFunction(lambda o, n: getattr(o, str(n)), "_._"),
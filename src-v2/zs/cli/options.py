@@ -1,10 +1,54 @@
+import sys
+from typing import TYPE_CHECKING
+
 from .. import EmptyObject
 
 
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError, REMAINDER
+
+from ..engine import available_engines
+
+if TYPE_CHECKING:
+    from ..ctrt.limits import ExecutionLimits
+
+
+class OptionsError(Exception):
+    """
+    Raised for invalid command line arguments, instead of exiting the process.
+    """
+
+    parser: ArgumentParser
+
+    def __init__(self, parser: ArgumentParser, message: str):
+        super().__init__(message)
+        self.parser = parser
+
+    @property
+    def usage(self) -> str:
+        return self.parser.format_usage()
+
+
+class _ArgumentParser(ArgumentParser):
+    # sub-parsers are created with the class of their parent, so this covers all of them
+    def error(self, message: str):
+        raise OptionsError(self, message)
+
+
+def _engine(name: str) -> str:
+    # checked when parsing rather than with `choices`, so that engines registered later can be selected
+    if name not in (engines := available_engines()):
+        raise ArgumentTypeError(f"invalid choice: {name!r} (choose from {', '.join(map(repr, engines))})")
+    return name
 
 
-_arg_parser = ArgumentParser(
+def _output(path: str) -> str:
+    # output options take an explicit value, a source given where it's expected is most likely a mistake
+    if path.endswith(".zs"):
+        raise ArgumentTypeError(f"expected an output path (or - to print), not the source file {path!r}")
+    return path
+
+
+_arg_parser = _ArgumentParser(
     description="The Z# programming language compiler & interpreter bundle"
 )
 
@@ -15,14 +59,46 @@ class Options(EmptyObject):
     _output: str | None
     _source: str
     _engine_args: list[str]
+    _bootstrap: str | None
+    _snapshot: str | None
+    _timings: str | None
+    _profile: str | None
+    _memory_profile: str | None
+    _limits: "ExecutionLimits | None"
+    _coverage: str | None
+    _lcov: str | None
 
-    def __init__(self, validate: bool = True, engine: str = "run", output: str = None, source: str = "", args: list[str] = None):
+    def __init__(
+            self,
+            validate: bool = True,
+            engine: str = "run",
+            output: str = None,
+            source: str = "",
+            args: list[str] = None,
+            *,
+            bootstrap: str = None,
+            snapshot: str = None,
+            timings: str = None,
+            profile: str = None,
+            memory_profile: str = None,
+            limits: "ExecutionLimits" = None,
+            coverage: str = None,
+            lcov: str = None
+    ):
         super().__init__()
         self._validate = validate
         self._engine = engine
         self._output = output
         self._source = source
         self._engine_args = args
+        self._bootstrap = bootstrap
+        self._snapshot = snapshot
+        self._timings = timings
+        self._profile = profile
+        self._memory_profile = memory_profile
+        self._limits = limits
+        self._coverage = coverage
+        self._lcov = lcov
 
     @property
     def validate(self):
@@ -44,9 +120,53 @@ class Options(EmptyObject):
     def engine_args(self):
         return self._engine_args
 
+    @property
+    def bootstrap(self):
+        return self._bootstrap
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def timings(self):
+        return self._timings
+
+    @property
+    def profile(self):
+        return self._profile
+
+    @property
+    def memory_profile(self):
+        return self._memory_profile
+
+    @property
+    def limits(self):
+        return self._limits
+
+    @property
+    def coverage(self):
+        return self._coverage
+
+    @property
+    def lcov(self):
+        return self._lcov
+
     @classmethod
     def from_args(cls, ns, rest) -> "Options":
-        return Options(ns.validate, ns.engine, ns.output, ns.source, rest)
+        limits = None
+        if any(value is not None for value in (ns.max_instructions, ns.max_depth, ns.timeout, ns.max_scope_size)):
+            from ..ctrt.limits import ExecutionLimits
+            limits = ExecutionLimits(
+                max_instructions=ns.max_instructions, max_depth=ns.max_depth, timeout=ns.timeout,
+                max_scope_size=ns.max_scope_size
+            )
+
+        return Options(
+            ns.validate, ns.engine, ns.output, ns.source, rest,
+            bootstrap=ns.bootstrap, snapshot=ns.snapshot, timings=ns.timings, profile=ns.profile,
+            memory_profile=ns.memory_profile, limits=limits, coverage=ns.coverage, lcov=ns.lcov
+        )
 
 
 class InitOptions:
@@ -70,12 +190,61 @@ class InitOptions:
         return cls(ns.project_name, ns.src or True)  # todo: fix cyclic import causing stack overflow exception
 
 
+class ServeOptions:
+    _socket: str
+
+    def __init__(self, socket: str):
+        self._socket = socket
+
+    @property
+    def socket(self):
+        return self._socket
+
+    @classmethod
+    def from_args(cls, ns, _):
+        from .server import default_socket_path
+        return cls(ns.socket or default_socket_path())
+
+
+class ClientOptions:
+    _socket: str
+    _args: list[str]
+
+    def __init__(self, socket: str, args: list[str]):
+        self._socket = socket
+        self._args = args
+
+    @property
+    def socket(self):
+        return self._socket
+
+    @property
+    def args(self):
+        return self._args
+
+    @classmethod
+    def from_args(cls, ns, rest):
+        from .server import default_socket_path
+        return cls(ns.socket or default_socket_path(), [*ns.args, *rest])
+
+
 _sub_parsers = _arg_parser.add_subparsers()
 
 _options_parser = _sub_parsers.add_parser("c")
 _options_parser.add_argument("-v", "--validate", action="store_true", default=False)
-_options_parser.add_argument("-e", "--engine", choices=["run"], default="run")
+_options_parser.add_argument("-e", "--engine", type=_engine, default="run")
 _options_parser.add_argument("-o", "--output", default=None)
+_options_parser.add_argument("-b", "--bootstrap", default=None, help="document to import before the source (e.g. env/setup.zs)")
+_options_parser.add_argument("-s", "--snapshot", default=None, help="restore the bootstrapped environment from this file, or save it there if it doesn't exist")
+_options_parser.add_argument("--timings", type=_output, default=None, metavar="PATH", help="record phase timings and counters, and write them as JSON to PATH (or print them if PATH is -)")
+_options_parser.add_argument("--profile", default=None, metavar="PATH", help="sample the Z# call stack while compiling and write it to PATH as collapsed stacks (for flame graphs)")
+_options_parser.add_argument("--memory-profile", type=_output, default=None, metavar="PATH", help="like --timings, but also trace the memory allocated per phase and document, and the source lines that allocated it")
+_options_parser.add_argument("--max-instructions", type=int, default=None, metavar="N", help="stop running the Z# code of a compilation after N instructions")
+_options_parser.add_argument("--max-depth", type=int, default=None, metavar="N", help="stop running the Z# code of a compilation once calls are nested more than N deep")
+_options_parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS", help="stop running the Z# code of a compilation after this many seconds")
+_options_parser.add_argument("--max-scope-size", type=int, default=None, metavar="N", help="stop running the Z# code of a compilation once a scope defines more than N names")
+_options_parser.add_argument("--coverage", type=_output, default=None, metavar="PATH", help="record which lines of Z# code ran, and merge them into the JSON coverage data at PATH (or print a summary if PATH is -)")
+_options_parser.add_argument("--lcov", default=None, metavar="PATH", help="record which lines of Z# code ran, and write them to PATH in the LCOV format")
 _options_parser.add_argument("source")
 _options_parser.set_defaults(constructor=Options.from_args)
 
@@ -88,7 +257,30 @@ _new_project_parser.add_argument("project_name")
 _new_project_parser.add_argument("--src", action="store_true")
 _new_project_parser.set_defaults(constructor=InitOptions.from_args)
 
+_serve_parser = _sub_parsers.add_parser("serve", help="keep a compiler running and serve compile requests over a local socket")
+_serve_parser.add_argument("--socket", default=None)
+_serve_parser.set_defaults(constructor=ServeOptions.from_args)
+
+_client_parser = _sub_parsers.add_parser("client", help="forward the arguments of the `c` command to a running compile server")
+_client_parser.add_argument("--socket", default=None)
+_client_parser.add_argument("args", nargs=REMAINDER)
+_client_parser.set_defaults(constructor=ClientOptions.from_args)
+
 
-def get_options() -> Options | InitOptions:
-    args, rest = _arg_parser.parse_known_args()
+def get_options(
+        args: list[str] = None,
+        *,
+        exit_on_error: bool = True
+) -> Options | InitOptions | ServeOptions | ClientOptions:
+    """
+    Parse the given command line arguments. Invalid arguments print the usage and exit, like argparse does,
+    unless `exit_on_error` is false, in which case an `OptionsError` is raised instead.
+    """
+    try:
+        args, rest = _arg_parser.parse_known_args(args)
+    except OptionsError as e:
+        if not exit_on_error:
+            raise
+        e.parser.print_usage(sys.stderr)
+        e.parser.exit(2, f"{e.parser.prog}: error: {e}\n")
     return args.constructor(args, rest)
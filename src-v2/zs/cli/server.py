@@ -0,0 +1,98 @@
+import json
+import os
+import socket
+import socketserver
+import tempfile
+from typing import Callable, Iterable, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..processing import Message
+
+
+__all__ = [
+    "CompileServer",
+    "default_socket_path",
+    "encode_message",
+    "send_request",
+]
+
+
+# A request is a single JSON line: {"cwd": str, "args": list[str]}
+# The response is a stream of JSON lines, each one of:
+#   {"message": {"processor": str | null, "type": str, "origin": str, "content": str, "count": int}}
+#   {"done": true, "success": bool, "error": str | null}
+RequestHandler = Callable[[str, list[str]], Iterable[dict]]
+
+
+def default_socket_path() -> str:
+    return os.path.join(tempfile.gettempdir(), f"zs-{os.getuid()}.sock")
+
+
+def encode_message(message: "Message") -> dict:
+    return {
+        "message": {
+            "processor": None if message.processor is None else type(message.processor).__name__,
+            "type": str(message.type.value),
+            "origin": str(message.origin),
+            "content": str(message.content),
+            "count": message.count,
+        }
+    }
+
+
+class _StreamRequestHandler(socketserver.StreamRequestHandler):
+    server: "CompileServer"
+
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        try:
+            for event in self.server.handler(request["cwd"], request["args"]):
+                self._send(event)
+        except (Exception, SystemExit) as e:
+            # a failing request must not take the server down with it
+            self._send({"done": True, "success": False, "error": f"{type(e).__name__}: {e}"})
+
+    def _send(self, event: dict):
+        self.wfile.write(json.dumps(event).encode() + b"\n")
+        self.wfile.flush()
+
+
+class CompileServer(socketserver.UnixStreamServer):
+    """
+    Serves compile requests over a local Unix socket, one request at a time.
+
+    The handler is called with the client's working directory and its command line arguments and yields
+    the events to stream back to the client.
+    """
+
+    handler: RequestHandler
+
+    def __init__(self, path: str, handler: RequestHandler):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _StreamRequestHandler)
+        self.handler = handler
+
+    def server_bind(self):
+        # only the user running the server may connect to it
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            ...
+
+
+def send_request(path: str, args: list[str], cwd: str = None) -> Iterator[dict]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall(json.dumps({"cwd": cwd or os.getcwd(), "args": args}).encode() + b"\n")
+        with client.makefile("rb") as stream:
+            for line in stream:
+                yield json.loads(line)
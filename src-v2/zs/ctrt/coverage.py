@@ -0,0 +1,254 @@
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .instructions import Instruction
+
+if TYPE_CHECKING:
+    from ..std.processing.toolchain import Toolchain
+
+
+__all__ = [
+    "Coverage",
+    "DocumentCoverage",
+]
+
+
+EXECUTABLE = 1
+COVERED = 2
+
+
+class DocumentCoverage:
+    """
+    The coverage of a single document.
+
+    Lines are kept in a bytearray indexed by line number, and spans (the start of the node an instruction was
+    created from) in a dict keyed by (line, column). Both hold the `EXECUTABLE` and `COVERED` flags, so
+    merging two coverages is a bitwise or.
+    """
+
+    _path: str
+    _lines: bytearray
+    _spans: dict[tuple[int, int], int]
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lines = bytearray()
+        self._spans = {}
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def executable_lines(self) -> list[int]:
+        return [line for line, flags in enumerate(self._lines) if flags]
+
+    @property
+    def covered_lines(self) -> list[int]:
+        return [line for line, flags in enumerate(self._lines) if flags & COVERED]
+
+    @property
+    def missing_lines(self) -> list[int]:
+        return [line for line, flags in enumerate(self._lines) if flags == EXECUTABLE]
+
+    @property
+    def spans(self):
+        return self._spans
+
+    @property
+    def percent(self) -> float:
+        executable = len(self.executable_lines)
+        return 100.0 if not executable else 100 * len(self.covered_lines) / executable
+
+    def mark(self, line: int, column: int, flags: int):
+        self._mark_line(line, flags)
+        self._spans[line, column] = self._spans.get((line, column), 0) | flags
+
+    def _mark_line(self, line: int, flags: int):
+        if line >= len(self._lines):
+            self._lines.extend(bytes(line + 1 - len(self._lines)))
+        self._lines[line] |= flags
+
+    def merge(self, other: "DocumentCoverage"):
+        if len(other._lines) > len(self._lines):
+            self._lines.extend(bytes(len(other._lines) - len(self._lines)))
+        for line, flags in enumerate(other._lines):
+            self._lines[line] |= flags
+        for span, flags in other._spans.items():
+            self._spans[span] = self._spans.get(span, 0) | flags
+
+    def to_dict(self) -> dict:
+        return {
+            "executable": self.executable_lines,
+            "covered": self.covered_lines,
+            "spans": [[line, column, int(bool(flags & COVERED))] for (line, column), flags in sorted(self._spans.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, path: str, data: dict) -> "DocumentCoverage":
+        result = cls(path)
+        for line in data.get("executable", ()):
+            result._mark_line(line, EXECUTABLE)
+        for line in data.get("covered", ()):
+            result._mark_line(line, EXECUTABLE | COVERED)
+        for line, column, covered in data.get("spans", ()):
+            result._spans[line, column] = EXECUTABLE | (COVERED if covered else 0)
+        return result
+
+
+def _instructions(ir, visited: set):
+    """
+    The instructions in a preprocessed node that aren't in `visited` yet, nested ones included.
+    """
+    stack = [ir]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Instruction):
+            if item in visited:
+                continue
+            visited.add(item)
+            yield item
+            stack.extend(vars(item).values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+
+
+class Coverage:
+    """
+    Line and span coverage of Z# code run on the compile-time interpreter.
+
+    While attached to a toolchain, every node the preprocessor lowers marks the lines of the instructions
+    made from it as executable, and every instruction the interpreter executes marks its line as covered.
+    A node is only looked up the first time one of its instructions runs, after that an instruction costs
+    a set lookup. The preprocessor lowers nested nodes before their parents, so instructions that were
+    already seen are skipped when a parent's result is walked.
+
+    Coverages can be merged, so the results of several runs can be combined, and exported as JSON or in the
+    LCOV format.
+
+    The instructions and nodes that were already looked at are only remembered while attached.
+    """
+
+    _documents: dict[str, DocumentCoverage]
+    _seen: set
+    _lowered: set[Instruction]
+    _toolchain: "Toolchain | None"
+
+    def __init__(self):
+        self._documents = {}
+        self._seen = {None}
+        self._lowered = set()
+        self._toolchain = None
+
+    @property
+    def documents(self):
+        return self._documents
+
+    def document(self, path: str | Path) -> DocumentCoverage:
+        path = str(path)
+        try:
+            return self._documents[path]
+        except KeyError:
+            result = self._documents[path] = DocumentCoverage(path)
+            return result
+
+    def attach(self, toolchain: "Toolchain"):
+        if self._toolchain is not None:
+            raise RuntimeError("Coverage is already being collected")
+        toolchain.hooks.subscribe("preprocess", self._on_preprocess)
+        toolchain.hooks.subscribe("instruction", self._on_instruction)
+        self._toolchain = toolchain
+
+    def detach(self):
+        if self._toolchain is None:
+            return
+        self._toolchain.hooks.unsubscribe("instruction", self._on_instruction)
+        self._toolchain.hooks.unsubscribe("preprocess", self._on_preprocess)
+        self._toolchain = None
+        # the recorded lines are all that's kept, so the instructions and nodes can be freed
+        self._seen = {None}
+        self._lowered = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.detach()
+
+    def merge(self, other: "Coverage"):
+        for path, document in other._documents.items():
+            self.document(path).merge(document)
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps({
+            "version": 1,
+            "documents": {path: document.to_dict() for path, document in sorted(self._documents.items())}
+        }, **kwargs)
+
+    @classmethod
+    def from_json(cls, text: str) -> "Coverage":
+        data = json.loads(text)
+        if data.get("version") != 1:
+            raise ValueError(f"Unsupported coverage data version: {data.get('version')}")
+        result = cls()
+        for path, document in data["documents"].items():
+            result._documents[path] = DocumentCoverage.from_dict(path, document)
+        return result
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Coverage":
+        return cls.from_json(Path(path).read_text())
+
+    def save(self, path: str | Path, *, merge: bool = True):
+        """
+        Write the coverage as JSON to the given path. If `merge` is set, the coverage already saved there is
+        merged into it first.
+        """
+        path = Path(path)
+        if merge and path.exists():
+            self.merge(Coverage.load(path))
+        path.write_text(self.to_json(indent=2))
+
+    def to_lcov(self, test_name: str = "") -> str:
+        records = []
+        for path, document in sorted(self._documents.items()):
+            executable = document.executable_lines
+            covered = set(document.covered_lines)
+            records.append('\n'.join([
+                f"TN:{test_name}",
+                f"SF:{path}",
+                *(f"DA:{line},{int(line in covered)}" for line in executable),
+                f"LF:{len(executable)}",
+                f"LH:{len(covered)}",
+                "end_of_record",
+            ]))
+        return '\n'.join(records) + '\n' if records else ""
+
+    def write_lcov(self, path: str | Path, test_name: str = ""):
+        Path(path).write_text(self.to_lcov(test_name))
+
+    def format_summary(self) -> str:
+        lines = [f"{'document':<60} {'lines':>7} {'missed':>7} {'cover':>7}"]
+        for path, document in sorted(self._documents.items()):
+            lines.append(
+                f"{path:<60} {len(document.executable_lines):7} {len(document.missing_lines):7} {document.percent:6.1f}%"
+            )
+        return '\n'.join(lines)
+
+    def _mark(self, node, flags: int):
+        if (span := getattr(node, "span", None)) is None or span.document is None:
+            return
+        self.document(span.document.path_string).mark(span.start.line, span.start.column, flags)
+
+    def _on_preprocess(self, _, result):
+        for inst in _instructions(result, self._lowered):
+            if (node := inst.node) is not None:
+                self._mark(node, EXECUTABLE)
+
+    def _on_instruction(self, inst):
+        node = getattr(inst, "node", None)
+        if node in self._seen:
+            return
+        self._seen.add(node)
+        self._mark(node, EXECUTABLE | COVERED)
@@ -0,0 +1,61 @@
+from contextlib import contextmanager
+
+from zs.ast.node import Node
+from zs.engine import ExecutionEngine
+from zs.processing import State
+from .interpreter import Interpreter
+from .pp import Preprocessor
+
+
+__all__ = [
+    "CTRTEngine",
+]
+
+
+class CTRTEngine(ExecutionEngine):
+    """
+    Preprocesses nodes into compile-time IR and runs them on the compile-time runtime interpreter.
+    """
+
+    name = "run"
+
+    _interpreter: Interpreter
+    _preprocessor: Preprocessor
+
+    def __init__(self, state: State, interpreter: Interpreter = None, preprocessor: Preprocessor = None):
+        self._interpreter = interpreter or Interpreter(state)
+        self._preprocessor = preprocessor or Preprocessor(state)
+
+    @property
+    def interpreter(self):
+        return self._interpreter
+
+    @property
+    def preprocessor(self):
+        return self._preprocessor
+
+    @property
+    def import_system(self):
+        return self._interpreter.import_system
+
+    @property
+    def limits(self):
+        return self._interpreter.limits
+
+    @limits.setter
+    def limits(self, limits):
+        self._interpreter.limits = limits
+
+    def restart_limits(self):
+        self._interpreter.restart_limits()
+
+    def define(self, name: str, value):
+        self._interpreter.x.global_scope.name(name, value, new=True)
+
+    @contextmanager
+    def document(self, context):
+        with self._interpreter.x.scope() as scope, context.document(scope):
+            yield scope
+
+    def execute(self, node: Node):
+        return self._interpreter.execute(self._preprocessor.preprocess(node), runtime=False)
@@ -1,11 +1,17 @@
+import asyncio
+import os
+import threading
 from contextlib import contextmanager
 from functools import singledispatchmethod, partial
+from inspect import isawaitable
 from pathlib import Path
+from typing import Awaitable, Coroutine
 
 from zs.processing import State, StatefulProcessor
 from .context import Scope, DELETE, UNDEFINED
 from .instructions import Instruction, SetLocal, Call, Name, Import, EnterScope, ExitScope, DeleteName, Do, Raw, RawCall
 from .lib import Function, CodeGenFunction
+from .limits import ExecutionLimits, guard
 from .. import Object
 from ..ast import node_lib
 from ..std.processing.import_system import ImportSystem, ImportResult
@@ -42,12 +48,61 @@ def _get_dict_from_import_result(node: Import, result: ImportResult):
 SENTINEL = object()
 
 
+# how many tasks may have a thread at the same time, see `Interpreter.execute_async`. like the default of
+# `ThreadPoolExecutor`, a few more than there are cores, since most tasks wait for I/O rather than run
+TASK_THREADS = min(32, (os.cpu_count() or 1) + 4)
+
+
+async def _resolve(awaitable):
+    return await awaitable
+
+
+async def _gathering(gather: "_Gather", slots: asyncio.Semaphore):
+    # a task waiting for the tasks it gathered gives them its thread slot, or nested gathers would deadlock
+    slots.release()
+    try:
+        return await gather
+    finally:
+        await slots.acquire()
+
+
+def _settle(future: asyncio.Future, result=None, exception: BaseException = None):
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+class _Gather:
+    """
+    Awaits Z# functions as concurrent tasks. Nothing is started before this is awaited, so a gather that never
+    is (e.g. because it was called outside of a task) leaves no coroutines behind.
+    """
+
+    __slots__ = ("_interpreter", "_functions", "_scope")
+
+    def __init__(self, interpreter: "Interpreter", functions: tuple[Function, ...], scope: Scope):
+        self._interpreter = interpreter
+        self._functions = functions
+        self._scope = scope
+
+    def __await__(self):
+        return self._gather().__await__()
+
+    async def _gather(self):
+        return list(await asyncio.gather(*(
+            self._interpreter.execute_async(function, scope=self._scope, execute=True) for function in self._functions
+        )))
+
+
 class Frame(Scope):
     function: Function
     args: list[Object]
 
-    def __init__(self, function: Function, args: list[Object]):
-        super().__init__(function.scope)
+    def __init__(self, function: Function, args: list[Object], parent: Scope = None):
+        super().__init__(function.scope if parent is None else parent)
         self.function = function
         self.args = args
 
@@ -102,6 +157,16 @@ class InterpreterState:
 
         return _(scope_)
 
+    def switch(self, frames: list[Scope], scope: Scope) -> tuple[list[Scope], Scope]:
+        """
+        Replace the call stack and the current scope, and return the previous ones. Used to switch between
+        tasks. The frames list itself is kept, since others hold on to it.
+        """
+        previous = self._frames[:], self._scope
+        self._frames[:] = frames
+        self._scope = scope
+        return previous
+
     def enter_scope(self, scope: Scope = None):
         if scope is None:
             scope = Scope(self._scope)
@@ -118,12 +183,33 @@ class InterpreterState:
 
 
 class Interpreter(StatefulProcessor):
+    _limits: ExecutionLimits | None
+    _guard: tuple | None
+    _lock: threading.Lock
+    _owner: int | None
+    _tasks: int
+    _task: threading.local
+    _slots: asyncio.Semaphore | None
+
     def __init__(self, state: State):
         super().__init__(state)
         self._x = InterpreterState()
         self._import_system = ImportSystem()
+        self._limits = None
+        self._guard = None
+        self._lock = threading.Lock()
+        self._owner = None
+        self._tasks = 0
+        self._task = threading.local()
+        self._slots = None
 
     def execute(self, inst: Object, *args, scope=None, runtime=True, **kwargs):
+        # only one thread runs Z# code at a time, see `execute_async`
+        if self._owner != threading.get_ident():
+            with self._entered():
+                # not through the instance, whose wrappers (hooks, limits) already saw this call
+                return type(self).execute(self, inst, *args, scope=scope, runtime=runtime, **kwargs)
+
         self.run()
         with self._x.scope(scope or self._x.local_scope):
             if runtime:
@@ -143,6 +229,141 @@ class Interpreter(StatefulProcessor):
     def x(self):
         return self._x
 
+    @property
+    def limits(self):
+        return self._limits
+
+    @limits.setter
+    def limits(self, limits: ExecutionLimits | None):
+        """
+        Enforce the given limits on the code this interpreter executes, by replacing `execute` on this instance
+        with a guarded one. Without limits, the unguarded method is used again.
+        """
+        if self._guard is not None:
+            guarded, _, shadowed = self._guard
+            if vars(self).get("execute") is not guarded:
+                raise RuntimeError("Can't change the limits while `execute` is wrapped by something else")
+            if shadowed is None:
+                del self.execute
+            else:
+                self.execute = shadowed
+            self._guard = None
+
+        self._limits = limits
+        if limits is not None:
+            shadowed = vars(self).get("execute")
+            guarded, restart = guard(self.execute, self._x, limits)
+            self.execute = guarded
+            self._guard = guarded, restart, shadowed
+
+    def execute_async(self, inst: Object, *args, scope=None, **kwargs) -> Coroutine:
+        """
+        Execute an instruction as a task of the running event loop, and return a coroutine of its result.
+
+        The interpreter recurses through Python frames, so a task can't be suspended on the event loop itself.
+        Instead, every running task has a thread of its own, and an interpreter lock lets only one thread run Z#
+        code at a time. Every call to `execute` takes the lock, from tasks and from anywhere else. When a native
+        function returns an awaitable, the task releases the lock and waits for it on the event loop, so Z# code
+        doing I/O through async natives runs concurrently.
+
+        At most `TASK_THREADS` tasks have a thread at the same time, the others wait for one on the event loop.
+        A task waiting for a `gather` gives its slot to the gathered tasks while it waits.
+
+        Native functions may start threads that run Z# code, but must not wait for them: the calling thread
+        holds the interpreter lock until the native returns, so joining such a thread deadlocks.
+
+        The task starts in the given scope, or in the current scope at the time of this call.
+        """
+        return self._execute_task(inst, args, kwargs, scope or self._x.local_scope)
+
+    def gather(self, *functions: Function) -> Awaitable[list]:
+        """
+        Call the given functions (which take no arguments) as concurrent tasks. Returns an awaitable of the list
+        of their results, so Z# code running in a task waits for all of them. The tasks are only created once
+        it's awaited.
+        """
+        return _Gather(self, functions, self._x.local_scope)
+
+    @contextmanager
+    def _entered(self):
+        self._lock.acquire()
+        self._owner = threading.get_ident()
+        try:
+            yield
+        finally:
+            self._owner = None
+            self._lock.release()
+
+    async def _execute_task(self, inst: Object, args: tuple, kwargs: dict, scope: Scope):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def run():
+            task = self._task
+            task.loop = loop
+            task.slots = slots
+            try:
+                with self._entered():
+                    task.outer = self._x.switch([], scope)
+                    try:
+                        result = self.execute(inst, *args, scope=scope, runtime=False, **kwargs)
+                    finally:
+                        self._x.switch(*task.outer)
+            except BaseException as e:
+                loop.call_soon_threadsafe(_settle, future, None, e)
+            else:
+                loop.call_soon_threadsafe(_settle, future, result)
+            finally:
+                task.loop = task.slots = None
+
+        # native results are only checked for awaitables while there are tasks
+        if self._tasks == 0:
+            self._call_native = self._call_native_async
+            self._slots = asyncio.Semaphore(TASK_THREADS)
+        self._tasks += 1
+        slots = self._slots
+        try:
+            async with slots:
+                threading.Thread(target=run, name="zs-task", daemon=True).start()
+                return await future
+        finally:
+            self._tasks -= 1
+            if self._tasks == 0:
+                del self._call_native
+                self._slots = None
+
+    def _call_native(self, callable_, args):
+        return callable_(*args)
+
+    def _call_native_async(self, callable_, args):
+        result = callable_(*args)
+        if isawaitable(result) and getattr(self._task, "loop", None) is not None:
+            return self._await(result)
+        return result
+
+    def _await(self, awaitable):
+        task = self._task
+        own = self._x.switch(*task.outer)
+        self._owner = None
+        self._lock.release()
+        try:
+            if isinstance(awaitable, _Gather):
+                coroutine = _gathering(awaitable, task.slots)
+            else:
+                coroutine = _resolve(awaitable)
+            return asyncio.run_coroutine_threadsafe(coroutine, task.loop).result()
+        finally:
+            self._lock.acquire()
+            self._owner = threading.get_ident()
+            task.outer = self._x.switch(*own)
+
+    def restart_limits(self):
+        """
+        Restart the instruction budget and the deadline, e.g. before compiling another document.
+        """
+        if self._guard is not None:
+            self._guard[1]()
+
     _exec = _execute.register
 
     @_exec
@@ -186,6 +407,7 @@ class Interpreter(StatefulProcessor):
                         f"Anonymous function called with an improper amount of arguments. Expected: {len(callable_.parameters)}, Got: {len(inst.args)}",
                         callable_.node or callable_
                     )
+                return inst
             else:
                 frame = Frame(callable_, inst.args)
                 args = list(map(partial(self.execute, runtime=False), inst.args))
@@ -202,7 +424,7 @@ class Interpreter(StatefulProcessor):
             self.state.error(f"The base interpreter may only execute native functions!", inst)
             return inst
 
-        return self.execute(callable_(*map(partial(self.execute, runtime=False), inst.args)), runtime=False)
+        return self.execute(self._call_native(callable_, list(map(partial(self.execute, runtime=False), inst.args))), runtime=False)
 
     @_exec
     def _(self, inst: RawCall):
@@ -219,7 +441,7 @@ class Interpreter(StatefulProcessor):
                     parent = self._x.frames[-1]
                 except IndexError:
                     parent = self._x.global_scope
-                with self._x.scope(Scope(parent)) as scope, self._x.frame(scope):
+                with self._x.scope(Frame(callable_, inst.args, parent)) as scope, self._x.frame(scope):
                     for argument, parameter in zip(inst.args, callable_.parameters):
                         scope.name(str(parameter.name), argument)
 
@@ -232,7 +454,7 @@ class Interpreter(StatefulProcessor):
             self.state.error(f"The base interpreter may only execute native functions!", inst)
             return inst
 
-        return callable_(*inst.args)
+        return self._call_native(callable_, inst.args)
 
     @_exec
     def _(self, fn: Function, *args, execute=False):
@@ -244,7 +466,7 @@ class Interpreter(StatefulProcessor):
     def _(self, inst: Name):
         result = self._x.local(inst.name)
         if result is UNDEFINED:
-            self.state.error(f"Could not resolve name \"{inst.name}\"", inst)
+            self.state.error("Could not resolve name \"{}\"", inst, inst.name)
         return result
 
     @_exec
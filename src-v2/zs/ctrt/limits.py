@@ -0,0 +1,129 @@
+import sys
+import time
+from typing import Callable, TYPE_CHECKING
+
+from .. import EmptyObject, Object
+from ..errors import ExecutionLimitExceeded
+
+if TYPE_CHECKING:
+    from .interpreter import InterpreterState
+
+
+__all__ = [
+    "ExecutionLimits",
+]
+
+
+class ExecutionLimits(EmptyObject):
+    """
+    Limits on the Z# code run by a single compilation (see `Interpreter.limits`).
+
+    The instruction budget and the call depth are checked on every instruction. The deadline and the size of
+    the current scope are only checked every `check_interval` instructions, which keeps the checks cheap,
+    so they may be exceeded by that many instructions.
+    """
+
+    _max_instructions: int | None
+    _max_depth: int | None
+    _timeout: float | None
+    _max_scope_size: int | None
+    _check_interval: int
+
+    def __init__(
+            self,
+            *,
+            max_instructions: int = None,
+            max_depth: int = None,
+            timeout: float = None,
+            max_scope_size: int = None,
+            check_interval: int = 1024
+    ):
+        super().__init__()
+        self._max_instructions = max_instructions
+        self._max_depth = max_depth
+        self._timeout = timeout
+        self._max_scope_size = max_scope_size
+        self._check_interval = check_interval
+
+    @property
+    def max_instructions(self):
+        return self._max_instructions
+
+    @property
+    def max_depth(self):
+        return self._max_depth
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @property
+    def max_scope_size(self):
+        return self._max_scope_size
+
+    @property
+    def check_interval(self):
+        return self._check_interval
+
+
+def _origin(inst: Object, x: "InterpreterState") -> Object | None:
+    # synthesized instructions have no node, the function being executed points to the source instead
+    if getattr(inst, "node", None) is not None:
+        return inst
+    for frame in reversed(x.frames):
+        if getattr(function := getattr(frame, "function", None), "node", None) is not None:
+            return function
+    return inst if isinstance(inst, Object) else None
+
+
+def guard(execute: Callable, x: "InterpreterState", limits: ExecutionLimits) -> tuple[Callable, Callable[[], None]]:
+    """
+    Wrap an interpreter's `execute` so that it enforces the given limits. Returns the wrapper, and a function
+    that restarts the instruction budget and the deadline.
+    """
+    max_instructions = limits.max_instructions if limits.max_instructions is not None else sys.maxsize
+    max_depth = limits.max_depth if limits.max_depth is not None else sys.maxsize
+    timeout = limits.timeout
+    max_scope_size = limits.max_scope_size
+    interval = max(1, limits.check_interval)
+    frames = x.frames
+
+    steps = 0
+    next_check = 0
+    deadline = None
+
+    def restart():
+        nonlocal steps, next_check, deadline
+        steps = 0
+        next_check = min(interval, max_instructions)
+        deadline = None if timeout is None else time.perf_counter() + timeout
+
+    def check(inst):
+        nonlocal next_check
+        if steps > max_instructions:
+            raise ExecutionLimitExceeded(
+                "instructions", f"Execution limit exceeded: more than {max_instructions} instructions", _origin(inst, x)
+            )
+        if deadline is not None and time.perf_counter() > deadline:
+            raise ExecutionLimitExceeded(
+                "timeout", f"Execution limit exceeded: ran for more than {timeout} seconds", _origin(inst, x)
+            )
+        if max_scope_size is not None and len(x.local_scope.items) > max_scope_size:
+            raise ExecutionLimitExceeded(
+                "scope", f"Execution limit exceeded: a scope has more than {max_scope_size} names", _origin(inst, x)
+            )
+        next_check = min(steps + interval, max_instructions + 1)
+
+    def guarded(inst, *args, **kwargs):
+        nonlocal steps
+        steps += 1
+        if steps >= next_check:
+            check(inst)
+        if len(frames) > max_depth:
+            raise ExecutionLimitExceeded(
+                "depth", f"Execution limit exceeded: calls are nested more than {max_depth} deep", _origin(inst, x)
+            )
+        return execute(inst, *args, **kwargs)
+
+    restart()
+    return guarded, restart
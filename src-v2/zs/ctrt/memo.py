@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from typing import Callable
+
+from .lib import Function
+
+
+__all__ = [
+    "MemoizedFunction",
+]
+
+
+_MISSING = object()
+
+
+class _Identity:
+    """
+    Keys an unhashable argument by its identity, and keeps it alive for as long as the cache entry exists
+    (so its id can't be reused by another object).
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return id(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, _Identity) and other.value is self.value
+
+
+def _key(args: tuple) -> tuple:
+    key = []
+    for arg in args:
+        try:
+            hash(arg)
+        except TypeError:
+            arg = _Identity(arg)
+        key.append(arg)
+    return tuple(key)
+
+
+class MemoizedFunction:
+    """
+    A Z# function with an LRU cache of its results, keyed on its arguments.
+
+    Arguments are compared by value if they're hashable, and by identity otherwise. Only use this for pure
+    functions: a cached call doesn't run the function at all.
+
+    A memoized function is called like a native function, so the interpreter evaluates the arguments before
+    they reach the cache; `execute` runs the wrapped function with them on a miss.
+    """
+
+    _function: Function
+    _execute: Callable
+    _max_size: int | None
+    _cache: OrderedDict
+    _hits: int
+    _misses: int
+
+    def __init__(self, function: Function, execute: Callable, max_size: int | None = 128):
+        if not isinstance(function, Function):
+            raise TypeError(f"Can only memoize Z# functions, not {type(function).__name__}")
+        if max_size is not None and max_size < 0:
+            raise ValueError("The cache size must not be negative")
+
+        self._function = function
+        self._execute = execute
+        self._max_size = max_size
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def function(self):
+        return self._function
+
+    @property
+    def name(self):
+        return self._function.name
+
+    @property
+    def node(self):
+        return self._function.node
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @property
+    def size(self):
+        return len(self._cache)
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def __call__(self, *args):
+        key = _key(args)
+        try:
+            result = self._cache[key]
+        except KeyError:
+            ...
+        else:
+            self._hits += 1
+            self._cache.move_to_end(key)
+            return result
+
+        self._misses += 1
+        result = self._execute(self._function, *args)
+
+        if self._max_size != 0:
+            self._cache[key] = result
+            if self._max_size is not None and len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def invalidate(self, *args) -> bool:
+        """
+        Drop the cached result for the given arguments. Returns whether there was one.
+        """
+        return self._cache.pop(_key(args), _MISSING) is not _MISSING
+
+    def clear(self):
+        """
+        Drop all cached results. The statistics are kept.
+        """
+        self._cache.clear()
+
+    def reset_stats(self):
+        self._hits = self._misses = 0
+
+    def __repr__(self):
+        return (
+            f"<memoized {self._function.name or '<anonymous>'}: {self.size}/{self._max_size} cached, "
+            f"{self._hits} hits, {self._misses} misses>"
+        )
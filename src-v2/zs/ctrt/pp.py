@@ -106,7 +106,7 @@ class Preprocessor(StatefulProcessor):
 
     @_pp
     def _(self, node: node_lib.Identifier):
-        return Name(str(node.name))
+        return Name(str(node.name), node)
 
     @_pp
     def _(self, node: node_lib.Import):
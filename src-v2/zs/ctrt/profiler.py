@@ -0,0 +1,162 @@
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+from .interpreter import Interpreter, Frame
+from .lib import Function
+
+
+__all__ = [
+    "Profiler",
+]
+
+
+_EXECUTE = Interpreter.execute.__code__
+
+
+def _get_span(obj):
+    node = getattr(obj, "node", None)
+    return getattr(node, "span", None)
+
+
+class Profiler:
+    """
+    A sampling profiler for Z# code running on the compile-time interpreter.
+
+    A background thread periodically looks at the Z# call stack (`interpreter.x.frames`) and, if `lines` is
+    set, at the instruction the interpreter is currently executing. Samples are grouped by stack, rooted at
+    the document that was being executed, and can be written in the collapsed-stack format used by flame
+    graph tools.
+
+    Nothing is added to the interpreter itself, so profiling only costs the time it takes to take a sample.
+    """
+
+    _interpreter: Interpreter
+    _interval: float
+    _lines: bool
+    _thread: int
+    _samples: Counter[tuple[str, ...]]
+    _labels: dict[Function, str]
+    _sampler: threading.Thread | None
+    _stop: threading.Event
+
+    def __init__(self, interpreter: Interpreter, interval: float = 0.001, *, lines: bool = True):
+        self._interpreter = interpreter
+        self._interval = interval
+        self._lines = lines
+        self._thread = threading.get_ident()
+        self._samples = Counter()
+        self._labels = {}
+        self._sampler = None
+        self._stop = threading.Event()
+
+    @property
+    def samples(self):
+        return self._samples
+
+    @property
+    def running(self):
+        return self._sampler is not None
+
+    def start(self, thread: threading.Thread = None):
+        """
+        Start sampling the interpreter while it runs on the given thread (the current thread by default).
+        """
+        if self._sampler is not None:
+            raise RuntimeError("The profiler is already running")
+
+        self._thread = (thread or threading.current_thread()).ident
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run, name="zs-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        if self._sampler is None:
+            return
+        self._stop.set()
+        self._sampler.join()
+        self._sampler = None
+
+    def clear(self):
+        self._samples.clear()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def sample(self):
+        """
+        Take a single sample. Returns the sampled stack, or None if no Z# code was running.
+        """
+        frames = tuple(self._interpreter.x.frames)
+        stack = [self._label(frame.function) for frame in frames if isinstance(frame, Frame)]
+
+        document = location = None
+        if (python_frame := sys._current_frames().get(self._thread)) is not None:
+            document, location = self._locate(python_frame)
+            del python_frame
+
+        if not stack and location is None:
+            return None
+
+        if document is not None:
+            stack.insert(0, document)
+        if location is not None and self._lines:
+            stack.append(location)
+
+        stack = tuple(stack)
+        self._samples[stack] += 1
+        return stack
+
+    def collapsed(self) -> str:
+        """
+        The samples in the collapsed-stack format, one "frame;frame;frame count" line per stack.
+        """
+        return '\n'.join(
+            f"{';'.join(stack)} {count}" for stack, count in sorted(self._samples.items())
+        )
+
+    def write(self, path: str | Path):
+        Path(path).write_text(self.collapsed() + '\n')
+
+    def top(self, count: int = 10) -> list[tuple[str, int]]:
+        """
+        The frames that were sampled the most while on top of the stack.
+        """
+        own = Counter()
+        for stack, samples in self._samples.items():
+            own[stack[-1]] += samples
+        return own.most_common(count)
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            self.sample()
+
+    def _label(self, function: Function) -> str:
+        try:
+            return self._labels[function]
+        except KeyError:
+            label = function.name or "<anonymous>"
+            if (span := _get_span(function)) is not None:
+                label = f"{label} ({span.location})"
+            self._labels[function] = label.replace(';', ',')
+            return self._labels[function]
+
+    def _locate(self, frame) -> tuple[str | None, str | None]:
+        """
+        Find the document being executed and the location of the instruction being executed, from the Python
+        stack of the interpreter thread.
+        """
+        document = location = None
+        while frame is not None:
+            if frame.f_code is _EXECUTE and (span := _get_span(frame.f_locals.get("inst"))) is not None:
+                if location is None:
+                    location = f"@ {span.location}".replace(';', ',')
+                if span.document is not None:
+                    document = span.document.path_string.replace(';', ',')
+            frame = frame.f_back
+        return document, location
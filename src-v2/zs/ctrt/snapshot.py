@@ -0,0 +1,247 @@
+import importlib
+import io
+import json
+import pickle
+import struct
+from functools import singledispatch
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Mapping
+
+from zs import EmptyObject, __version__
+from zs.base import _METHODS
+from zs.std.processing.import_system import ImportSystem
+from zs.text.file_info import get_stamp
+from zs.text.parser import ContextualParser
+from .context import Scope
+from .lib import ExObj
+
+
+__all__ = [
+    "Snapshot",
+]
+
+
+_MISSING = object()
+
+MAGIC = b"ZSS\x00"
+
+# magic, header size. the header itself is JSON, so it can be read without unpickling anything
+_HEADER = struct.Struct("<4sI")
+
+
+@singledispatch
+def _mutable_state(obj) -> dict | None:
+    """
+    Returns the part of a native object that Z# code can mutate, or None if it is only referenced.
+    """
+    if isinstance(obj, (type, ExObj)):
+        # bound native methods cached on the object are recreated on demand
+        return {name: value for name, value in vars(obj).items() if name != _METHODS}
+    return None
+
+
+@_mutable_state.register
+def _(scope: Scope):
+    return dict(scope.items)
+
+
+@_mutable_state.register
+def _(parser: ContextualParser):
+    return {token: parser.get_parser(token) for token in parser.tokens}
+
+
+@singledispatch
+def _apply(obj, name, value):
+    setattr(obj, name, value)
+
+
+@_apply.register
+def _(scope: Scope, name, value):
+    scope.name(name, value, new=True)
+
+
+@_apply.register
+def _(parser: ContextualParser, _, value):
+    parser.add_parser(value)
+
+
+def _is_importable(cls: type):
+    try:
+        obj = importlib.import_module(cls.__module__)
+        for name in cls.__qualname__.split('.'):
+            obj = getattr(obj, name)
+        return obj is cls
+    except (ImportError, AttributeError):
+        return False
+
+
+def _set_type_state(cls: type, namespace: dict):
+    for name, value in namespace.items():
+        setattr(cls, name, value)
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, file, natives: Mapping[str, Any]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._ids = {id(obj): name for name, obj in natives.items()}
+
+    def persistent_id(self, obj):
+        return self._ids.get(id(obj))
+
+    def reducer_override(self, obj):
+        if isinstance(obj, ModuleType):
+            return importlib.import_module, (obj.__name__,)
+        if isinstance(obj, type) and not _is_importable(obj):
+            # types created at runtime (e.g. by `Python.type(...)`) are serialized by value
+            namespace = {
+                name: value for name, value in vars(obj).items() if name not in ("__dict__", "__weakref__")
+            }
+            return type(obj), (obj.__name__, obj.__bases__, {}), namespace, None, None, _set_type_state
+        return NotImplemented
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, natives: Mapping[str, Any]):
+        super().__init__(file)
+        self._natives = natives
+
+    def persistent_load(self, pid):
+        try:
+            return self._natives[pid]
+        except KeyError:
+            raise pickle.UnpicklingError(f"Snapshot refers to native object \"{pid}\" which was not provided")
+
+
+class Snapshot(EmptyObject):
+    """
+    Captures the environment built by bootstrap code so later runs can restore it instead of re-executing it.
+
+    Native objects (anything provided by the host, such as the compiler, the builtins and the global scope)
+    are never serialized. They are referred to by name and must be provided again when restoring.
+    Changes bootstrap code made to natives (attributes set on classes and Z# objects, names added to scopes
+    and parser rules) are recorded relative to the state when tracking started and re-applied on restore.
+    Everything else reachable from the import cache is serialized with pickle, so the import system must
+    have caching turned on while the bootstrap runs. Restoring turns it on as well.
+
+    An image starts with a JSON header that can be read without any natives: the Z# version, the bootstrap
+    document and the stamps of every imported source. `is_current` uses it to tell whether the image is
+    still valid, or whether the bootstrap has to run again. The pickled body is only loaded by `restore`,
+    after the header was checked.
+    """
+
+    _natives: dict[str, Any]
+    _baseline: dict[str, dict]
+
+    def __init__(self, natives: Mapping[str, Any]):
+        super().__init__()
+        self._natives = dict(natives)
+        self._baseline = {}
+        for name, native in self._natives.items():
+            if (state := _mutable_state(native)) is not None:
+                self._baseline[name] = state
+
+    @property
+    def natives(self):
+        return self._natives
+
+    def capture(self, import_system: ImportSystem, bootstrap: str | Path = None) -> bytes:
+        patches = {}
+        for name, baseline in self._baseline.items():
+            changes = {
+                key: value for key, value in _mutable_state(self._natives[name]).items()
+                if baseline.get(key, _MISSING) is not value
+            }
+            if changes:
+                patches[name] = changes
+
+        header = {
+            "zs": __version__,
+            "bootstrap": None if bootstrap is None else str(Path(bootstrap).resolve()),
+            "stamps": dict(import_system.stamps),
+        }
+        image = {
+            "patches": patches,
+            "imports": dict(import_system.cache),
+            "dependants": {key: set(value) for key, value in import_system.dependants.items()},
+        }
+
+        header_data = json.dumps(header).encode()
+
+        buffer = io.BytesIO()
+        buffer.write(_HEADER.pack(MAGIC, len(header_data)))
+        buffer.write(header_data)
+        _Pickler(buffer, self._natives).dump(image)
+        return buffer.getvalue()
+
+    def save(self, path: str | Path, import_system: ImportSystem, bootstrap: str | Path = None):
+        Path(path).write_bytes(self.capture(import_system, bootstrap))
+
+    @staticmethod
+    def header(image: bytes | io.BufferedIOBase) -> dict | None:
+        """
+        Read the header of an image, or return None if it isn't one. A file is left at the start of the body.
+        """
+        if isinstance(image, bytes):
+            image = io.BytesIO(image)
+
+        data = image.read(_HEADER.size)
+        if len(data) < _HEADER.size:
+            return None
+        magic, size = _HEADER.unpack(data)
+        if magic != MAGIC:
+            return None
+
+        try:
+            header = json.loads(image.read(size))
+        except ValueError:
+            return None
+        if not isinstance(header, dict) or not {"zs", "bootstrap", "stamps"} <= header.keys():
+            return None
+        if not isinstance(header["stamps"], dict):
+            return None
+        return header
+
+    @classmethod
+    def is_current(cls, path: str | Path, bootstrap: str | Path = None) -> bool:
+        """
+        Whether the image at the given path was made by this version of Z#, from the given bootstrap document
+        (if any), and none of the sources it imported changed since.
+        """
+        try:
+            with open(path, "rb") as file:
+                header = cls.header(file)
+        except OSError:
+            return False
+
+        if header is None or header["zs"] != __version__:
+            return False
+        if bootstrap is not None and header["bootstrap"] != str(Path(bootstrap).resolve()):
+            return False
+        return all(stamp == get_stamp(key) for key, stamp in header["stamps"].items())
+
+    @classmethod
+    def restore(cls, image: bytes, import_system: ImportSystem, natives: Mapping[str, Any]):
+        buffer = io.BytesIO(image)
+        if (header := cls.header(buffer)) is None:
+            raise ValueError("Not a snapshot image")
+
+        if header["zs"] != __version__:
+            raise ValueError(f"Snapshot was created by Z# {header['zs']}, but this is Z# {__version__}")
+
+        image = _Unpickler(buffer, natives).load()
+
+        for name, changes in image["patches"].items():
+            native = natives[name]
+            for key, value in changes.items():
+                _apply(native, key, value)
+
+        import_system.caching = True
+        import_system.cache.update(image["imports"])
+        import_system.stamps.update(header["stamps"])
+        for key, dependants in image["dependants"].items():
+            import_system.dependants.setdefault(key, set()).update(dependants)
+
+    @classmethod
+    def load(cls, path: str | Path, import_system: ImportSystem, natives: Mapping[str, Any]):
+        cls.restore(Path(path).read_bytes(), import_system, natives)
@@ -1,6 +1,5 @@
-from collections import OrderedDict
-from enum import Enum
-from typing import TypeVar, Generic
+from collections import deque
+from typing import TypeVar, Generic, Iterable
 
 from zs.processing import State
 
@@ -8,12 +7,6 @@ from zs.processing import State
 T = TypeVar('T')
 
 
-class NodeStatus(Enum):
-    NotVisited = 0
-    Visiting = 1
-    Visited = 2
-
-
 class CircularDependencyException(Exception, Generic[T]):
     _chain: list[T]
 
@@ -26,78 +19,256 @@ class CircularDependencyException(Exception, Generic[T]):
 
 
 class DependencyGraph(Generic[T]):
-    _graph: dict[T, list[T]]
+    """
+    A graph of items and the items they depend on.
+
+    The dependency order groups the items into levels, where every item only depends on items from
+    previous levels. Items are kept in insertion order within a level.
+
+    Levels are kept between updates. Adding or replacing an item marks it dirty, and the next update only
+    re-levels the dirty items and the items that (transitively) depend on them.
+    """
+
+    _graph: dict[T, set[T]]
+    _index: dict[T, int]
+    _dependants: dict[T, set[T]]
+    _levels: dict[T, int]
+    _dirty: set[T]
 
     def __init__(self):
         self._graph = {}
+        self._index = {}
+        self._dependants = {}
+        self._levels = {}
+        self._dirty = set()
+
+    @property
+    def levels(self):
+        return self._levels
+
+    @property
+    def dirty(self):
+        return self._dirty
 
     def get_dependency_order(self, state: State) -> list[list[T]]:
-        visit_status: dict[T, NodeStatus] = {
-            item: NodeStatus.NotVisited for item in self._graph
-        }
-        _levels: dict[T, int] = {}
-        _error_nodes: set[T] = set()
-
-        def _get_max_dependency_level(dependant: T) -> int:
-
-            if visit_status[dependant] == NodeStatus.Visited:
-                return _levels[dependant]
-            visit_status[dependant] = NodeStatus.Visiting
-
-            max_dependency_level = 0
-            max_dependency: T = None
-
-            for dependency in self._graph[dependant]:
-                # if dependency is dependant:
-                #     raise CircularDependencyException[T](dependency)
-
-                dependency_level = 0
-                try:
-                    match visit_status[dependency]:
-                        case NodeStatus.NotVisited:
-                            dependency_level = _get_max_dependency_level(dependency)
-                        case NodeStatus.Visited:
-                            dependency_level = _levels[dependency]
-                        case NodeStatus.Visiting:
-                            raise CircularDependencyException[T]()
-                except CircularDependencyException as _e:
-                    _e.chain.insert(0, dependency)
-                    raise _e
-
-                if dependency_level > max_dependency_level:
-                    max_dependency = max_dependency
-                    max_dependency_level = dependency_level
-
-            if max_dependency is not None and max_dependency_level <= _levels[dependant]:
-                raise CircularDependencyException(f"Circular dependency found: {dependant} <-> {max_dependency}")
-            visit_status[dependant] = NodeStatus.Visited
-            max_dependency_level += 1
-            _levels[dependant] = max_dependency_level
-            return max_dependency_level
+        self.update(state)
 
+        levels = self._levels
+        order: list[list[T]] = [[] for _ in range(max(levels.values(), default=-1) + 1)]
         for item in self._graph:
-            if item in _error_nodes:
-                continue
-            try:
-                _get_max_dependency_level(item)
-            except CircularDependencyException as e:
-                for node in e.chain:
-                    _error_nodes.add(node)
-                e.chain.insert(0, item)
-                state.error(f"Circular dependency detected: {' -> '.join(e.chain)}", item)
+            if (level := levels.get(item)) is not None:
+                order[level].append(item)
 
-        order = OrderedDict[int, list[T]]()
+        return order
 
-        for item, level in _levels.items():
-            if level not in order:
-                order[level] = list[T]()
-            order[level].append(item)
+    def update(self, state: State) -> list[list[T]]:
+        """
+        Re-level the dirty part of the graph and return the items whose level was recomputed, grouped by level
+        in dependency order.
+        """
+        if not self._dirty:
+            return []
 
-        return list[list[T]](order.values())
+        region = self._get_downstream(self._dirty)
+        self._dirty.clear()
+
+        levels = self._get_levels(region)
+
+        for item in region:
+            self._levels.pop(item, None)
+        self._levels.update(levels)
+
+        if len(levels) != len(region):
+            # whatever is left over either is a part of a cycle or depends on one
+            unleveled = sorted((item for item in region if item not in levels), key=self._index.__getitem__)
+            for cycle in self.get_cycles(unleveled):
+                state.error(f"Circular dependency detected: {' -> '.join(map(str, cycle))}", cycle[0])
+
+        changed: list[list[T]] = []
+        for item in sorted(levels, key=lambda item: (levels[item], self._index[item])):
+            if not changed or levels[changed[-1][0]] != levels[item]:
+                changed.append([])
+            changed[-1].append(item)
+
+        return changed
+
+    def get_cycles(self, items: Iterable[T] = None) -> list[list[T]]:
+        """
+        Find the cycles between the given items (all items by default). Every cycle is returned as a path
+        that starts and ends with the same item.
+        """
+        components = self._get_cyclic_components(items)
+        if not components:
+            return []
+
+        # start every cycle at its earliest added item, so the reported paths are stable
+        return [
+            self._get_cycle_path(min(component, key=self._index.__getitem__), set(component)) for component in components
+        ]
 
     def add(self, dependant: T, *dependencies: T):
-        if dependant not in self._graph:
-            self._graph[dependant] = []
-        self._graph[dependant].extend(dependencies)
+        graph = self._graph
+        try:
+            known = graph[dependant]
+        except KeyError:
+            known = self._new(dependant)
+
         for dependency in dependencies:
-            self.add(dependency)
+            if dependency not in graph:
+                self._new(dependency)
+            if dependency not in known:
+                known.add(dependency)
+                self._dependants[dependency].add(dependant)
+                self._dirty.add(dependant)
+
+    def replace(self, dependant: T, *dependencies: T):
+        """
+        Replace the dependencies of the given item, e.g. after it was changed.
+        """
+        if (old := self._graph.get(dependant)) is not None and old != set(dependencies):
+            for dependency in old:
+                self._dependants[dependency].discard(dependant)
+            old.clear()
+            self._dirty.add(dependant)
+        self.add(dependant, *dependencies)
+
+    def mark_dirty(self, *items: T):
+        """
+        Mark the given items as changed, so they and their dependants are re-leveled by the next update.
+        """
+        for item in items:
+            if item not in self._graph:
+                raise KeyError(f"{item} is not a part of the dependency graph")
+            self._dirty.add(item)
+
+    def _new(self, item: T) -> set[T]:
+        self._index[item] = len(self._index)
+        self._dependants[item] = set()
+        self._dirty.add(item)
+        dependencies = self._graph[item] = set()
+        return dependencies
+
+    def _get_downstream(self, items: Iterable[T]) -> set[T]:
+        dependants = self._dependants
+        region = set(items)
+        pending = list(region)
+        while pending:
+            for dependant in dependants[pending.pop()]:
+                if dependant not in region:
+                    region.add(dependant)
+                    pending.append(dependant)
+        return region
+
+    def _get_levels(self, region: set[T]) -> dict[T, int]:
+        """
+        Kahn's algorithm over the given region. Dependencies outside the region keep their current level, and
+        items that depend on an unleveled item outside the region can't be leveled.
+        """
+        graph = self._graph
+        known = self._levels
+
+        remaining: dict[T, int] = {}
+        for item in region:
+            count = 0
+            for dependency in graph[item]:
+                if dependency in region:
+                    count += 1
+                elif dependency not in known:
+                    # depends on a cycle that didn't change
+                    count = -1
+                    break
+            remaining[item] = count
+
+        levels: dict[T, int] = {}
+        queue = deque(item for item, count in remaining.items() if count == 0)
+
+        while queue:
+            item = queue.popleft()
+            levels[item] = max(
+                (levels[dependency] if dependency in levels else known[dependency] for dependency in graph[item]),
+                default=-1
+            ) + 1
+            for dependant in self._dependants[item]:
+                if remaining.get(dependant, 0) > 0:
+                    remaining[dependant] -= 1
+                    if remaining[dependant] == 0:
+                        queue.append(dependant)
+
+        return levels
+
+    def _get_cyclic_components(self, items: Iterable[T] = None) -> list[list[T]]:
+        """
+        Tarjan's strongly connected components, without recursion. Only returns components that form a cycle.
+        """
+        graph = self._graph
+        items = list(graph if items is None else items)
+        allowed = set(items)
+
+        index: dict[T, int] = {}
+        low: dict[T, int] = {}
+        stack: list[T] = []
+        on_stack: set[T] = set()
+        components: list[list[T]] = []
+
+        for root in items:
+            if root in index:
+                continue
+
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(graph[root]))]
+
+            while work:
+                item, dependencies = work[-1]
+                for dependency in dependencies:
+                    if dependency not in allowed:
+                        continue
+                    if dependency not in index:
+                        index[dependency] = low[dependency] = len(index)
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency, iter(graph[dependency])))
+                        break
+                    if dependency in on_stack:
+                        low[item] = min(low[item], index[dependency])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[item])
+                    if low[item] == index[item]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member is item:
+                                break
+                        if len(component) > 1 or item in graph[item]:
+                            components.append(component)
+
+        return components
+
+    def _get_cycle_path(self, start: T, component: set[T]) -> list[T]:
+        graph = self._graph
+
+        # shortest way back to the start, through the component only
+        parents: dict[T, T] = {}
+        queue = deque([start])
+        while queue:
+            item = queue.popleft()
+            for dependency in graph[item]:
+                if dependency == start:
+                    path = [item]
+                    while item in parents:
+                        item = parents[item]
+                        path.append(item)
+                    path.reverse()
+                    path.append(start)
+                    return path
+                if dependency in component and dependency not in parents:
+                    parents[dependency] = item
+                    queue.append(dependency)
+
+        raise CircularDependencyException(*component)
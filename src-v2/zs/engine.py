@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from typing import Callable, ContextManager as _ContextManager, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .ast.node import Node
+    from .ctrt.limits import ExecutionLimits
+    from .processing import State
+    from .std.objects.compilation_environment import ContextManager
+    from .std.processing.import_system import ImportSystem
+
+
+__all__ = [
+    "ExecutionEngine",
+    "available_engines",
+    "get_engine",
+    "register_engine",
+]
+
+
+class ExecutionEngine(ABC):
+    """
+    Executes parsed documents for a `Toolchain`.
+
+    The toolchain parses a document, opens a document scope with `document`, and passes every top-level node
+    to `execute` in order. The scope yielded by `document` is the result of compiling the document.
+
+    An engine also owns the import system its documents import from, and the global names the compiler
+    defines for them. Execution limits are optional: an engine that doesn't support them only accepts `None`.
+    """
+
+    name: str = None
+
+    @property
+    @abstractmethod
+    def import_system(self) -> "ImportSystem": ...
+
+    @abstractmethod
+    def define(self, name: str, value):
+        """
+        Define a global name, visible to every document.
+        """
+
+    @abstractmethod
+    def document(self, context: "ContextManager") -> _ContextManager[object]: ...
+
+    @abstractmethod
+    def execute(self, node: "Node"): ...
+
+    @property
+    def limits(self) -> "ExecutionLimits | None":
+        return None
+
+    @limits.setter
+    def limits(self, limits: "ExecutionLimits | None"):
+        if limits is not None:
+            raise ValueError(f"The \"{self.name}\" engine doesn't support execution limits")
+
+    def restart_limits(self):
+        """
+        Restart the budget of the execution limits, before a document is compiled with everything it imports.
+        """
+
+
+EngineFactory = Callable[["State"], ExecutionEngine]
+
+# engines are registered by the name of their factory, so they are only imported once they're used
+_engines: dict[str, EngineFactory | str] = {
+    "run": "zs.ctrt.engine:CTRTEngine",
+}
+
+
+def register_engine(name: str, factory: EngineFactory | str, *, replace: bool = False):
+    """
+    Register an engine factory (a callable taking the compiler state, or a "module:attribute" path to one)
+    under the given name.
+    """
+    if name in _engines and not replace:
+        raise ValueError(f"Engine \"{name}\" is already registered")
+    _engines[name] = factory
+
+
+def get_engine(name: str) -> EngineFactory:
+    try:
+        factory = _engines[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine \"{name}\" (available: {', '.join(available_engines())})") from None
+
+    if isinstance(factory, str):
+        import importlib
+
+        module, _, attribute = factory.partition(':')
+        factory = _engines[name] = getattr(importlib.import_module(module), attribute)
+
+    return factory
+
+
+def available_engines() -> list[str]:
+    return list(_engines)
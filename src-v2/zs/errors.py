@@ -51,3 +51,29 @@ class UnnamedObjectError(ZSError):
     def __init__(self, obj: Object, *args):
         super().__init__(args)
         self.object = obj
+
+
+class ArchiveFormatError(ZSError):
+    """
+    Raised when a Z# package archive can't be read
+    """
+
+    path: Any
+
+    def __init__(self, path, message: str):
+        super().__init__(f"archive {path}: {message}")
+        self.path = path
+
+
+class ExecutionLimitExceeded(ZSError):
+    """
+    Raised when executing Z# code exceeds one of the interpreter's execution limits
+    """
+
+    limit: str
+    origin: Object | None
+
+    def __init__(self, limit: str, message: str, origin: Object = None):
+        super().__init__(message)
+        self.limit = limit
+        self.origin = origin
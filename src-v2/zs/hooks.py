@@ -0,0 +1,179 @@
+from contextlib import contextmanager
+from typing import Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .std.processing.toolchain import Toolchain
+
+
+__all__ = [
+    "Hooks",
+]
+
+
+def _tokenize(tokenize, callbacks):
+    def wrapper(document):
+        for token in tokenize(document):
+            for callback in callbacks:
+                callback(token)
+            yield token
+
+    return wrapper
+
+
+def _next(next_, callbacks):
+    def wrapper(*args, **kwargs):
+        node = next_(*args, **kwargs)
+        if node is not None:
+            for callback in callbacks:
+                callback(node)
+        return node
+
+    return wrapper
+
+
+def _preprocess(preprocess, callbacks):
+    def wrapper(node):
+        result = preprocess(node)
+        for callback in callbacks:
+            callback(node, result)
+        return result
+
+    return wrapper
+
+
+def _execute(execute, callbacks):
+    def wrapper(inst, *args, **kwargs):
+        for callback in callbacks:
+            callback(inst)
+        return execute(inst, *args, **kwargs)
+
+    return wrapper
+
+
+def _frame(frame_, callbacks):
+    from .ctrt.interpreter import Frame
+
+    def wrapper(frame=None):
+        if isinstance(frame, Frame):
+            for callback in callbacks:
+                callback(frame.function, frame.args)
+        return frame_(frame)
+
+    return wrapper
+
+
+def _import_from(import_from, callbacks):
+    def wrapper(path):
+        result = import_from(path)
+        for callback in callbacks:
+            callback(path, result)
+        return result
+
+    return wrapper
+
+
+_MISSING = object()
+
+# event: (target, attribute, wrapper factory)
+_EVENTS = {
+    "token": ("tokenizer", "tokenize", _tokenize),
+    "node": ("parser", "next", _next),
+    "preprocess": ("preprocessor", "preprocess", _preprocess),
+    "instruction": ("interpreter", "execute", _execute),
+    "call": ("interpreter.x", "frame", _frame),
+    "import": ("import_system", "import_from", _import_from),
+}
+
+
+class Hooks:
+    """
+    Lets tools subscribe to what a toolchain does, as it does it.
+
+    Events and the arguments their callbacks receive:
+        token       (token)             every token produced by the tokenizer
+        node        (node)              every node produced by the parser, inner nodes first
+        preprocess  (node, result)      every node lowered by the preprocessor
+        instruction (instruction)       every instruction, before the interpreter executes it
+        call        (function, args)    every call to a Z# function, before its body runs
+        import      (path, result)      every import, after it was resolved (cached imports included)
+
+    Hooks cost nothing while an event has no subscribers: the first subscriber replaces the method on the
+    processor instance with a wrapper that calls the subscribers, and the original method is put back once
+    the last one unsubscribes. A wrapper that was itself wrapped in the meantime (e.g. by `Instrumentation`)
+    stays installed, without subscribers, until it's unwrapped.
+    """
+
+    EVENTS = tuple(_EVENTS)
+
+    _toolchain: "Toolchain"
+    _callbacks: dict[str, list[Callable]]
+    _installed: dict[str, tuple[object, Callable, object]]
+
+    def __init__(self, toolchain: "Toolchain"):
+        self._toolchain = toolchain
+        self._callbacks = {}
+        self._installed = {}
+
+    def is_active(self, event: str) -> bool:
+        return bool(self._callbacks.get(event))
+
+    def subscribe(self, event: str, callback: Callable) -> Callable:
+        try:
+            callbacks = self._callbacks[event]
+        except KeyError:
+            if event not in _EVENTS:
+                raise ValueError(f"Unknown event \"{event}\" (available: {', '.join(self.EVENTS)})") from None
+            callbacks = self._callbacks[event] = []
+
+        callbacks.append(callback)
+        if event not in self._installed:
+            self._install(event, callbacks)
+        return callback
+
+    def unsubscribe(self, event: str, callback: Callable):
+        callbacks = self._callbacks.get(event, [])
+        try:
+            callbacks.remove(callback)
+        except ValueError:
+            raise ValueError(f"{callback} is not subscribed to \"{event}\"") from None
+
+        if not callbacks:
+            self._uninstall(event)
+
+    @contextmanager
+    def subscribed(self, event: str, callback: Callable):
+        self.subscribe(event, callback)
+        try:
+            yield callback
+        finally:
+            self.unsubscribe(event, callback)
+
+    def _target(self, event: str):
+        path, attribute, _ = _EVENTS[event]
+        target = self._toolchain
+        for name in path.split('.'):
+            if (target := getattr(target, name, None)) is None:
+                raise ValueError(f"The \"{event}\" event is not supported by this toolchain (it has no {path})")
+        return target
+
+    def _install(self, event: str, callbacks: list[Callable]):
+        target = self._target(event)
+        _, attribute, factory = _EVENTS[event]
+
+        shadowed = vars(target).get(attribute, _MISSING)
+        wrapper = factory(getattr(target, attribute), callbacks)
+        setattr(target, attribute, wrapper)
+        self._installed[event] = target, wrapper, shadowed
+
+    def _uninstall(self, event: str):
+        target, wrapper, shadowed = self._installed[event]
+        _, attribute, _ = _EVENTS[event]
+
+        if vars(target).get(attribute) is not wrapper:
+            return
+
+        if shadowed is _MISSING:
+            delattr(target, attribute)
+        else:
+            setattr(target, attribute, shadowed)
+        del self._installed[event]
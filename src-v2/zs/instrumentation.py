@@ -0,0 +1,373 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+
+__all__ = [
+    "Instrumentation",
+    "Record",
+]
+
+
+@contextmanager
+def _swap(obj, attribute: str, replacement):
+    """
+    Replace an attribute on an instance for the duration of the context, shadowing its class attribute.
+    """
+    shadowed = attribute in vars(obj)
+    original = getattr(obj, attribute)
+    setattr(obj, attribute, replacement)
+    try:
+        yield
+    finally:
+        if shadowed:
+            setattr(obj, attribute, original)
+        else:
+            delattr(obj, attribute)
+
+
+class Record:
+    """
+    Time and counters of a single phase or document. Records nest: a document contains its phases, and the
+    documents it imports are recorded inside the phase that imported them.
+
+    Counters only include what happened directly in the record, `total` adds up the children as well.
+    """
+
+    __slots__ = ("_name", "_kind", "_wall", "_cpu", "_calls", "_counters", "_children", "_peak", "_retained", "_top")
+
+    _name: str
+    _kind: str
+    _wall: float
+    _cpu: float
+    _calls: int
+    _counters: dict[str, int]
+    _children: dict[str, "Record"]
+    _peak: int | None
+    _retained: int | None
+    _top: list[tuple[str, int, int]] | None
+
+    def __init__(self, name: str, kind: str):
+        self._name = name
+        self._kind = kind
+        self._wall = self._cpu = 0.0
+        self._calls = 0
+        self._counters = {}
+        self._children = {}
+        self._peak = self._retained = self._top = None
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def kind(self):
+        return self._kind
+
+    @property
+    def wall(self):
+        return self._wall
+
+    @property
+    def cpu(self):
+        return self._cpu
+
+    @property
+    def self_wall(self):
+        return self._wall - sum(child.wall for child in self._children.values())
+
+    @property
+    def calls(self):
+        return self._calls
+
+    @property
+    def counters(self):
+        return self._counters
+
+    @property
+    def children(self):
+        return list(self._children.values())
+
+    @property
+    def peak(self):
+        """
+        The most memory allocated at once while in this record, in bytes over what was allocated when it started.
+        None if memory isn't tracked.
+        """
+        return self._peak
+
+    @property
+    def retained(self):
+        """
+        The memory allocated in this record that was still allocated when it ended, in bytes.
+        """
+        return self._retained
+
+    @property
+    def top(self):
+        """
+        The `zs` source lines that retained the most memory in this record (children included), as
+        ("file:line", bytes, blocks) tuples.
+        """
+        return self._top
+
+    def child(self, name: str, kind: str) -> "Record":
+        key = f"{kind}:{name}"
+        try:
+            return self._children[key]
+        except KeyError:
+            record = self._children[key] = Record(name, kind)
+            return record
+
+    def count(self, counter: str, amount: int = 1):
+        self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def total(self, counter: str) -> int:
+        return self._counters.get(counter, 0) + sum(child.total(counter) for child in self._children.values())
+
+    def walk(self, depth: int = 0) -> Iterator[tuple[int, "Record"]]:
+        yield depth, self
+        for child in self._children.values():
+            yield from child.walk(depth + 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        result = {
+            "name": self._name,
+            "kind": self._kind,
+            "calls": self._calls,
+            "wall": self._wall,
+            "cpu": self._cpu,
+            "counters": dict(self._counters),
+        }
+        if self._peak is not None:
+            result["memory"] = {
+                "peak": self._peak,
+                "retained": self._retained,
+                "top": [{"line": line, "bytes": size, "blocks": count} for line, size, count in self._top or ()],
+            }
+        result["children"] = [child.to_dict() for child in self._children.values()]
+        return result
+
+    def _track(self, peak: int, retained: int):
+        self._peak = peak if self._peak is None else max(self._peak, peak)
+        self._retained = retained + (self._retained or 0)
+
+    def _add_top(self, top: list[tuple[str, int, int]], limit: int):
+        if self._top:
+            merged = {line: (size, count) for line, size, count in self._top}
+            for line, size, count in top:
+                old_size, old_count = merged.get(line, (0, 0))
+                merged[line] = (old_size + size, old_count + count)
+            top = [(line, size, count) for line, (size, count) in merged.items()]
+        self._top = sorted(top, key=lambda item: item[1], reverse=True)[:limit]
+
+
+class Instrumentation:
+    """
+    Records where a toolchain spends its time, per phase and per document, nested by import chain.
+
+    Pass an instance to a `Toolchain` (or set `toolchain.instrumentation`) and compile as usual.
+
+    With `memory` set, every record also tracks the peak and retained memory allocated while in it, using
+    `tracemalloc` (which makes everything considerably slower). Every document record, and the root record,
+    additionally lists the `zs` source lines that retained the most memory in it, based on snapshots taken
+    when it starts and ends.
+    """
+
+    COUNTERS = ("tokens", "nodes", "instructions")
+
+    _root: Record
+    _stack: list[Record]
+    _memory: bool
+    _top: int
+    _peaks: list[int]
+    _filters: list[tracemalloc.Filter]
+
+    def __init__(self, memory: bool = False, *, top: int = 10):
+        self._root = Record("<root>", "root")
+        self._stack = [self._root]
+        self._memory = memory
+        self._top = top
+        self._peaks = [0]
+        self._filters = [
+            tracemalloc.Filter(True, str(Path(__file__).parent / '*')),
+            tracemalloc.Filter(False, __file__),
+        ]
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def current(self):
+        return self._stack[-1]
+
+    @property
+    def memory(self):
+        return self._memory
+
+    @contextmanager
+    def record(self, name: str, kind: str = "phase"):
+        record = self.current.child(str(name), kind)
+        if self._memory and tracemalloc.is_tracing():
+            with self._tracking(record, snapshots=kind == "document"):
+                yield record
+            return
+
+        self._stack.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record._wall += time.perf_counter() - wall
+            record._cpu += time.process_time() - cpu
+            record._calls += 1
+            self._stack.pop()
+
+    @contextmanager
+    def tracing(self):
+        """
+        Trace memory allocations while the context is active, and record what was retained in the root record.
+        Only needed with `memory` set. Records started outside of this context don't track memory.
+        """
+        if not self._memory:
+            yield
+            return
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            with self._tracking(self._root, snapshots=True, push=False):
+                yield
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    @contextmanager
+    def _tracking(self, record: Record, snapshots: bool, push: bool = True):
+        before = tracemalloc.take_snapshot().filter_traces(self._filters) if snapshots else None
+
+        # tracemalloc only has a single peak, so the peak of the enclosing record is saved before resetting it,
+        # and the peaks of nested records are folded back into it when they end
+        start, peak = tracemalloc.get_traced_memory()
+        self._peaks[-1] = max(self._peaks[-1], peak)
+        self._peaks.append(start)
+        tracemalloc.reset_peak()
+
+        if push:
+            self._stack.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record._wall += time.perf_counter() - wall
+            record._cpu += time.process_time() - cpu
+            record._calls += 1
+            if push:
+                self._stack.pop()
+
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(self._peaks.pop(), peak)
+            record._track(peak - start, current - start)
+            self._peaks[-1] = max(self._peaks[-1], peak)
+
+            if snapshots:
+                after = tracemalloc.take_snapshot().filter_traces(self._filters)
+                record._add_top([
+                    (f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size_diff, stat.count_diff)
+                    for stat in after.compare_to(before, "lineno")
+                    if stat.size_diff > 0
+                ], self._top)
+
+    def document(self, path):
+        return self.record(path, "document")
+
+    def phase(self, name: str):
+        return self.record(name, "phase")
+
+    def count(self, counter: str, amount: int = 1):
+        self.current.count(counter, amount)
+
+    def counter(self, counter: str) -> Callable[..., None]:
+        """
+        A callback (e.g. for `Hooks`) that counts every call in the record that's current at the time.
+        """
+        stack = self._stack
+
+        def count(*_):
+            record = stack[-1]
+            record._counters[counter] = record._counters.get(counter, 0) + 1
+
+        return count
+
+    @contextmanager
+    def timing(self, obj, attribute: str, phase: str = None):
+        """
+        Record calls to a method of the given object as a phase while the context is active. Recursive calls
+        are part of the outermost call.
+        """
+        original = getattr(obj, attribute)
+        phase = phase or attribute
+        if getattr(original, "__zs_timed__", False):
+            yield
+            return
+
+        @wraps(original)
+        def wrapper(*args, **kwargs):
+            if self._stack[-1].name == phase and self._stack[-1].kind == "phase":
+                return original(*args, **kwargs)
+            with self.phase(phase):
+                return original(*args, **kwargs)
+
+        wrapper.__zs_timed__ = True
+
+        with _swap(obj, attribute, wrapper):
+            yield
+
+    def to_dict(self) -> dict[str, Any]:
+        return self._root.to_dict()
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def format_table(self) -> str:
+        header = f"{'phase / document':<48} {'calls':>6} {'wall ms':>10} {'self ms':>10} {'cpu ms':>10}"
+        header += "".join(f" {counter:>12}" for counter in self.COUNTERS)
+        if self._memory:
+            header += f" {'peak KiB':>10} {'kept KiB':>10}"
+        lines = [header, '-' * len(header)]
+
+        for depth, record in self._root.walk():
+            if record is self._root:
+                continue
+            name = ("  " * (depth - 1) + record.name)
+            if len(name) > 48:
+                name = "..." + name[-45:]
+            line = (
+                f"{name:<48} {record.calls:>6} {1000 * record.wall:>10.2f} "
+                f"{1000 * record.self_wall:>10.2f} {1000 * record.cpu:>10.2f}"
+            )
+            line += "".join(f" {record.counters.get(counter, 0):>12}" for counter in self.COUNTERS)
+            if self._memory and record.peak is not None:
+                line += f" {record.peak / 1024:>10.1f} {record.retained / 1024:>10.1f}"
+            lines.append(line)
+
+        return '\n'.join(lines)
+
+    def format_top(self) -> str:
+        """
+        The source lines that retained the most memory, overall and per document.
+        """
+        lines = []
+        for _, record in self._root.walk():
+            if not record.top:
+                continue
+            lines.append("overall" if record is self._root else record.name)
+            for line, size, count in record.top:
+                lines.append(f"  {size / 1024:>10.1f} KiB {count:>8} blocks  {line}")
+        return '\n'.join(lines)
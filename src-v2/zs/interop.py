@@ -145,9 +145,9 @@ def zs_type(name: str = None, *, metaclass=None):
                 continue
 
             if item_name in typ._members:
-                typ._members[name] += item
+                typ._members[item_name] += item
             else:
-                typ._members[name] = item
+                typ._members[item_name] = item
 
         return cls
 
@@ -1,8 +1,8 @@
 from enum import Enum
-from typing import Optional
+from typing import Optional, Sequence
 
 from . import EmptyObject, Object
-from .std import List, String
+from .std import String
 
 
 class MessageType(String, Enum):
@@ -11,21 +11,48 @@ class MessageType(String, Enum):
     Error = "Error"
 
 
-class Message(EmptyObject):
+class Message:
+    """
+    A diagnostic reported by a processor.
+
+    The text is only formatted (with `str.format`, if there are any arguments) when `content` is first used,
+    so messages that are never shown don't pay for it.
+    """
+
+    __slots__ = ("_type", "_origin", "_message", "_args", "_content", "_processor", "_code", "_count")
+
     _type: MessageType
     _origin: Object | None
-    _content: String
+    _message: str | String
+    _args: tuple
+    _content: String | None
     _processor: "StatefulProcessor"
+    _code: str | None
+    _count: int
 
-    def __init__(self, message_type: MessageType, message: str | String, origin: Object = None, proc: "StatefulProcessor" = None):
-        super().__init__()
+    def __init__(
+            self,
+            message_type: MessageType,
+            message: str | String,
+            origin: Object = None,
+            proc: "StatefulProcessor" = None,
+            args: tuple = (),
+            code: str = None
+    ):
         self._type = message_type
         self._origin = origin
-        self._content = String(message)
+        self._message = message
+        self._args = args
+        self._content = None
         self._processor = proc
+        self._code = code
+        self._count = 1
 
     @property
     def content(self):
+        if self._content is None:
+            message = str(self._message)
+            self._content = String(message.format(*self._args) if self._args else message)
         return self._content
 
     @property
@@ -40,17 +67,143 @@ class Message(EmptyObject):
     def processor(self):
         return self._processor
 
+    @property
+    def code(self):
+        return self._code
+
+    @property
+    def count(self):
+        """
+        How many times this message was reported.
+        """
+        return self._count
+
+    @property
+    def span(self):
+        return getattr(getattr(self._origin, "node", None), "span", None)
+
+    def __repr__(self):
+        return f"Message({self._type.value}, {str(self.content)!r})"
+
+
+class Diagnostics(Sequence[Message]):
+    """
+    The messages reported to a `State`.
+
+    A message that is reported again (same type, code, text and origin) is only counted on the message that
+    was first reported. At most `limit` messages are kept. Messages reported after that are only counted,
+    and `overflow` summarizes them. `count` includes every report, duplicates and dropped messages too.
+    """
+
+    __slots__ = ("_messages", "_seen", "_counts", "_dropped", "_limit")
+
+    _messages: list[Message]
+    _seen: dict[tuple, Message]
+    _counts: dict[MessageType, int]
+    _dropped: dict[MessageType, int]
+    _limit: int | None
+
+    def __init__(self, limit: int | None = 1000):
+        self._messages = []
+        self._seen = {}
+        self._counts = dict.fromkeys(MessageType, 0)
+        self._dropped = dict.fromkeys(MessageType, 0)
+        self._limit = limit
+
+    @property
+    def limit(self):
+        return self._limit
+
+    @property
+    def dropped(self) -> int:
+        return sum(self._dropped.values())
+
+    @property
+    def overflow(self) -> Message | None:
+        """
+        A message summarizing the messages that were dropped, or None if none were.
+        """
+        if not (dropped := self.dropped):
+            return None
+        counts = ", ".join(
+            f"{message_type.value.lower()}: {count}" for message_type, count in reversed(self._dropped.items()) if count
+        )
+        return Message(MessageType.Warning, f"{dropped} more messages were not recorded ({counts})")
+
+    def count(self, message_type: MessageType = None) -> int:
+        if message_type is None:
+            return sum(self._counts.values())
+        return self._counts[message_type]
+
+    def report(
+            self,
+            message_type: MessageType,
+            message: str | String,
+            origin: Object = None,
+            processor: "StatefulProcessor" = None,
+            args: tuple = (),
+            code: str = None
+    ) -> Message | None:
+        """
+        Record a message, unless it is a duplicate or the limit was reached. Returns the recorded message, or
+        None if it was dropped.
+        """
+        self._counts[message_type] += 1
+
+        key = (message_type, code, str(message), args, id(origin))
+        try:
+            if (known := self._seen.get(key)) is not None:
+                known._count += 1
+                return known
+        except TypeError:  # unhashable arguments, never deduplicated
+            key = None
+
+        if self._limit is not None and len(self._messages) >= self._limit:
+            self._dropped[message_type] += 1
+            return None
+
+        result = Message(message_type, message, origin, processor, args, code)
+        self._messages.append(result)
+        if key is not None:
+            self._seen[key] = result
+        return result
+
+    def checkpoint(self) -> int:
+        """
+        Stop deduplicating against the messages recorded so far, so that messages reported from now on can be
+        told apart from them (e.g. per compilation target). Returns the number of recorded messages.
+        """
+        self._seen.clear()
+        return len(self._messages)
+
+    def add(self, message: Message) -> Message | None:
+        return self.report(message.type, message.content, message.origin, message.processor, code=message.code)
+
+    def clear(self):
+        self._messages.clear()
+        self._seen.clear()
+        for counts in (self._counts, self._dropped):
+            for message_type in counts:
+                counts[message_type] = 0
+
+    def __getitem__(self, item):
+        return self._messages[item]
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def __len__(self):
+        return len(self._messages)
+
 
 class State(EmptyObject):
-    _messages: List[Message]
+    _messages: Diagnostics
     _processor: Optional["StatefulProcessor"]
-    _cache: List[Message] | None
 
-    def __init__(self):
+    def __init__(self, *, max_messages: int | None = 1000):
         super().__init__()
-        self._messages = List()
+        self._messages = Diagnostics(max_messages)
         self._processor = None
-        self._cache = None
 
     @property
     def is_running(self):
@@ -64,26 +217,23 @@ class State(EmptyObject):
     def processor(self):
         return self._processor
 
-    def error(self, message: str | String, origin: Object = None):
-        self.message(MessageType.Error, message, origin)
+    def error(self, message: str | String, origin: Object = None, *args, code: str = None):
+        self._messages.report(MessageType.Error, message, origin, self._processor, args, code)
 
-    def info(self, message: str | String, origin: Object = None):
-        self.message(MessageType.Info, message, origin)
+    def info(self, message: str | String, origin: Object = None, *args, code: str = None):
+        self._messages.report(MessageType.Info, message, origin, self._processor, args, code)
 
-    def message(self, message_type: MessageType, message: str | String, origin: Object = None):
-        self._messages.add(Message(message_type, String(message), origin, self._processor))
+    def message(self, message_type: MessageType, message: str | String, origin: Object = None, *args, code: str = None):
+        self._messages.report(message_type, message, origin, self._processor, args, code)
 
     def reset(self):
         self._processor = None
-        if self._cache:
-            self._messages.extend(self._cache)
-        self._cache = List()
 
     def run(self, processor: "StatefulProcessor"):
         self._processor = processor
 
-    def warning(self, message: str | String, origin: Object = None):
-        self.message(MessageType.Warning, message, origin)
+    def warning(self, message: str | String, origin: Object = None, *args, code: str = None):
+        self._messages.report(MessageType.Warning, message, origin, self._processor, args, code)
 
 
 class StatefulProcessor(EmptyObject):
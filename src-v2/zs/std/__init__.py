@@ -1 +1,26 @@
-from .objects.wrappers import *
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .objects.wrappers import *
+
+
+# the wrapper types are re-exported lazily, so importing a `zs.std` submodule doesn't load them
+_WRAPPERS = {
+    "Bool",
+    "Dictionary",
+    "Int32",
+    "List",
+    "NativeValue",
+    "String",
+}
+
+
+def __getattr__(name: str):
+    if name in _WRAPPERS:
+        from .objects import wrappers
+        return getattr(wrappers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return [*globals(), *_WRAPPERS]
@@ -0,0 +1,181 @@
+import json
+import mmap
+import pickle
+import struct
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from .. import EmptyObject, __version__
+from ..ast.node import Node
+from ..errors import ArchiveFormatError
+
+
+__all__ = [
+    "FORMAT_VERSION",
+    "PackageArchive",
+    "PayloadKind",
+    "pack",
+    "write_archive",
+]
+
+
+MAGIC = b"ZSA\x00"
+FORMAT_VERSION = 1
+
+# magic, format version, payload kind, index offset, index size
+_HEADER = struct.Struct("<4sHHQI")
+
+
+class PayloadKind:
+    Nodes = 1
+
+
+def write_archive(
+        path: str | Path,
+        documents: Mapping[str, Iterable[Node]],
+        entry: str | None = None,
+        kind: int = PayloadKind.Nodes
+):
+    """
+    Write the given documents (mapping of document name to its parsed nodes) into a Z# package archive.
+
+    The entry document is the one imported when the archive itself is imported. If it is not given, the
+    first document is used.
+    """
+    if entry is None:
+        entry = next(iter(documents), None)
+    if entry is not None and entry not in documents:
+        raise ValueError(f"Entry document \"{entry}\" is not a part of the archive")
+
+    index = {}
+    with open(str(path), "wb") as file:
+        file.write(bytes(_HEADER.size))
+        for name, nodes in documents.items():
+            payload = pickle.dumps(list(nodes), protocol=pickle.HIGHEST_PROTOCOL)
+            index[str(name)] = [file.tell(), len(payload)]
+            file.write(payload)
+
+        index_offset = file.tell()
+        index_data = json.dumps({
+            "zs": __version__,
+            "entry": entry,
+            "documents": index
+        }).encode()
+        file.write(index_data)
+
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, kind, index_offset, len(index_data)))
+
+
+def pack(path: str | Path, toolchain, root: str | Path, sources: Iterable[str | Path], entry: str | Path = None):
+    """
+    Parse the given source files (relative to `root`) with the toolchain's parser and write them into an archive.
+
+    Documents are stored already parsed, so the archive must be built with a parser that has the same
+    syntax extensions as the one that will import it.
+    """
+    root = Path(root)
+    documents = {
+        Path(source).as_posix(): toolchain.parse_document(root / source) for source in sources
+    }
+    write_archive(path, documents, Path(entry).as_posix() if entry is not None else None)
+
+
+class PackageArchive(EmptyObject):
+    """
+    A read-only view over a Z# package archive (.zsa).
+
+    The archive is memory mapped and only the index is read when it is opened. Documents are deserialized
+    the first time they are requested.
+    """
+
+    _path: Path
+    _map: mmap.mmap
+    _kind: int
+    _entry: str | None
+    _index: dict[str, tuple[int, int]]
+    _documents: dict[str, list[Node]]
+
+    def __init__(self, path: str | Path):
+        super().__init__()
+        self._path = Path(path)
+        with open(str(self._path), "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_index()
+        except Exception:
+            self._map.close()
+            raise
+
+        self._documents = {}
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def entry(self):
+        return self._entry
+
+    @property
+    def kind(self):
+        return self._kind
+
+    @property
+    def names(self):
+        return self._index.keys()
+
+    @property
+    def loaded(self):
+        return self._documents.keys()
+
+    def document(self, name: str) -> list[Node]:
+        name = str(name)
+        try:
+            return self._documents[name]
+        except KeyError:
+            ...
+
+        try:
+            offset, size = self._index[name]
+        except KeyError:
+            raise KeyError(f"Archive \"{self._path}\" does not contain a document named \"{name}\"")
+
+        with memoryview(self._map)[offset:offset + size] as payload:
+            nodes = self._documents[name] = pickle.loads(payload)
+
+        return nodes
+
+    def close(self):
+        self._documents.clear()
+        self._map.close()
+
+    def _read_index(self):
+        if len(self._map) < _HEADER.size:
+            raise ArchiveFormatError(self._path, f"file is too small to be a Z# archive")
+
+        magic, version, kind, index_offset, index_size = _HEADER.unpack_from(self._map)
+
+        if magic != MAGIC:
+            raise ArchiveFormatError(self._path, f"not a Z# archive")
+        if version != FORMAT_VERSION:
+            raise ArchiveFormatError(self._path, f"unsupported archive format version {version} (expected {FORMAT_VERSION})")
+        if kind != PayloadKind.Nodes:
+            raise ArchiveFormatError(self._path, f"unsupported payload kind {kind}")
+
+        index = json.loads(self._map[index_offset:index_offset + index_size])
+
+        if index["zs"] != __version__:
+            raise ArchiveFormatError(self._path, f"archive was built with Z# {index['zs']}, but this is Z# {__version__}")
+
+        self._kind = kind
+        self._entry = index["entry"]
+        self._index = {name: (offset, size) for name, (offset, size) in index["documents"].items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+        return False
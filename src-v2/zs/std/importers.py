@@ -1,9 +1,13 @@
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, TYPE_CHECKING
 
 from zs import Object
 from zs.std.objects.compilation_environment import Document
 from zs.std.processing.import_system import Importer, ImportResult, ImportSystem
+from zs.text.file_info import get_stamp
+
+if TYPE_CHECKING:
+    from zs.std.archive import PackageArchive
 
 
 class ZSImportResult(ImportResult):
@@ -44,3 +48,72 @@ class ZSImporter(Importer):
         document: Document = self._compiler.compile(path)
 
         return ZSImportResult(document)
+
+
+class ZSAImporter(Importer):
+    """
+    Imports documents from Z# package archives (.zsa).
+
+    Importing the archive itself imports its entry document. A specific document can be imported by
+    using the archive as a directory, e.g. `import * from "lib.zsa/src/utils.zs";`.
+
+    Open archives are kept, and reopened once the archive file changes.
+    """
+
+    _import_system: ImportSystem
+    _archives: dict[Path, tuple[int | None, "PackageArchive"]]
+
+    def __init__(self, import_system: ImportSystem, compiler):
+        super().__init__()
+        self._import_system = import_system
+        self._compiler = compiler
+        self._archives = {}
+
+    def import_file(self, path: Path) -> ImportResult | None:
+        archive = self._open(path)
+
+        if archive is None or archive.entry is None:
+            return None
+
+        return self._import_document(archive, archive.entry)
+
+    def import_member(self, container: Path, member: Path) -> ImportResult | None:
+        archive = self._open(container)
+
+        if archive is None:
+            return None
+
+        name = member.as_posix()
+        if name not in archive.names:
+            return None
+
+        return self._import_document(archive, name)
+
+    def _open(self, path: Path) -> "PackageArchive | None":
+        path = self._import_system.resolve(path)
+
+        if path is None:
+            return None
+
+        path = path.resolve()
+        stamp = get_stamp(path)
+        try:
+            opened, archive = self._archives[path]
+        except KeyError:
+            ...
+        else:
+            if opened == stamp:
+                return archive
+            archive.close()
+
+        from zs.std.archive import PackageArchive
+        archive = PackageArchive(path)
+        self._archives[path] = stamp, archive
+        return archive
+
+    def _import_document(self, archive: "PackageArchive", name: str) -> ImportResult:
+        path = (archive.path / name).resolve()
+
+        document: Document = self._compiler.toolchain.compile_document(path, archive.document(name))
+
+        return ZSImportResult(document)
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from contextlib import contextmanager
 from typing import Iterable, Optional, TypeVar, Generic, Any
 
@@ -8,7 +9,7 @@ from ...ast.node import Node
 from ...base import Null
 from ...errors import UnnamedObjectError, DuplicateDefinitionError, UndefinedNameError
 from ...interop import zs_function, zs_type
-from ...text.file_info import DocumentInfo
+from ...text.file_info import DocumentInfo, get_stamp
 
 
 _T = TypeVar("_T")
@@ -202,7 +203,8 @@ class ContextManager(EmptyObject):
     _scopes: list[IScope]
     _module_stack: list[None | Module]
     _global_context: IScope
-    _cache: dict[str, list[Node]]
+    _cache: OrderedDict[str, tuple[int | None, list[Node]]]
+    _cache_size: int
     _modules: list[Module]
 
     def __init__(self, global_context: Scope = None):
@@ -210,7 +212,8 @@ class ContextManager(EmptyObject):
         self._document = None
         self._global_context = global_context or Scope()
         self._scopes = [self._global_context]
-        self._cache = {}
+        self._cache = OrderedDict()
+        self._cache_size = 0
         self._module_stack = [None]
         self._modules = []
 
@@ -218,6 +221,22 @@ class ContextManager(EmptyObject):
     def current_document(self):
         return self._document
 
+    @property
+    def node_cache_size(self):
+        """
+        How many parsed documents are kept, least recently used ones are dropped first. 0 (the default) turns
+        the cache off, so a document is parsed again every time it's compiled.
+        """
+        return self._cache_size
+
+    @node_cache_size.setter
+    def node_cache_size(self, size: int):
+        if size < 0:
+            raise ValueError("The cache size must not be negative")
+        self._cache_size = size
+        while len(self._cache) > size:
+            self._cache.popitem(last=False)
+
     @property
     def current_module(self):
         return self._module_stack[-1]
@@ -309,11 +328,28 @@ class ContextManager(EmptyObject):
     def add(self, item: Object, name: str | String = None):
         self.current_scope.add(item, name)
 
+    def cache_nodes(self, path: str, nodes: list[Node], stamp: int = None):
+        """
+        Cache the parsed nodes of a document. If a stamp is given, the entry is dropped once the file's
+        stamp changes. Nothing is cached while `node_cache_size` is 0.
+        """
+        if not self._cache_size:
+            return
+        self._cache[path] = stamp, nodes
+        self._cache.move_to_end(path)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
     def get_nodes_from_cached(self, path: str) -> list[Node] | None:
         try:
-            return self._cache[path]
+            stamp, nodes = self._cache[path]
         except KeyError:
             return None
+        if stamp is not None and stamp != get_stamp(path):
+            del self._cache[path]
+            return None
+        self._cache.move_to_end(path)
+        return nodes
 
     def __getitem__(self, name: str | String) -> Object:
         for scope in reversed(self._scopes):
@@ -1,14 +1,21 @@
+import weakref
+from typing import TYPE_CHECKING
+
 from .parameter import Parameter
 from .wrappers import String, List
 from ... import Object
 from ...ast import node_lib as node_lib
 from ...utils import resolve_on_demand
 
+if TYPE_CHECKING:
+    from .type import MethodGroup
+
 
 class Function(Object[node_lib.Function]):
     _name: String | None
     _parameters: List[Parameter]
     _return_type: Object
+    _groups: "weakref.WeakSet[MethodGroup] | None"
 
     def __init__(self, name: str | String, node: node_lib.Function = None):
         super().__init__(node)
@@ -16,6 +23,7 @@ class Function(Object[node_lib.Function]):
         self._parameters = List()
         self._return_type = Object.__zs_type__
         self._body = List()
+        self._groups = None
 
     @property
     def name(self):
@@ -38,5 +46,25 @@ class Function(Object[node_lib.Function]):
     def return_type(self, value):
         self._return_type = value
 
+    def get_match_score(self, *args: Object):
+        return 1 if len(args) == len(self._parameters) else 0
+
     def add_parameter(self, name: str | String, type_: Object):
         self._parameters.add(Parameter(None, name, type_, len(self._parameters)))
+        # the groups this function is in index their overloads by the number of parameters
+        if self._groups:
+            for group in list(self._groups):
+                group.invalidate()
+
+    def join(self, group: "MethodGroup"):
+        """
+        Called by a method group this function was added to, so that it's invalidated when the parameters change.
+        """
+        if self._groups is None:
+            self._groups = weakref.WeakSet()
+        self._groups.add(group)
+
+    def __getstate__(self):
+        state = dict(vars(self))
+        state["_groups"] = None
+        return state
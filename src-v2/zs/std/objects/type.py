@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Callable
 
 from zs.objects.common import TypedName
 from .compilation_environment import ModuleMember, Module
@@ -6,7 +6,7 @@ from .function import Function
 from .wrappers import String, List, Bool, Dictionary
 from zs import Object, EmptyObject
 from zs.ast import node_lib
-from ...base import Type
+from ...base import Type, IFunction
 from ...errors import UndefinedNameError
 
 _T = TypeVar("_T")
@@ -55,14 +55,30 @@ class Method(Function, Member[node_lib.Function]):
 
 
 class MethodGroup(EmptyObject, Member):
+    """
+    A set of overloads sharing a name. Overloads are Z# functions or native functions (any `IFunction`).
+
+    A call picks the overloads with the highest non-zero match score: Z# functions score 1 when the number of
+    arguments matches their parameters, while natives only match loosely with a score of -1.
+    """
+
     _name: String
     _methods: List[Method]
+    _by_arity: dict[int, list[Function | Method]] | None
+    _loose: list[IFunction]
+    _memo: dict[tuple[Object, ...], tuple[Function | Method | IFunction, ...]]
 
-    def __init__(self, name: str | String, *overloads: Function | Method, module: Module = None):
+    def __init__(self, name: str | String, *overloads: Function | Method | IFunction, module: Module = None):
         super().__init__()
         Member.__init__(self, None, module=module)
         self._name = name
         self._methods = List(overloads)
+        self._by_arity = None
+        self._loose = []
+        self._memo = {}
+        for overload in overloads:
+            if isinstance(overload, Function):
+                overload.join(self)
 
     @property
     def name(self):
@@ -72,8 +88,66 @@ class MethodGroup(EmptyObject, Member):
     def overloads(self):
         return self._methods
 
-    def add(self, overload: Function | Method):
+    def add(self, overload: Function | Method | IFunction):
         self._methods.add(overload)
+        if isinstance(overload, Function):
+            overload.join(self)
+        self.invalidate()
+
+    def get_overloads(self, arity: int) -> list[Function | Method | IFunction]:
+        # the index is built lazily, since parameters are only added after a function joined its group (which
+        # invalidates it)
+        if self._by_arity is None:
+            self._by_arity = {}
+            self._loose = []
+            for overload in self._methods:
+                if isinstance(overload, Function):
+                    self._by_arity.setdefault(len(overload.parameters), []).append(overload)
+                else:
+                    self._loose.append(overload)
+        if not self._loose:
+            return self._by_arity.get(arity, [])
+        return [*self._by_arity.get(arity, ()), *self._loose]
+
+    def find_overloads(
+            self,
+            arguments,
+            resolve: Callable[[Function], Function] = None
+    ) -> tuple[Function | Method | IFunction, ...]:
+        """
+        Return the best matching overloads for the given arguments, more than one if they are ambiguous.
+        Results are remembered by the runtime types of the arguments, or their Python types for arguments
+        that aren't Z# objects.
+        """
+        types = tuple(getattr(argument, "runtime_type", type(argument)) for argument in arguments)
+        try:
+            return self._memo[types]
+        except KeyError:
+            ...
+
+        overloads = []
+        best = 0
+        for overload in self.get_overloads(len(types)):
+            if resolve is not None:
+                overload = resolve(overload)
+            if not (score := overload.get_match_score(*arguments)):
+                continue
+            if not overloads or score > best:
+                best = score
+                overloads = [overload]
+            elif score == best:
+                overloads.append(overload)
+
+        result = self._memo[types] = tuple(overloads)
+        return result
+
+    def invalidate(self):
+        """
+        Forget the overload index and the remembered lookups. This happens by itself when an overload gains a
+        parameter, but not when the parameters list is changed directly.
+        """
+        self._by_arity = None
+        self._memo.clear()
 
     def __str__(self):
         return f"MethodGroup \"{self.name}\" with {len(self.overloads)} overloads"
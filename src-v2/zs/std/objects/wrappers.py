@@ -144,7 +144,9 @@ class List(NativeValue, Generic[_T]):
     def __iter__(self):
         return iter(self._items)
 
-    def __getitem__(self, index: Int32):
+    def __getitem__(self, index: Int32 | slice):
+        if isinstance(index, slice):
+            return List(self._items[index])
         return self._items[int(index)]
 
     def __len__(self):
@@ -176,6 +178,9 @@ class Dictionary(NativeValue, Generic[_KT, _VT]):
             return self._items.get(key)
         return self._items.get(key, default)
 
+    def keys(self):
+        return self._items.keys()
+
     def values(self):
         return self._items.values()
 
@@ -9,35 +9,55 @@ from zs.processing import StatefulProcessor, State
 from zs.std.objects.compilation_environment import ContextManager
 from zs.std.objects.function import Function
 from zs.std.objects.type import MethodGroup
+from .resolution_cache import ResolutionCache
 
 
 class DependencyResolver(StatefulProcessor):
     _context: ContextManager
     _graph: DependencyGraph[Object]
-    _cache: set[Object]
+    _cache: ResolutionCache
     _temp: list[Object]
 
-    def __init__(self, state: State, context: ContextManager, cache: set[Object] = None):
+    def __init__(self, state: State, context: ContextManager, cache: ResolutionCache = None):
         super().__init__(state)
         self._context = context
         self._graph = DependencyGraph[Object]()
-        self._cache = cache or {None}
+        self._cache = cache if cache is not None else ResolutionCache()
 
-    def resolve(self, items: Iterable[Object]):
+    @property
+    def graph(self):
+        return self._graph
+
+    def resolve(self, items: Iterable[Object]) -> list[list[Object]]:
+        """
+        Record the dependencies of the given items and return the items that need to be (re-)resolved,
+        grouped into layers in dependency order. Items whose dependencies didn't change since the last
+        call are only returned if something they depend on changed.
+        """
         self.run()
 
         for item in items:
             self._temp = []
             self._resolve(item)
-            if self._temp is not None:
-                self._graph.add(item, *self._temp)
+            self._graph.replace(item, *self._temp)
+
+        return self._graph.update(self.state)
 
-        return self._graph.get_dependency_order(self.state)
+    def invalidate(self, *items: Object):
+        """
+        Mark the given items as changed, so they and everything that depends on them are returned again by
+        the next call to `resolve`.
+        """
+        self._graph.mark_dirty(*items)
 
     def _resolve(self, item: Object):
         if item not in self._cache:
             self._dispatch(item)
 
+    def _depend(self, item: Object):
+        if item not in self._cache:
+            self._temp.append(item)
+
     @singledispatchmethod
     def _dispatch(self, _: Object):
         return []
@@ -47,9 +67,9 @@ class DependencyResolver(StatefulProcessor):
     @_do
     def _(self, name: node_lib.Identifier):
         try:
-            self._resolve(self._context[name.name])
+            self._depend(self._context[name.name])
         except UndefinedNameError:
-            self.state.error(f"Could not resolve name \"{name.name}\"")
+            self.state.error("Could not resolve name \"{}\"", None, name.name)
 
     @_do
     def _(self, ms: MethodGroup):
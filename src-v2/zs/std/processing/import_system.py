@@ -1,9 +1,16 @@
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterable
 
 from zs import EmptyObject, Object
 from zs.ast.node_lib import Import
 from zs.std import String, List, Dictionary
+from zs.text.file_info import get_stamp
+
+
+def _exists(path: Path) -> bool:
+    # documents inside a container file (e.g. a package archive) exist if the container does
+    return path.exists() or get_stamp(path) is not None
 
 
 class ImportResult(Object[Import]):
@@ -28,17 +35,77 @@ class Importer(EmptyObject):
     def import_directory(self, path: Path) -> ImportResult | None:
         ...
 
+    @lambda _: None
+    def import_member(self, container: Path, member: Path) -> ImportResult | None:
+        """
+        Import a document stored inside a container file (e.g. a package archive).
+        Importers that don't support containers leave this as None.
+        """
+
 
 class ImportSystem(Importer):
     _path: List[String]
     _importers: Dictionary[String, Importer]
     _directory_importers: List[Importer]
+    _container_importers: Dictionary[String, Importer]
+    _cache: dict[str, ImportResult]
+    _stamps: dict[str, int | None]
+    _dependants: dict[str, set[str]]
+    _importing: list[str]
+    _caching: bool
 
     def __init__(self):
         super().__init__()
         self._path = List()
         self._importers = Dictionary()
         self._directory_importers = List()
+        self._container_importers = Dictionary()
+        self._cache = {}
+        self._stamps = {}
+        self._dependants = {}
+        self._importing = []
+        self._caching = False
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def caching(self):
+        """
+        Whether import results are cached by path. Off by default, so every import statement imports its
+        source again.
+        """
+        return self._caching
+
+    @caching.setter
+    def caching(self, caching: bool):
+        self._caching = caching
+
+    @contextmanager
+    def cached(self):
+        """
+        Cache import results while in this context. If caching was off before, the cache is cleared again
+        when the context exits.
+        """
+        if self._caching:
+            yield self
+            return
+
+        self._caching = True
+        try:
+            yield self
+        finally:
+            self._caching = False
+            self.invalidate()
+
+    @property
+    def stamps(self):
+        return self._stamps
+
+    @property
+    def dependants(self):
+        return self._dependants
 
     def add_directory(self, path: str | String | Path):
         path = Path(str(path))
@@ -61,6 +128,8 @@ class ImportSystem(Importer):
         self._importers[ext] = importer
         if importer.import_directory is not None:
             self._directory_importers.add(importer)
+        if importer.import_member is not None:
+            self._container_importers[ext] = importer
 
     def import_directory(self, path: Path) -> ImportResult | None:
         for importer in self._directory_importers:
@@ -69,23 +138,90 @@ class ImportSystem(Importer):
         return None
 
     def import_file(self, path: Path) -> ImportResult | None:
+        if self._container_importers:
+            for container in path.parents:
+                if (importer := self._container_importers.get(String(container.suffix))) is not None:
+                    return importer.import_member(container, path.relative_to(container))
         try:
             return self._importers[String(path.suffix)].import_file(path)
         except KeyError as e:
             return None
 
+    def import_member(self, container: Path, member: Path) -> ImportResult | None:
+        try:
+            return self._container_importers[String(container.suffix)].import_member(container, member)
+        except KeyError:
+            return None
+
     def import_from(self, path: Path) -> ImportResult | None:
-        if path.is_dir():
-            return self.import_directory(path)
-        return self.import_file(path)
+        if not self._caching:
+            if path.is_dir():
+                return self.import_directory(path)
+            return self.import_file(path)
+
+        key = str(resolved.resolve() if (resolved := self.resolve(path)) is not None else path)
+        if self._importing:
+            self._dependants.setdefault(key, set()).add(self._importing[-1])
+        try:
+            return self._cache[key]
+        except KeyError:
+            ...
+
+        stamp = get_stamp(key)
+        self._importing.append(key)
+        try:
+            if path.is_dir():
+                result = self.import_directory(path)
+            else:
+                result = self.import_file(path)
+        finally:
+            self._importing.pop()
+
+        if result is not None:
+            self._cache[key] = result
+            self._stamps[key] = stamp
+        return result
+
+    def invalidate(self, path: str | Path = None) -> list[str]:
+        """
+        Drop the cached result of the given path, along with the results of everything that imported it.
+        If no path is given, the whole cache is cleared.
+        """
+        if path is None:
+            invalidated = list(self._cache)
+            self._cache.clear()
+            self._stamps.clear()
+            self._dependants.clear()
+            return invalidated
+
+        invalidated = []
+        pending = [str(Path(path).resolve())]
+        while pending:
+            key = pending.pop()
+            if self._cache.pop(key, None) is None:
+                continue
+            self._stamps.pop(key, None)
+            invalidated.append(key)
+            pending.extend(self._dependants.get(key, ()))
+        return invalidated
+
+    def invalidate_stale(self) -> list[str]:
+        """
+        Invalidate every cached result whose source file changed since it was imported.
+        """
+        invalidated = []
+        for key, stamp in list(self._stamps.items()):
+            if key in self._stamps and stamp != get_stamp(key):
+                invalidated.extend(self.invalidate(key))
+        return invalidated
 
     def resolve(self, path: str | Path) -> Path | None:
         path = Path(path)
         if path.is_absolute():
-            return path if path.exists() else None
+            return path if _exists(path) else None
         for directory in self._path:
-            if (result := (str(directory) / path)).exists():
+            if _exists(result := (str(directory) / path)):
                 return result
-        if (result := (Path.cwd() / path)).exists():
+        if _exists(result := (Path.cwd() / path)):
             return result
         return None
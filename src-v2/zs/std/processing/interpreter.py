@@ -1,4 +1,5 @@
 import typing
+from concurrent.futures import Executor
 from contextlib import contextmanager
 from functools import singledispatchmethod
 from pathlib import Path
@@ -6,6 +7,7 @@ from typing import Iterable, Callable
 
 from .dependency_resolver import DependencyResolver
 from .import_system import ImportSystem, ImportResult
+from .resolution_cache import ResolutionCache
 from ..runtime import interpreter
 from .. import String, List, Int32
 from ..objects.compilation_environment import ContextManager, Module
@@ -25,6 +27,25 @@ from ...utils import ResolveOnDemand
 _T = typing.TypeVar("_T")
 
 
+# operator -> name of the member that implements it. operators that aren't listed are added on first use
+_OPERATOR_SLOTS: dict[str, str] = {
+    op: f"_{op}_" for op in (
+        "+", "-", "*", "/", "%", "**", "//",
+        "==", "!=", "<", ">", "<=", ">=",
+        "&", "|", "^", "<<", ">>", "&&", "||",
+        "=", "+=", "-=", "*=", "/=", "%=",
+    )
+}
+
+
+def _operator_slot(op: str) -> str:
+    try:
+        return _OPERATOR_SLOTS[op]
+    except KeyError:
+        slot = _OPERATOR_SLOTS[str(op)] = f"_{op}_"
+        return slot
+
+
 def _get_dict_from_import_result(node: node_lib.Import, result: ImportResult):
     res = {}
 
@@ -63,30 +84,72 @@ class CallFrame:
 
 
 class Resolver(StatefulProcessor):
+    """
+    Resolves objects built by the interpreter.
+
+    If an executor is given, the items of each dependency layer of a module are resolved concurrently, and the
+    next layer only starts once the whole layer is done. Every item is then resolved by its own resolver with
+    its own state, and the messages are merged back in the order of the items in the layer.
+    Items are resolved by resolvers of the same class as this one, so subclasses that add handlers work.
+    With a process pool, the resolver and the items must be picklable, and the resolvers in the worker
+    processes start with an empty cache (the executor isn't sent either). Resolved items are sent back instead
+    of being shared, so only work that doesn't rely on mutating objects in place should be resolved that way.
+    """
+
     _ctx: ContextManager
-    _cache: set[Object | None]
+    _cache: ResolutionCache
     _dep: DependencyResolver
+    _executor: Executor | None
 
-    def __init__(self, state: State, context: ContextManager):
+    def __init__(self, state: State, context: ContextManager, *, executor: Executor = None, cache: ResolutionCache = None):
         super().__init__(state)
         self._ctx = context
-        self._cache = {None}
+        self._cache = cache if cache is not None else ResolutionCache()
         self._dep = DependencyResolver(state, context, self._cache)
+        self._executor = executor
+
+    def __getstate__(self):
+        state = vars(self).copy()
+        state["_executor"] = None
+        return state
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def executor(self):
+        return self._executor
+
+    @executor.setter
+    def executor(self, executor: Executor | None):
+        self._executor = executor
 
     def resolve(self, obj: Object, enable_caching: bool = True):
         if enable_caching:
-            try:
-                if obj in self._cache:
-                    # 'obj' is already resolved
-                    return obj
-                self._cache.add(self._resolve(obj))
-            except TypeError:
-                ...
+            return self._cache.resolve(obj, self._resolve)
         return self._resolve(obj)
 
     def resolve_dependencies(self, items: Iterable[Object]):
         return self._dep.resolve(filter(lambda item: item not in self._cache, items))
 
+    def resolve_layers(self, layers: Iterable[list[Object]]):
+        for items in layers:
+            if self._executor is None or len(items) < 2:
+                for item in items:
+                    self.resolve(item)
+                continue
+
+            # `map` yields in submission order, and consuming all of it is the barrier between layers
+            for item, (resolved, messages) in zip(items, list(self._executor.map(self._resolve_isolated, items))):
+                self._cache.add(item, resolved)
+                for message in messages:
+                    self.state.message(message.type, message.content, message.origin, code=message.code)
+
+    def _resolve_isolated(self, item: Object):
+        resolver = type(self)(State(), self._ctx, cache=self._cache)
+        return resolver.resolve(item), list(resolver.state.messages)
+
     @singledispatchmethod
     def _resolve(self, obj: Object):
         return obj
@@ -107,20 +170,7 @@ class Resolver(StatefulProcessor):
         if not isinstance(group, MethodGroup):
             raise TypeError
 
-        num_arguments = len(obj.arguments)
-
-        overloads = []
-
-        for overload in group.overloads:
-            overload = self.resolve(overload)
-
-            if len(overload.parameters) != num_arguments:
-                continue
-
-            for argument, parameter in zip(obj.arguments, overload.parameters):
-                ...
-
-            overloads.append(overload)
+        overloads = group.find_overloads(obj.arguments, self.resolve)
 
         if not overloads:
             return self.state.error(f"Could not find a suitable overload", obj)
@@ -128,14 +178,12 @@ class Resolver(StatefulProcessor):
         if len(overloads) != 1:
             return self.state.error(f"Argument list matched more than 1 overload", obj)
 
-        return Call(overloads[0], *obj.arguments, call_operator=obj.operator, node=obj.node)
+        cls = ExternalCall if isinstance(overloads[0], NativeFunction) else Call
+        return cls(overloads[0], *obj.arguments, call_operator=obj.operator, node=obj.node)
 
     @_do
     def _(self, module: Module):
-        order = self.resolve_dependencies(module.members.values)
-        for items in order:
-            for item in items:
-                self.resolve(item)
+        self.resolve_layers(self.resolve_dependencies(module.members.values))
         return module
 
     @_do
@@ -168,6 +216,7 @@ class Builder(StatefulProcessor):
 
 
 class Interpreter(StatefulProcessor):
+    _binary_cache: dict[tuple[Object, Object, str], tuple[Object | None, int]]
     _call_stack: list[CallFrame]
     _ctx: ContextManager
     _import_system: ImportSystem
@@ -177,14 +226,22 @@ class Interpreter(StatefulProcessor):
     _runtime: interpreter.Interpreter
     _builder: Builder
 
-    def __init__(self, *, state: State = None, context: ContextManager = None, import_system: ImportSystem = None):
+    def __init__(
+            self,
+            *,
+            state: State = None,
+            context: ContextManager = None,
+            import_system: ImportSystem = None,
+            executor: Executor = None
+    ):
         super().__init__(state or State())
+        self._binary_cache = {}
         self._call_stack = []
         self._ctx = context or ContextManager()
         self._import_system = import_system or ImportSystem()
         self._on_document_end: list[Callable] | None = None
         self._special_context = []
-        self._resolver = Resolver(state, self._ctx)
+        self._resolver = Resolver(self.state, self._ctx, executor=executor)
         self._resolve = True
         self._runtime = interpreter.Interpreter(self.state)
         self._builder = Builder(self.state, self._ctx)
@@ -258,19 +315,32 @@ class Interpreter(StatefulProcessor):
     #     left = self.exec(node.left)
     #     right = self.exec(node.right)
 
+    def execute_binary(self, operator: str, left: Object, right: Object, node: node_lib.Binary = None):
+        left_type = left.runtime_type
+        key = left_type, right.runtime_type, operator
+
+        # the implementations are looked up on the left type, so they're only valid until it (or a base) changes
+        version = left_type.version
+        try:
+            implementation, cached = self._binary_cache[key]
+            if cached != version:
+                raise KeyError(key)
+        except KeyError:
+            implementation = left_type.get(_operator_slot(operator))
+            self._binary_cache[key] = implementation, version
+
+        if implementation is None:
+            return self.state.error(f"Type \"{left_type}\" does not define the \"{operator}\" operator", node)
+        if isinstance(implementation, Function):
+            return self.runtime.execute(Call(implementation, left, right))
+        return implementation(left, right)
+
     @_do
     def _(self, node: node_lib.Binary):
         left = self.runtime.execute(self.resolve(self.exec(node.left)))
         right = self.runtime.execute(self.resolve(self.exec(node.right)))
 
-        try:
-            getter = left.runtime_type.get(f"_{node.token_info.operator.value}_")
-            cls = Call
-            if not isinstance(getter, Function):
-                cls = ExternalCall
-            return self.runtime.execute(cls(getter, left, right))
-        except KeyError:
-            self.state.error(f"Type \"{left.runtime_type}\" does not define the a member access function", node)
+        return self.execute_binary(node.token_info.operator.value, left, right, node)
 
         # self.state.warning(f"Binary operators are not implemented yet", node)
 
@@ -404,7 +474,7 @@ class Interpreter(StatefulProcessor):
         try:
             item = self.context[node.name]
         except UndefinedNameError:
-            self.state.error(f"Could not resolve name \"{node.name}\"", node)
+            self.state.error("Could not resolve name \"{}\"", node, node.name)
         else:
             return self.resolve(item, True)
 
@@ -0,0 +1,200 @@
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+from zs import EmptyObject
+
+
+__all__ = [
+    "ResolutionCache",
+]
+
+
+_T = TypeVar("_T")
+
+_MISSING = object()
+_SELF = object()
+
+
+class _Pending:
+    thread: int
+    done: threading.Event
+    error: BaseException | None
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.done = threading.Event()
+        self.error = None
+
+
+class ResolutionCache(EmptyObject):
+    """
+    Maps objects to their resolved form, by identity.
+
+    Objects that can be weakly referenced are forgotten as soon as they are collected. Other objects are kept
+    alive by the cache, so only the most recently used `max_strong` of them are kept.
+    The result of a resolution is considered resolved as well. `None` is always resolved to itself.
+
+    The entries belong to this process: a pickled cache is unpickled empty.
+    """
+
+    _weak: dict[int, tuple[weakref.ref, Any]]
+    _strong: OrderedDict[int, tuple[Any, Any]]
+    _max_strong: int
+    _pending: dict[int, _Pending]
+    _waiting: dict[int, _Pending]
+    _lock: threading.RLock
+    _hits: int
+    _misses: int
+
+    def __init__(self, max_strong: int = 4096):
+        super().__init__()
+        self._weak = {}
+        self._strong = OrderedDict()
+        self._max_strong = max_strong
+        self._pending = {}
+        self._waiting = {}
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+
+    def __getstate__(self):
+        return {"max_strong": self._max_strong}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_strong"])
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def get(self, obj: _T, default=None) -> _T:
+        with self._lock:
+            result = self._lookup(obj)
+        return default if result is _MISSING else result
+
+    def add(self, obj: _T, result: _T):
+        with self._lock:
+            self._store(obj, result)
+            if result is not obj:
+                self._store(result, result)
+
+    def resolve(self, obj: _T, resolve: Callable[[_T], _T]) -> _T:
+        """
+        Return the cached result for `obj`, or resolve it with the given function and cache the result.
+
+        An object is resolved at most once. If it is requested again while it's being resolved, the same thread
+        gets the object itself back (it depends on itself), while other threads wait for the result, or for the
+        exception it raised. If waiting would deadlock, because the resolving thread is itself (indirectly)
+        waiting for this thread, the object is returned as well: it's part of a cycle that was split across
+        threads.
+        """
+        thread = threading.get_ident()
+
+        with self._lock:
+            if (result := self._lookup(obj)) is not _MISSING:
+                self._hits += 1
+                return result
+
+            pending = self._pending.get(id(obj))
+            if pending is None:
+                pending = self._pending[id(obj)] = _Pending()
+                self._misses += 1
+                owner = True
+            else:
+                owner = False
+                if self._waits_for(pending.thread, thread):
+                    return obj
+                self._waiting[thread] = pending
+
+        if not owner:
+            try:
+                pending.done.wait()
+            finally:
+                with self._lock:
+                    del self._waiting[thread]
+            if pending.error is not None:
+                raise pending.error
+            return self.get(obj, obj)
+
+        try:
+            result = resolve(obj)
+            self.add(obj, result)
+            return result
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[id(obj)]
+            pending.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._weak.clear()
+            self._strong.clear()
+            self._hits = self._misses = 0
+
+    def __contains__(self, obj):
+        return self.get(obj, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._weak) + len(self._strong)
+
+    def _waits_for(self, thread: int, target: int) -> bool:
+        """
+        Whether `thread` is `target`, or is waiting for a resolution owned by a thread that waits for `target`.
+        """
+        seen = set()
+        while thread != target:
+            if thread in seen or (pending := self._waiting.get(thread)) is None:
+                return False
+            seen.add(thread)
+            thread = pending.thread
+        return True
+
+    def _lookup(self, obj):
+        if obj is None:
+            return None
+
+        key = id(obj)
+        if (entry := self._weak.get(key)) is not None:
+            ref, result = entry
+            if ref() is obj:
+                return obj if result is _SELF else result
+        elif (entry := self._strong.get(key)) is not None:
+            item, result = entry
+            if item is obj:
+                self._strong.move_to_end(key)
+                return result
+        return _MISSING
+
+    def _store(self, obj, result):
+        if obj is None:
+            return
+
+        key = id(obj)
+        try:
+            # the result is often the object itself, which must not be kept alive by its own entry
+            self._weak[key] = weakref.ref(obj, self._remover(key)), _SELF if result is obj else result
+        except TypeError:
+            self._strong[key] = obj, result
+            self._strong.move_to_end(key)
+            if len(self._strong) > self._max_strong:
+                self._strong.popitem(last=False)
+
+    def _remover(self, key: int):
+        cache = weakref.ref(self)
+
+        def remove(ref):
+            if (self_ := cache()) is not None:
+                with self_._lock:
+                    if (entry := self_._weak.get(key)) is not None and entry[0] is ref:
+                        del self_._weak[key]
+
+        return remove
@@ -1,23 +1,33 @@
+from contextlib import ExitStack, contextmanager, nullcontext
 from pathlib import Path
 
-from zs.ctrt.context import Scope
+from zs.ast.node import Node
 from zs.ctrt.interpreter import Interpreter
-from zs.ctrt.pp import Preprocessor
+from zs.engine import ExecutionEngine, get_engine
+from zs.errors import ExecutionLimitExceeded
+from zs.hooks import Hooks
+from zs.instrumentation import Instrumentation
 from zs.processing import StatefulProcessor, State
 from zs.std.objects.compilation_environment import Document, ContextManager
 # from zs.std.processing.interpreter import Interpreter
-from zs.text.file_info import SourceFile, DocumentInfo
+from zs.text.file_info import SourceFile, DocumentInfo, get_stamp
 from zs.text.parser import Parser
 from zs.text.token_stream import TokenStream
 from zs.text.tokenizer import Tokenizer
 
 
+_NO_PHASE = nullcontext()
+
+
 class Toolchain(StatefulProcessor):
     _context: ContextManager
     _tokenizer: Tokenizer
     _parser: Parser
-    _interpreter: Interpreter
-    _preprocessor: Preprocessor
+    _engine: ExecutionEngine
+    _instrumentation: Instrumentation | None
+    _instrumenting: bool
+    _hooks: Hooks | None
+    _depth: int
 
     def __init__(
             self,
@@ -26,15 +36,26 @@ class Toolchain(StatefulProcessor):
             context: ContextManager = None,
             tokenizer: Tokenizer = None,
             parser: Parser = None,
-            interpreter: Interpreter = None
+            interpreter: Interpreter = None,
+            engine: ExecutionEngine | str = None,
+            instrumentation: Instrumentation = None
     ):
         super().__init__(state or State())
         self._context = context or ContextManager()
         self._tokenizer = tokenizer or Tokenizer(state=self.state)
         self._parser = parser or Parser(state=self.state)
-        # self._interpreter = interpreter or Interpreter(state=state, context=context)
-        self._interpreter = interpreter or Interpreter(self.state)
-        self._preprocessor = Preprocessor(self.state)
+        if interpreter is not None:
+            if engine is not None:
+                raise ValueError(f"Can't use both an interpreter and an engine")
+            from zs.ctrt.engine import CTRTEngine
+            engine = CTRTEngine(self.state, interpreter)
+        elif engine is None or isinstance(engine, str):
+            engine = get_engine(engine or "run")(self.state)
+        self._engine = engine
+        self._instrumentation = instrumentation
+        self._instrumenting = False
+        self._hooks = None
+        self._depth = 0
 
     @property
     def tokenizer(self):
@@ -45,40 +66,129 @@ class Toolchain(StatefulProcessor):
         return self._parser
 
     @property
-    def interpreter(self):
-        return self._interpreter
+    def engine(self):
+        return self._engine
+
+    @property
+    def import_system(self):
+        return self._engine.import_system
+
+    @property
+    def interpreter(self) -> Interpreter | None:
+        return getattr(self._engine, "interpreter", None)
 
     @property
     def preprocessor(self):
-        return self._preprocessor
+        return getattr(self._engine, "preprocessor", None)
+
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation: Instrumentation | None):
+        self._instrumentation = instrumentation
+
+    @property
+    def hooks(self):
+        if self._hooks is None:
+            self._hooks = Hooks(self)
+        return self._hooks
 
     @property
     def gcs(self):
         return self._global
 
-    def compile_document(self, path: Path) -> Document:
-        super().run()
+    def parse_document(self, path: Path) -> list[Node]:
+        file = SourceFile.from_path(path)
 
-        path = path.resolve()
-        info = DocumentInfo(path)
+        token_generator = self._tokenizer.tokenize(file)
 
-        if (nodes := self._context.get_nodes_from_cached(str(path))) is None:
-            file = SourceFile.from_path(path)
+        if (instrumentation := self._instrumentation) is not None:
+            with instrumentation.phase("tokenize"):
+                token_stream = TokenStream(token_generator)
+            with instrumentation.phase("parse"):
+                nodes = self._parser.parse(token_stream)
+                instrumentation.count("nodes", len(nodes))
+            return nodes
 
-            token_generator = self._tokenizer.tokenize(file)
+        token_stream = TokenStream(token_generator)
 
-            token_stream = TokenStream(token_generator)
+        return self._parser.parse(token_stream)
 
-            nodes = self._parser.parse(token_stream)
+    def compile_document(self, path: Path, nodes: list[Node] = None) -> Document:
+        """
+        Compile the document at the given path. If its nodes are given (e.g. from a package archive), the
+        document isn't parsed.
+        """
+        super().run()
 
-        # document = Document(info, nodes)
+        path = path.resolve()
+
+        # execution limits apply to a document together with everything it imports
+        if self._depth == 0:
+            self._engine.restart_limits()
+
+        self._depth += 1
+        try:
+            if self._instrumentation is None:
+                return self._compile_document(path, nodes)
+
+            with self._instrumentation.document(path), self._instrumented(self._instrumentation):
+                return self._compile_document(path, nodes)
+        finally:
+            self._depth -= 1
+
+    def _phase(self, name: str):
+        if self._instrumentation is None:
+            return _NO_PHASE
+        return self._instrumentation.phase(name)
+
+    @contextmanager
+    def _instrumented(self, instrumentation: Instrumentation):
+        # imported documents are compiled while everything is already installed
+        if self._instrumenting:
+            yield
+            return
+
+        self._instrumenting = True
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(self.hooks.subscribed("token", instrumentation.counter("tokens")))
+                if self.interpreter is not None:
+                    stack.enter_context(self.hooks.subscribed("instruction", instrumentation.counter("instructions")))
+                if (preprocessor := self.preprocessor) is not None:
+                    stack.enter_context(instrumentation.timing(preprocessor, "preprocess"))
+                yield
+        finally:
+            self._instrumenting = False
+
+    def _compile_document(self, path: Path, nodes: list[Node] | None) -> Document:
+        info = DocumentInfo(path)
 
-        with self._interpreter.x.scope() as scope, self._context.document(scope):
-            # self._interpreter.execute_document(document.nodes)
+        if nodes is None and (nodes := self._context.get_nodes_from_cached(str(path))) is None:
+            stamp = get_stamp(path)
+            nodes = self.parse_document(path)
+            self._context.cache_nodes(str(path), nodes, stamp)
+
+        # document = Document(info, nodes)
 
+        with self._engine.document(self._context) as scope, self._phase("execute"):
             try:
                 for node in nodes:
-                    self._interpreter.execute(self._preprocessor.preprocess(node), runtime=False)
+                    self._engine.execute(node)
+            except ExecutionLimitExceeded as e:
+                # abandon the whole compilation, and report it once, from the outermost document
+                if self._depth > 1:
+                    raise
+                self.state.error(str(e), e.origin or node)
+            except RecursionError:
+                if self._engine.limits is None:
+                    raise
+                error = ExecutionLimitExceeded("depth", "Execution limit exceeded: calls are nested too deep", node)
+                if self._depth > 1:
+                    raise error
+                self.state.error(str(error), error.origin)
             except Exception as e:
                 print(50 * '-')
                 print(f"Caught exception '{type(e).__name__}' while processing node with token '{node}'.")
@@ -93,4 +203,4 @@ class Toolchain(StatefulProcessor):
             #     document.add(item, name)
 
             # return document
-            return self.interpreter.x.local_scope
+            return scope
@@ -1,4 +1,5 @@
 import io
+import os
 from pathlib import Path
 from typing import Literal
 
@@ -10,9 +11,27 @@ __all__ = [
     "DocumentInfo",
     "Position",
     "Span",
+    "get_stamp",
 ]
 
 
+def get_stamp(path: str | Path) -> int | None:
+    """
+    Returns the modification stamp of the given file, or None if it doesn't exist on disk. A path inside a
+    container file (e.g. a document in a package archive) has the stamp of the container.
+    """
+    try:
+        return os.stat(str(path)).st_mtime_ns
+    except OSError:
+        ...
+    for parent in Path(path).parents:
+        if parent.is_file():
+            return os.stat(str(parent)).st_mtime_ns
+        if parent.exists():
+            return None
+    return None
+
+
 class DocumentInfo(EmptyObject):
     _path: Path
 
@@ -114,12 +133,14 @@ class Span(EmptyObject):
     _start: Position
     _end: Position
     _text: str
+    _document: DocumentInfo | None
 
-    def __init__(self, start: Position, end: Position, text: str):
+    def __init__(self, start: Position, end: Position, text: str, document: DocumentInfo = None):
         super().__init__()
         self._start = start
         self._end = end
         self._text = text
+        self._document = document
 
     @property
     def start(self):
@@ -133,6 +154,19 @@ class Span(EmptyObject):
     def text(self):
         return self._text
 
+    @property
+    def document(self):
+        return self._document
+
+    @property
+    def location(self):
+        """
+        The start of the span as "path:line:column", or "line:column" if the document is unknown.
+        """
+        if self._document is None:
+            return str(self._start)
+        return f"{self._document.path_string}:{self._start}"
+
     def __str__(self):
         return f"Span: {self._start} -> {self._end} [{self._text}]"
 
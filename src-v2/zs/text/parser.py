@@ -110,6 +110,10 @@ class ContextualParser(StatefulProcessor, Generic[_T]):
     def name(self):
         return self._name
 
+    @property
+    def tokens(self):
+        return self._parsers.keys()
+
     def parse(self, parser: "Parser", binding_power: Int32) -> _T:
         stream = parser.stream
 
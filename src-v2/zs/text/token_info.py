@@ -7,6 +7,21 @@ __all__ = [
 
 
 class TokenInfo(EmptyObject):
+    @property
+    def span(self):
+        """
+        The span of the first token of this token info, or None if it has no tokens.
+        """
+        from .token import Token
+
+        for name in getattr(self, "__slots__", ()):
+            value = getattr(self, name, None)
+            if isinstance(value, (list, tuple)):
+                value = next((item for item in value if isinstance(item, Token)), None)
+            if isinstance(value, Token):
+                return value.span
+        return None
+
     def __str__(self):
         try:
             return str(getattr(self, self.__slots__[0]))
@@ -75,7 +75,7 @@ class Tokenizer(StatefulProcessor):
             yield self._token(TokenType.EOF, self._stream.peek())
 
     def _token(self, typ: TokenType, value: str | String):
-        token = Token(typ, String(value), Span(self._start, self._stream.position, self._stream.text))
+        token = Token(typ, String(value), Span(self._start, self._stream.position, self._stream.text, self._document.info))
         self._stream.clear()
         self._start = self._stream.position
         return token
@@ -0,0 +1,103 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from main import create_compiler
+from zs.ast import node_lib
+from zs.errors import ArchiveFormatError
+from zs.processing import State
+from zs.std.archive import PackageArchive, pack, write_archive
+from zs.std.parsers.std import get_standard_parser
+from zs.std.processing.import_system import ImportSystem
+from zs.std.processing.toolchain import Toolchain
+
+
+def _toolchain():
+    state = State()
+    parser = get_standard_parser(state)
+    parser.setup()
+    return Toolchain(state=state, parser=parser)
+
+
+def test_archive_round_trip(tmp_path):
+    (tmp_path / "main.zs").write_text("import * from \"lib.zs\";")
+    (tmp_path / "lib.zs").write_text("var x = 1")
+
+    pack(tmp_path / "pkg.zsa", _toolchain(), tmp_path, ["main.zs", "lib.zs"], entry="main.zs")
+
+    with PackageArchive(tmp_path / "pkg.zsa") as archive:
+        assert archive.entry == "main.zs"
+        assert set(archive.names) == {"main.zs", "lib.zs"}
+        assert not archive.loaded
+
+        nodes = archive.document("lib.zs")
+
+        assert list(archive.loaded) == ["lib.zs"]
+        assert isinstance(nodes[0], node_lib.Var)
+        assert archive.document("lib.zs") is nodes
+
+
+def test_archive_version_mismatch(tmp_path, monkeypatch):
+    write_archive(tmp_path / "pkg.zsa", {"main.zs": []})
+
+    monkeypatch.setattr("zs.std.archive.__version__", "0.0.0")
+
+    with pytest.raises(ArchiveFormatError):
+        PackageArchive(tmp_path / "pkg.zsa")
+
+
+def test_import_archive_member(tmp_path):
+    write_archive(tmp_path / "pkg.zsa", {"main.zs": [], "src/lib.zs": []})
+
+    class Importer:
+        import_directory = None
+
+        def import_member(self, container, member):
+            return container.name, member.as_posix()
+
+    import_system = ImportSystem()
+    import_system.add_importer(Importer(), ".zsa")
+
+    assert import_system.import_from(tmp_path / "pkg.zsa" / "src" / "lib.zs") == ("pkg.zsa", "src/lib.zs")
+
+
+def test_import_from_archive(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "main.zs").write_text("import { x } from \"src/lib.zs\";\nvar y = x")
+    (tmp_path / "src" / "lib.zs").write_text("var x = 1")
+
+    compiler = create_compiler()
+    pack(tmp_path / "pkg.zsa", compiler.toolchain, tmp_path, ["main.zs", "src/lib.zs"], entry="main.zs")
+
+    # only the archive is left, so everything below is compiled from the nodes stored in it
+    (tmp_path / "src" / "lib.zs").unlink()
+    (tmp_path / "main.zs").unlink()
+
+    import_system = compiler.toolchain.import_system
+    result = import_system.import_member(tmp_path / "pkg.zsa", Path("src/lib.zs"))
+    assert result.item("x") == 1
+
+    assert import_system.import_from(tmp_path / "pkg.zsa" / "src" / "lib.zs").item("x") == 1
+    assert import_system.import_member(tmp_path / "pkg.zsa", Path("missing.zs")) is None
+
+
+def test_rebuilt_archive_is_reimported(tmp_path):
+    (tmp_path / "lib.zs").write_text("var x = 1")
+
+    compiler = create_compiler()
+    import_system = compiler.toolchain.import_system
+    import_system.caching = True
+    pack(tmp_path / "pkg.zsa", compiler.toolchain, tmp_path, ["lib.zs"])
+
+    member = tmp_path / "pkg.zsa" / "lib.zs"
+    assert import_system.import_from(member).item("x") == 1
+
+    # members have the stamp of their archive, so rebuilding it invalidates them
+    (tmp_path / "lib.zs").write_text("var x = 2")
+    pack(tmp_path / "pkg.zsa", compiler.toolchain, tmp_path, ["lib.zs"])
+    stamp = os.stat(tmp_path / "pkg.zsa").st_mtime_ns + 10 ** 9
+    os.utime(tmp_path / "pkg.zsa", ns=(stamp, stamp))
+
+    assert import_system.invalidate_stale() == [str(member.resolve())]
+    assert import_system.import_from(member).item("x") == 2
@@ -0,0 +1,192 @@
+import asyncio
+import gc
+import threading
+import time
+import warnings
+
+import pytest
+
+from main import create_compiler
+from zs.ctrt import interpreter as ctrt_interpreter
+
+
+SOURCE = (
+    "import { Function, gather, fetch } from __srf__.builtins;\n"
+    "\n"
+    "fun a() { fetch(1) }\n"
+    "fun b() { fetch(2) }\n"
+    "fun both() { gather(a, b) }\n"
+)
+
+
+def test_execute_async(tmp_path):
+    (tmp_path / "main.zs").write_text(SOURCE)
+
+    compiler = create_compiler()
+    interpreter = compiler.toolchain.interpreter
+    events = []
+
+    async def fetch(value):
+        events.append(("start", value))
+        await asyncio.sleep(0.05)
+        events.append(("end", value))
+        return 10 * value
+
+    setattr(compiler.builtins, "fetch", fetch)
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+    assert result.success
+    items = result.document.items
+
+    scope = interpreter.x.local_scope
+
+    async def main():
+        return await asyncio.gather(
+            interpreter.execute_async(items["a"], execute=True),
+            interpreter.execute_async(items["both"], execute=True),
+        )
+
+    assert asyncio.run(main()) == [10, [10, 20]]
+
+    # all three fetches waited at the same time
+    assert [event for event, _ in events] == ["start"] * 3 + ["end"] * 3
+
+    # the interpreter is back to where it was, and natives are called directly again
+    assert not interpreter.x.frames and interpreter.x.local_scope is scope
+    assert "_call_native" not in vars(interpreter)
+
+
+def test_execute_async_error(tmp_path):
+    (tmp_path / "main.zs").write_text(
+        "import { Function, fail } from __srf__.builtins;\n"
+        "fun f() { fail() }\n"
+    )
+
+    compiler = create_compiler()
+    interpreter = compiler.toolchain.interpreter
+
+    async def fail():
+        raise LookupError("nope")
+
+    setattr(compiler.builtins, "fail", fail)
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    with pytest.raises(LookupError, match="nope"):
+        asyncio.run(interpreter.execute_async(result.document.items["f"], execute=True))
+
+    assert not interpreter.x.frames
+
+
+def test_gather_is_lazy(tmp_path):
+    (tmp_path / "main.zs").write_text("import { Function } from __srf__.builtins;\nfun f() { f }\n")
+
+    compiler = create_compiler()
+    interpreter = compiler.toolchain.interpreter
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    # gathering outside of a task, and never awaiting it, leaves no coroutines behind
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        gather = interpreter.gather(result.document.items["f"])
+        del gather
+        gc.collect()
+    assert not caught
+
+
+def test_execute_waits_for_tasks(tmp_path):
+    (tmp_path / "main.zs").write_text(
+        "import { Function, hold, fetch, mark } from __srf__.builtins;\n"
+        "fun task() { hold(); fetch() }\n"
+        "fun other() { mark(\"other\") }\n"
+    )
+
+    compiler = create_compiler()
+    interpreter = compiler.toolchain.interpreter
+    events = []
+    threads = []
+
+    def hold():
+        # another thread runs Z# code while this task holds the interpreter
+        thread = threading.Thread(target=interpreter.execute, args=(items["other"],), kwargs={"execute": True})
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+        events.append("hold")
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        events.append("fetch")
+
+    setattr(compiler.builtins, "hold", hold)
+    setattr(compiler.builtins, "fetch", fetch)
+    setattr(compiler.builtins, "mark", events.append)
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+    items = result.document.items
+
+    asyncio.run(interpreter.execute_async(items["task"], execute=True))
+    threads[0].join()
+
+    # the other thread only got in once the task waited for `fetch`
+    assert events == ["hold", "other", "fetch"]
+    assert not interpreter.x.frames
+
+
+def test_task_threads_are_bounded(tmp_path, monkeypatch):
+    (tmp_path / "main.zs").write_text(SOURCE + "fun nested() { gather(both, both) }\n")
+    monkeypatch.setattr(ctrt_interpreter, "TASK_THREADS", 1)
+
+    compiler = create_compiler()
+    interpreter = compiler.toolchain.interpreter
+    running = []
+    most = 0
+
+    async def fetch(value):
+        nonlocal most
+        running.append(value)
+        most = max(most, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(value)
+        return 10 * value
+
+    setattr(compiler.builtins, "fetch", fetch)
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    # gathers nested deeper than the bound still finish, since waiting tasks give their slot away
+    nested = interpreter.execute_async(result.document.items["nested"], execute=True)
+    assert asyncio.run(nested) == [[10, 20], [10, 20]]
+    assert most == 1
+
+
+def test_natives_must_not_wait_for_threads_running_code(tmp_path):
+    (tmp_path / "main.zs").write_text(
+        "import { Function, spawn, mark } from __srf__.builtins;\n"
+        "fun f() { spawn() }\n"
+        "fun other() { mark(\"other\") }\n"
+    )
+
+    compiler = create_compiler()
+    interpreter = compiler.toolchain.interpreter
+    events = []
+    threads = []
+
+    def spawn():
+        thread = threading.Thread(target=interpreter.execute, args=(items["other"],), kwargs={"execute": True})
+        thread.start()
+        threads.append(thread)
+        # unsupported: the thread can't get in while this native holds the interpreter, joining would deadlock
+        thread.join(0.1)
+        events.append("alive" if thread.is_alive() else "done")
+
+    setattr(compiler.builtins, "spawn", spawn)
+    setattr(compiler.builtins, "mark", events.append)
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+    items = result.document.items
+
+    interpreter.execute(items["f"], execute=True)
+    threads[0].join()
+
+    assert events == ["alive", "other"]
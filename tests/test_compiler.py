@@ -0,0 +1,74 @@
+from main import create_compiler
+
+
+def test_compile_many(tmp_path):
+    (tmp_path / "lib.zs").write_text("var shared = 1")
+    (tmp_path / "a.zs").write_text("import { shared } from \"lib.zs\";\nvar a = shared")
+    (tmp_path / "b.zs").write_text("import { shared } from \"lib.zs\";\nvar b = shared")
+    (tmp_path / "c.zs").write_text("import { missing } from \"lib.zs\";")
+
+    compiler = create_compiler()
+    compiler.toolchain.import_system.add_directory(tmp_path)
+
+    parsed = []
+    parse_document = compiler.toolchain.parse_document
+    compiler.toolchain.parse_document = lambda path: parsed.append(path.name) or parse_document(path)
+
+    a, b, c = compiler.compile_many([tmp_path / "a.zs", tmp_path / "b.zs", tmp_path / "c.zs"])
+
+    assert parsed.count("lib.zs") == 1
+
+    assert a.success and b.success
+    assert a.document.items["a"] == 1 and "b" not in a.document.items
+    assert b.document.items["b"] == 1 and "a" not in b.document.items
+
+    assert not c.success
+    assert len(c.messages) == 1 and "missing" in str(c.messages[0].content)
+
+
+def test_import_cache_is_limited_to_batches(tmp_path):
+    (tmp_path / "lib.zs").write_text("var shared = 1")
+    (tmp_path / "a.zs").write_text("import { shared } from \"lib.zs\";\nvar a = shared")
+
+    compiler = create_compiler()
+    import_system = compiler.toolchain.import_system
+    import_system.add_directory(tmp_path)
+
+    compiled = []
+    compile_document = compiler.toolchain.compile_document
+    compiler.toolchain.compile_document = lambda path: compiled.append(path.name) or compile_document(path)
+
+    # outside a batch, every import compiles its source again
+    assert not import_system.caching
+    import_system.import_from(tmp_path / "lib.zs")
+    import_system.import_from(tmp_path / "lib.zs")
+    assert compiled.count("lib.zs") == 2 and not import_system.cache
+
+    compiler.compile_many([tmp_path / "a.zs", tmp_path / "a.zs"])
+    assert compiled.count("lib.zs") == 3
+    assert not import_system.caching and not import_system.cache
+
+    # with caching turned on, it stays on after the batch, and so do the results
+    import_system.caching = True
+    compiler.compile_many([tmp_path / "a.zs"])
+    assert import_system.caching and str((tmp_path / "lib.zs").resolve()) in import_system.cache
+
+
+def test_parsed_documents_are_only_cached_when_asked_to(tmp_path):
+    for name in "abc":
+        (tmp_path / f"{name}.zs").write_text(f"var {name} = 1")
+    paths = [tmp_path / f"{name}.zs" for name in "abc"]
+
+    compiler = create_compiler()
+    parsed = []
+    parse_document = compiler.toolchain.parse_document
+    compiler.toolchain.parse_document = lambda path: parsed.append(path.name) or parse_document(path)
+
+    compiler.compile_many(paths * 2)
+    assert len(parsed) == 6
+
+    # only the 2 most recently used documents are kept
+    parsed.clear()
+    compiler.context.node_cache_size = 2
+    compiler.compile_many([*paths, paths[2], paths[1], paths[0]])
+    assert parsed == ["a.zs", "b.zs", "c.zs", "a.zs"]
@@ -0,0 +1,16 @@
+from benchmarks.corpus import SCALES, generate
+from main import create_compiler
+
+
+def test_corpus_compiles(tmp_path):
+    corpus = generate(tmp_path, **SCALES["tiny"])
+
+    assert len(corpus.documents) == SCALES["tiny"]["documents"]
+    assert [bool(level) for level in corpus.levels] == [True] * SCALES["tiny"]["depth"]
+    assert all(corpus.imports[document] for level in corpus.levels[1:] for document in level)
+
+    compiler = create_compiler()
+    compiler.toolchain.import_system.add_directory(tmp_path)
+
+    for result in compiler.compile_many(corpus.entries):
+        assert result.success, (result.path, result.error, [str(message.content) for message in result.messages])
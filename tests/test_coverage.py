@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from main import create_compiler, main
+from zs.cli.options import OptionsError, get_options
+from zs.ctrt.coverage import Coverage
+
+
+SOURCE = (
+    "import { Function } from __srf__.builtins;\n"
+    "\n"
+    "fun used(a) { a }\n"
+    "fun unused(a) {\n"
+    "    used(a)\n"
+    "}\n"
+    "\n"
+    "var x = used(1)\n"
+)
+
+
+def _collect(path) -> Coverage:
+    compiler = create_compiler()
+    with Coverage() as coverage:
+        coverage.attach(compiler.toolchain)
+        [result] = compiler.compile_many([path])
+    assert result.success
+    assert "execute" not in vars(compiler.toolchain.interpreter)
+    # nothing from the compilation is kept alive once coverage is detached
+    assert coverage._seen == {None} and not coverage._lowered
+    return coverage
+
+
+def test_coverage(tmp_path):
+    path = tmp_path / "main.zs"
+    path.write_text(SOURCE)
+
+    coverage = _collect(path)
+
+    document = coverage.documents[str(path)]
+    assert document.executable_lines == [1, 3, 4, 5, 8]
+    assert document.missing_lines == [5]
+    assert document.percent == 80
+    assert document.spans[5, 9] == 1 and document.spans[8, 13] == 3
+
+    lcov = coverage.to_lcov()
+    assert f"SF:{path}\n" in lcov
+    assert "DA:5,0\n" in lcov and "DA:8,1\n" in lcov
+    assert "LF:5\nLH:4\nend_of_record\n" in lcov
+
+
+def test_coverage_merge(tmp_path):
+    path = tmp_path / "main.zs"
+    path.write_text(SOURCE)
+    out = tmp_path / "coverage.json"
+
+    _collect(path).save(out)
+
+    # a later run that covers the missing line is merged into the saved data
+    path.write_text(SOURCE.replace("var x = used(1)", "var x = unused(1)"))
+    _collect(path).save(out)
+
+    data = json.loads(out.read_text())
+    assert data["documents"][str(path)]["covered"] == [1, 3, 4, 5, 8]
+    assert Coverage.load(out).documents[str(path)].missing_lines == []
+
+
+def test_coverage_option(tmp_path, capsys, monkeypatch):
+    # `main` searches the test project relative to the repository
+    monkeypatch.chdir(Path(__file__).parent.parent)
+    path = tmp_path / "main.zs"
+    path.write_text(SOURCE)
+    out = tmp_path / "coverage.json"
+
+    # the option always takes a value, so the source given after it isn't taken for the output
+    with pytest.raises(OptionsError, match=f"not the source file '{path}'"):
+        get_options(["c", "--coverage", str(path)], exit_on_error=False)
+    with pytest.raises(OptionsError, match="expected one argument"):
+        get_options(["c", str(path), "--coverage"], exit_on_error=False)
+
+    main(get_options(["c", "--coverage", "-", str(path)]))
+    assert str(path) in capsys.readouterr().out
+
+    main(get_options(["c", f"--coverage={out}", str(path)]))
+    assert json.loads(out.read_text())["documents"][str(path)]["covered"] == [1, 3, 4, 8]
@@ -0,0 +1,93 @@
+from zs.dependency_graph import DependencyGraph
+from zs.processing import State
+
+
+def _order(graph: DependencyGraph):
+    state = State()
+    return graph.get_dependency_order(state), [str(message.content) for message in state.messages]
+
+
+def test_dependency_order():
+    graph = DependencyGraph[str]()
+    graph.add("app", "lib", "util", "lib")
+    graph.add("lib", "util")
+    graph.add("test", "app", "app")
+    graph.add("other")
+
+    order, errors = _order(graph)
+
+    assert order == [["util", "other"], ["lib"], ["app"], ["test"]]
+    assert not errors
+
+
+def test_cycle_is_reported_once_with_its_path():
+    graph = DependencyGraph[int]()
+    graph.add(1, 2)
+    graph.add(2, 3)
+    graph.add(3, 1)
+    graph.add(4, 2)
+    graph.add(5)
+
+    order, errors = _order(graph)
+
+    # the old implementation reported a second, bogus cycle for `4`, which only depends on the cycle,
+    # and failed to format the path of non-string items
+    assert errors == ["Circular dependency detected: 1 -> 2 -> 3 -> 1"]
+    assert order == [[5]]
+
+
+def test_self_dependency():
+    graph = DependencyGraph[str]()
+    graph.add("a", "a")
+
+    assert graph.get_cycles() == [["a", "a"]]
+
+
+def test_deep_chain():
+    graph = DependencyGraph[int]()
+    for node in reversed(range(1, 20_000)):
+        graph.add(node, node - 1)
+
+    order, errors = _order(graph)
+
+    assert len(order) == 20_000 and order[0] == [0] and order[-1] == [19_999]
+    assert not errors
+
+
+def test_update_only_relevels_downstream():
+    graph = DependencyGraph[str]()
+    graph.add("app", "lib")
+    graph.add("lib", "util")
+    graph.add("tool", "util")
+    graph.add("other")
+
+    state = State()
+    assert graph.update(state) == [["util", "other"], ["lib", "tool"], ["app"]]
+    assert graph.update(state) == []
+
+    graph.mark_dirty("lib")
+    assert graph.update(state) == [["lib"], ["app"]]
+
+    # `lib` no longer depends on `util` and moves to the first level, `app` follows it
+    graph.replace("lib")
+    assert graph.update(state) == [["lib"], ["app"]]
+    assert graph.get_dependency_order(state) == [["lib", "util", "other"], ["app", "tool"]]
+
+    graph.add("util", "new")
+    assert graph.update(state) == [["new"], ["util"], ["tool"]]
+    assert len(state.messages) == 0
+
+
+def test_update_breaking_a_cycle():
+    graph = DependencyGraph[str]()
+    graph.add("a", "b")
+    graph.add("b", "a")
+    graph.add("c", "a")
+
+    state = State()
+    assert graph.update(state) == []
+    assert len(state.messages) == 1
+
+    graph.replace("b")
+    assert graph.update(state) == [["b"], ["a"], ["c"]]
+    assert len(state.messages) == 1
@@ -0,0 +1,64 @@
+from zs import Object
+from zs.processing import MessageType, State
+
+
+class _Name:
+    formatted = 0
+
+    def __format__(self, format_spec):
+        _Name.formatted += 1
+        return "x"
+
+
+def test_messages_are_formatted_lazily():
+    state = State()
+    state.error("Could not resolve name \"{}\"", None, _Name())
+
+    [message] = state.messages
+    assert _Name.formatted == 0
+    assert str(message.content) == "Could not resolve name \"x\""
+    assert str(message.content) == "Could not resolve name \"x\""
+    assert _Name.formatted == 1
+
+
+def test_repeated_messages_are_counted_once():
+    state = State()
+    a, b = Object(), Object()
+
+    for _ in range(3):
+        state.error("Could not resolve name \"{}\"", a, "x")
+    state.error("Could not resolve name \"{}\"", b, "x")
+    state.warning("Could not resolve name \"{}\"", a, "x")
+    state.error("Could not resolve name \"{}\"", a, "y", code="E1")
+
+    assert [(message.type, message.count) for message in state.messages] == [
+        (MessageType.Error, 3), (MessageType.Error, 1), (MessageType.Warning, 1), (MessageType.Error, 1)
+    ]
+    assert state.messages[-1].code == "E1"
+    assert state.messages.count(MessageType.Error) == 5
+    assert state.messages.count() == 6
+
+
+def test_message_limit():
+    state = State(max_messages=10)
+
+    for i in range(1000):
+        state.error("error {}", None, i)
+    state.warning("warning")
+
+    assert len(state.messages) == 10
+    assert state.messages.count(MessageType.Error) == 1000
+    assert state.messages.dropped == 991
+    assert str(state.messages.overflow.content) == "991 more messages were not recorded (error: 990, warning: 1)"
+
+    state.messages.clear()
+    assert len(state.messages) == 0 and state.messages.count() == 0 and state.messages.overflow is None
+
+
+def test_reset_keeps_messages():
+    state = State()
+    messages = state.messages
+    state.info("info")
+
+    state.reset()
+    assert state.messages is messages and len(messages) == 1
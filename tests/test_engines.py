@@ -0,0 +1,254 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from main import create_compiler
+from zs import Object
+from zs.ast import node_lib
+from zs.engine import ExecutionEngine, available_engines, get_engine, register_engine
+from zs.processing import MessageType, StatefulProcessor
+from zs.std.processing.import_system import ImportSystem
+from zs.text.token import TokenType
+
+
+class _Scope:
+    def __init__(self):
+        self.items = {}
+
+
+class _Function:
+    def __init__(self, node, scope):
+        self.node = node
+        self.scope = scope
+
+
+class _WalkingEngine(ExecutionEngine, StatefulProcessor):
+    """
+    A minimal engine that evaluates the AST directly. It only understands what the conformance corpus uses.
+    """
+
+    name = "walk"
+
+    def __init__(self, state):
+        StatefulProcessor.__init__(self, state)
+        self._import_system = ImportSystem()
+        self._globals = {}
+        self._scope = None
+        self._locals = []
+
+    @property
+    def import_system(self):
+        return self._import_system
+
+    def define(self, name, value):
+        self._globals[name] = value
+
+    @contextmanager
+    def document(self, context):
+        scope, self._scope = self._scope, _Scope()
+        try:
+            with context.document(self._scope):
+                yield self._scope
+        finally:
+            self._scope = scope
+
+    def execute(self, node):
+        match node:
+            case node_lib.Var():
+                self._scope.items[str(node.name.name.name)] = self._evaluate(node.initializer)
+            case node_lib.Import():
+                source = self._evaluate(node.source)
+                if isinstance(source, str):
+                    source = self._import_system.import_from(Path(source))
+                for name in node.name:
+                    self._scope.items[str(name.name)] = source.item(str(name.name))
+            case node_lib.Function():
+                # like the default engine, a function replaces an earlier one of the same name
+                self._scope.items[str(node.name.name)] = _Function(node, self._scope)
+            case _:
+                self._evaluate(node)
+
+    def _evaluate(self, node):
+        match node:
+            case node_lib.Literal() if node.token_info.literal.type == TokenType.Decimal:
+                return int(str(node.token_info.literal.value))
+            case node_lib.Literal():
+                return str(node.token_info.literal.value)
+            case node_lib.Identifier():
+                name = str(node.name)
+                for items in (*reversed(self._locals), self._scope.items, self._globals):
+                    if name in items:
+                        return items[name]
+                self.state.error("Could not resolve name \"{}\"", node, name)
+            case node_lib.MemberAccess():
+                return getattr(self._evaluate(node.object), str(node.member.name))
+            case node_lib.FunctionCall():
+                return self._call(self._evaluate(node.callable), [self._evaluate(argument) for argument in node.arguments])
+            case _:
+                raise TypeError(f"Can't evaluate {type(node).__name__} nodes")
+
+    def _call(self, function, args):
+        if not isinstance(function, _Function):
+            return function(*args)
+
+        parameters = function.node.parameters
+        if len(args) != len(parameters):
+            return self.state.error(
+                f"Function \"{function.node.name.name}\" was called with an improper amount of arguments. "
+                f"Expected: {len(parameters)}, Got: {len(args)}",
+                function.node
+            )
+
+        scope, self._scope = self._scope, function.scope
+        self._locals.append({str(parameter.name.name): arg for parameter, arg in zip(parameters, args)})
+        try:
+            result = None
+            for item in function.node.body:
+                result = self._evaluate(item)
+            return result
+        finally:
+            self._locals.pop()
+            self._scope = scope
+
+
+@pytest.fixture(scope="module", autouse=True)
+def walking_engine():
+    register_engine(_WalkingEngine.name, _WalkingEngine)
+    try:
+        yield
+    finally:
+        from zs import engine
+        del engine._engines[_WalkingEngine.name]
+
+
+# the conformance corpus: every engine must produce the same document members and diagnostics. diagnostics are
+# compared by their type, content and the position of their origin
+CORPUS = {
+    "literals.zs": (
+        "var number = 1\nvar text = \"hi\"",
+        {"number": 1, "text": "hi"},
+        [],
+    ),
+    "imports.zs": (
+        "import { number } from \"literals.zs\";\nvar copy = number",
+        {"number": 1, "copy": 1},
+        [],
+    ),
+    "functions.zs": (
+        "import { Function } from __srf__.builtins;\n"
+        "fun id(x) { x }\n"
+        "fun second(a, b) { b }\n"
+        "var one = id(1)\n"
+        "var two = second(\"one\", id(2))",
+        {"one": 1, "two": 2},
+        [],
+    ),
+    "calls.zs": (
+        "import { Function } from __srf__.builtins;\n"
+        "import { id } from \"functions.zs\";\n"
+        "fun pick(a) { a }\n"
+        "fun pick(a, b) { b }\n"
+        "var picked = pick(1, 2)\n"
+        "var copy = id(\"copy\")\n"
+        "var wrong = pick(1)",
+        {"picked": 2, "copy": "copy"},
+        [
+            (
+                MessageType.Error,
+                "Function \"pick\" was called with an improper amount of arguments. Expected: 2, Got: 1",
+                (4, 1),
+            ),
+        ],
+    ),
+    "undefined.zs": (
+        "import { Function } from __srf__.builtins;\n"
+        "var value = missing\n"
+        "fun f() { nope }\n"
+        "var called = f()",
+        {},
+        [
+            (MessageType.Error, "Could not resolve name \"missing\"", (2, 13)),
+            (MessageType.Error, "Could not resolve name \"nope\"", (3, 11)),
+        ],
+    ),
+}
+
+
+def _position(origin):
+    span = getattr(origin, "span", None)
+    if span is None and isinstance(origin, Object) and origin.node is not None:
+        span = origin.node.span
+    return None if span is None else (span.start.line, span.start.column)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for name, (source, _, _) in CORPUS.items():
+        (tmp_path / name).write_text(source)
+    return tmp_path
+
+
+@pytest.mark.parametrize("engine", [*available_engines(), _WalkingEngine.name])
+def test_engine_conformance(engine, corpus):
+    compiler = create_compiler(engine=engine)
+    assert isinstance(compiler.toolchain.engine, ExecutionEngine)
+    assert compiler.toolchain.engine.name == engine
+
+    compiler.toolchain.import_system.add_directory(corpus)
+
+    results = compiler.compile_many(corpus / name for name in CORPUS)
+
+    for result, (name, (_, members, errors)) in zip(results, CORPUS.items()):
+        assert result.error is None, name
+        for member, value in members.items():
+            assert result.document.items[member] == value, (name, member)
+        assert [
+            (message.type, str(message.content), _position(message.origin)) for message in result.messages
+        ] == errors, name
+
+
+def test_engine_registry():
+    class Engine(ExecutionEngine):
+        def __init__(self, state):
+            self.state = state
+
+        import_system = None
+
+        def define(self, name, value): ...
+
+        def document(self, context): ...
+
+        def execute(self, node): ...
+
+    register_engine("test-engine", Engine)
+    try:
+        assert "test-engine" in available_engines()
+        assert get_engine("test-engine") is Engine
+        with pytest.raises(ValueError):
+            register_engine("test-engine", Engine)
+    finally:
+        from zs import engine
+        del engine._engines["test-engine"]
+
+    with pytest.raises(ValueError):
+        get_engine("missing")
+
+
+def test_engine_selected_on_the_command_line():
+    from zs.cli.options import get_options, OptionsError
+
+    # engines registered after the options were set up can be selected too
+    assert get_options(["c", "-e", _WalkingEngine.name, "main.zs"]).engine == _WalkingEngine.name
+
+    with pytest.raises(OptionsError, match="invalid choice: 'missing'"):
+        get_options(["c", "-e", "missing", "main.zs"], exit_on_error=False)
+
+
+def test_engine_without_limits():
+    from zs.ctrt.limits import ExecutionLimits
+
+    compiler = create_compiler(engine=_WalkingEngine.name)
+    assert compiler.toolchain.engine.limits is None
+    with pytest.raises(ValueError, match="doesn't support execution limits"):
+        compiler.toolchain.engine.limits = ExecutionLimits(max_depth=10)
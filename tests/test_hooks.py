@@ -0,0 +1,71 @@
+import pytest
+
+from main import create_compiler
+
+
+def test_hooks(tmp_path):
+    (tmp_path / "lib.zs").write_text("var shared = 1")
+    (tmp_path / "main.zs").write_text(
+        "import { Function } from __srf__.builtins;\n"
+        "import { shared } from \"lib.zs\";\n"
+        "fun id(x) { x }\n"
+        "var a = id(shared)"
+    )
+
+    compiler = create_compiler()
+    toolchain = compiler.toolchain
+    toolchain.import_system.add_directory(tmp_path)
+    hooks = toolchain.hooks
+
+    events = {event: [] for event in hooks.EVENTS}
+    callbacks = {event: (lambda *args, event=event: events[event].append(args)) for event in hooks.EVENTS}
+
+    targets = [
+        (toolchain.tokenizer, "tokenize"), (toolchain.parser, "next"), (toolchain.preprocessor, "preprocess"),
+        (toolchain.interpreter, "execute"), (toolchain.interpreter.x, "frame"),
+        (toolchain.import_system, "import_from"),
+    ]
+
+    for event, callback in callbacks.items():
+        hooks.subscribe(event, callback)
+        assert hooks.is_active(event)
+    assert all(attribute in vars(target) for target, attribute in targets)
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+    assert result.success
+
+    assert any(str(token.value) == "shared" for token, in events["token"])
+    assert events["node"] and events["preprocess"] and events["instruction"]
+    assert [function.name for function, _ in events["call"]] == ["id"]
+    assert [str(path) for path, _ in events["import"]] == ["lib.zs"]
+    assert events["import"][0][1].item("shared") == 1
+
+    for event, callback in callbacks.items():
+        hooks.unsubscribe(event, callback)
+
+    # with no subscribers left, the original methods are used again
+    assert not any(attribute in vars(target) for target, attribute in targets)
+
+    with pytest.raises(ValueError):
+        hooks.subscribe("missing", print)
+
+
+def test_hooks_keep_other_wrappers(tmp_path):
+    compiler = create_compiler()
+    interpreter = compiler.toolchain.interpreter
+    hooks = compiler.toolchain.hooks
+
+    def wrapper(inst, *args, **kwargs):
+        return execute(inst, *args, **kwargs)
+
+    execute = interpreter.execute
+    interpreter.execute = wrapper
+
+    seen = []
+    with hooks.subscribed("instruction", seen.append):
+        assert interpreter.execute(1) == 1
+        with hooks.subscribed("instruction", seen.append):
+            interpreter.execute(2)
+
+    assert seen == [1, 2, 2]
+    assert interpreter.execute is wrapper
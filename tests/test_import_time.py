@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import zs
+
+
+SRC = Path(zs.__file__).parent.parent
+
+# `import zs` measured at about a fifth of the time it then takes to load the toolchain, in the same process so
+# the comparison doesn't depend on the speed of the machine. fail at twice that
+IMPORT_TIME_RATIO = 0.4
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env, capture_output=True, text=True, check=True
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_zs_is_lazy():
+    times = _import_times("import zs")
+
+    for module in ("inspect", "zs.std", "zs.text.parser", "zs.ctrt.interpreter", "zs.std.processing.toolchain"):
+        assert module not in times
+
+
+def test_import_zs_is_fast():
+    times = _import_times("import zs; import zs.std.processing.toolchain")
+
+    assert times["zs"] < times["zs.std.processing.toolchain"] * IMPORT_TIME_RATIO
+
+
+def test_submodules_load_on_access():
+    times = _import_times("import zs; zs.std.String")
+
+    assert "zs.std.objects.wrappers" in times
+    assert "zs.std.processing.toolchain" not in times
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from main import create_compiler
+from zs.cli.options import OptionsError, get_options
+from zs.instrumentation import Instrumentation
+
+
+def test_instrumentation(tmp_path):
+    (tmp_path / "lib.zs").write_text("var shared = 1")
+    (tmp_path / "main.zs").write_text("import { shared } from \"lib.zs\";\nvar a = shared")
+
+    compiler = create_compiler()
+    compiler.toolchain.import_system.add_directory(tmp_path)
+
+    instrumentation = compiler.toolchain.instrumentation = Instrumentation()
+    interpreter = compiler.toolchain.interpreter
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+    assert result.error is None
+
+    [main] = instrumentation.root.children
+    assert main.kind == "document" and main.name == str(tmp_path / "main.zs")
+    assert [phase.name for phase in main.children] == ["tokenize", "parse", "execute"]
+
+    tokenize, parse, execute = main.children
+    assert tokenize.counters["tokens"] > 0
+    assert parse.counters["nodes"] == 2
+    assert execute.counters["instructions"] > 0
+
+    # the imported document is recorded inside the phase that imported it
+    [lib] = [record for _, record in execute.walk() if record.kind == "document"]
+    assert lib.name == str(tmp_path / "lib.zs")
+    assert lib.total("nodes") == 1
+    assert main.total("nodes") == 3
+
+    assert main.wall >= execute.wall >= lib.wall > 0
+    assert main.self_wall >= 0
+
+    # nothing is left installed once compilation is done
+    assert "execute" not in vars(interpreter)
+
+    data = json.loads(instrumentation.to_json())
+    assert data["children"][0]["name"] == main.name
+    assert "tokenize" in instrumentation.format_table()
+
+
+def test_memory_instrumentation(tmp_path):
+    (tmp_path / "lib.zs").write_text("var shared = 1")
+    (tmp_path / "main.zs").write_text("import { shared } from \"lib.zs\";\nvar a = shared")
+
+    compiler = create_compiler()
+    compiler.toolchain.import_system.add_directory(tmp_path)
+
+    instrumentation = compiler.toolchain.instrumentation = Instrumentation(memory=True, top=5)
+
+    with instrumentation.tracing():
+        [result] = compiler.compile_many([tmp_path / "main.zs"])
+    assert result.error is None
+
+    [main] = instrumentation.root.children
+    tokenize, parse, execute = main.children
+    [lib] = [record for _, record in execute.walk() if record.kind == "document"]
+
+    for record in (main, tokenize, parse, execute, lib):
+        assert record.peak >= record.retained > 0
+    assert main.peak >= execute.peak >= lib.peak
+
+    # the top lines are only collected for documents, and only from the zs package itself
+    assert tokenize.top is None
+    assert 0 < len(main.top) <= 5
+    assert all("/zs/" in line and "instrumentation.py" not in line for line, _, _ in main.top)
+    assert instrumentation.root.top
+
+    data = json.loads(instrumentation.to_json())
+    assert data["children"][0]["memory"]["peak"] == main.peak
+    assert "peak KiB" in instrumentation.format_table()
+    assert main.name in instrumentation.format_top()
+
+
+def test_timings_option():
+    assert get_options(["c", "--timings", "-", "main.zs"]).timings == "-"
+    assert get_options(["c", "--timings=out.json", "main.zs"]).timings == "out.json"
+    assert get_options(["c", "main.zs"]).timings is None
+
+    # the option always takes a value, so it can't swallow the source
+    with pytest.raises(OptionsError, match="not the source file 'main.zs'"):
+        get_options(["c", "--timings", "main.zs"], exit_on_error=False)
+    with pytest.raises(OptionsError, match="expected one argument"):
+        get_options(["c", "main.zs", "--timings"], exit_on_error=False)
+
+
+def test_memory_profile_option():
+    assert get_options(["c", "--memory-profile", "-", "main.zs"]).memory_profile == "-"
+    assert get_options(["c", "--memory-profile=memory.json", "main.zs"]).memory_profile == "memory.json"
+
+    with pytest.raises(OptionsError, match="not the source file 'main.zs'"):
+        get_options(["c", "--memory-profile", "main.zs"], exit_on_error=False)
+    with pytest.raises(OptionsError, match="expected one argument"):
+        get_options(["c", "main.zs", "--memory-profile"], exit_on_error=False)
@@ -0,0 +1,110 @@
+import time
+
+from main import create_compiler
+from zs.ctrt.limits import ExecutionLimits
+
+
+RECURSIVE = (
+    "import { Function } from __srf__.builtins;\n"
+    "fun f(x) { f(x) }\n"
+    "var y = f(1)\n"
+)
+
+
+def _errors(result):
+    return [str(message) for message in result.messages if message.type.name == "Error"]
+
+
+def test_depth_limit(tmp_path):
+    (tmp_path / "main.zs").write_text(RECURSIVE)
+
+    compiler = create_compiler(limits=ExecutionLimits(max_depth=50))
+    interpreter = compiler.toolchain.interpreter
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    assert not result.success
+    [message] = [message for message in result.messages if message.type.name == "Error"]
+    assert "nested more than 50 deep" in str(message)
+    assert message.span is not None and message.span.location.endswith("main.zs:2:13")
+
+    # the interpreter is usable again afterwards
+    assert not interpreter.x.frames
+
+
+def test_instruction_limit(tmp_path):
+    (tmp_path / "main.zs").write_text(RECURSIVE)
+
+    compiler = create_compiler(limits=ExecutionLimits(max_instructions=100))
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    [error] = _errors(result)
+    assert "more than 100 instructions" in error
+
+
+def test_timeout(tmp_path):
+    (tmp_path / "main.zs").write_text(
+        "import { Function, slow } from __srf__.builtins;\n"
+        "fun f() { slow(); f() }\n"
+        "var y = f()\n"
+    )
+
+    compiler = create_compiler(limits=ExecutionLimits(timeout=0.05, max_depth=10_000, check_interval=1))
+    setattr(compiler.builtins, "slow", lambda: time.sleep(0.01))
+
+    start = time.perf_counter()
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    [error] = _errors(result)
+    assert "more than 0.05 seconds" in error
+    assert time.perf_counter() - start < 5
+
+
+def test_scope_size_limit(tmp_path):
+    (tmp_path / "main.zs").write_text('\n'.join(f"var a{i} = {i}" for i in range(20)))
+
+    compiler = create_compiler(limits=ExecutionLimits(max_scope_size=5, check_interval=1))
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    [error] = _errors(result)
+    assert "more than 5 names" in error
+
+
+def test_limits_span_imports(tmp_path):
+    (tmp_path / "rec.zs").write_text(RECURSIVE)
+    (tmp_path / "main.zs").write_text(
+        "import { Function } from __srf__.builtins;\n"
+        "import { y } from \"rec.zs\";\n"
+        "var z = y\n"
+    )
+
+    compiler = create_compiler(limits=ExecutionLimits(max_depth=50))
+    compiler.toolchain.import_system.add_directory(tmp_path)
+
+    # the budget restarts for each target, and the error is reported once, where it happened
+    first, second = compiler.compile_many([tmp_path / "main.zs", tmp_path / "rec.zs"])
+    for result in (first, second):
+        [message] = [message for message in result.messages if message.type.name == "Error"]
+        assert message.span.document.path_string == str(tmp_path / "rec.zs")
+
+
+def test_recursion_error_is_reported(tmp_path):
+    (tmp_path / "main.zs").write_text(RECURSIVE)
+
+    compiler = create_compiler(limits=ExecutionLimits())
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    [error] = _errors(result)
+    assert "nested too deep" in error
+
+
+def test_removing_limits():
+    compiler = create_compiler()
+    interpreter = compiler.toolchain.interpreter
+
+    interpreter.limits = ExecutionLimits(max_instructions=10)
+    assert "execute" in vars(interpreter)
+
+    interpreter.limits = None
+    assert "execute" not in vars(interpreter)
+    assert interpreter.limits is None
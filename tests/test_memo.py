@@ -0,0 +1,71 @@
+from main import create_compiler
+from zs.ctrt.lib import Function
+from zs.ctrt.memo import MemoizedFunction
+
+
+SOURCE = (
+    "import { Function, memoize, tick } from __srf__.builtins;\n"
+    "\n"
+    "fun f(a) { tick(a) }\n"
+    "var g = memoize(f)\n"
+    "\n"
+    "var x = g(1)\n"
+    "var y = g(1)\n"
+    "var z = g(2)\n"
+)
+
+
+def test_memoize(tmp_path):
+    (tmp_path / "main.zs").write_text(SOURCE)
+
+    compiler = create_compiler()
+    calls = []
+
+    def tick(a):
+        calls.append(a)
+        return 10 * a
+
+    setattr(compiler.builtins, "tick", tick)
+
+    [result] = compiler.compile_many([tmp_path / "main.zs"])
+    assert result.success
+
+    items = result.document.items
+    assert (items["x"], items["y"], items["z"]) == (10, 10, 20)
+    assert calls == [1, 2]
+
+    g = items["g"]
+    assert isinstance(g, MemoizedFunction) and g.name == "f"
+    assert (g.hits, g.misses, g.size) == (1, 2, 2)
+
+    assert g.invalidate(1) and not g.invalidate(1)
+    assert g(1) == 10 and calls == [1, 2, 1]
+
+    g.clear()
+    assert g.size == 0
+
+
+def test_memoize_lru():
+    calls = []
+
+    def execute(fn, *args):
+        calls.append(args)
+        return len(calls)
+
+    memoized = MemoizedFunction(Function("f"), execute, max_size=2)
+
+    memoized(1)
+    memoized(2)
+    memoized(1)  # 1 is now the most recently used
+    memoized(3)  # evicts 2
+    assert memoized.size == 2
+
+    memoized(1)
+    memoized(2)
+    assert calls == [(1,), (2,), (3,), (2,)]
+    assert (memoized.hits, memoized.misses) == (2, 4)
+
+    # unhashable arguments are keyed by identity
+    items = []
+    assert memoized(items) == memoized(items)
+    assert memoized([]) != memoized(items)
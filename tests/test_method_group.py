@@ -0,0 +1,88 @@
+from zs import Object
+from zs.processing import State
+from zs.std.objects.compilation_environment import ContextManager
+from zs.std.objects.expression import Call
+from zs.std.objects.function import Function
+from zs.std.objects.type import MethodGroup
+from zs.std.processing.interpreter import Resolver
+
+
+def _function(name: str, arity: int):
+    function = Function(name)
+    for i in range(arity):
+        function.add_parameter(f"p{i}", None)
+    return function
+
+
+def test_find_overloads_by_arity():
+    group = MethodGroup("f", *(_function(f"f{i}", i) for i in range(100)))
+
+    resolved = []
+    (overload,) = group.find_overloads([Object(), Object()], lambda fn: resolved.append(fn) or fn)
+    assert overload.name == "f2"
+
+    # the same argument types are looked up in the memo, without resolving again
+    assert group.find_overloads([Object(), Object()], lambda fn: resolved.append(fn) or fn) == (overload,)
+    assert resolved == [overload]
+
+    group.add(_function("g", 2))
+    assert [fn.name for fn in group.find_overloads([Object(), Object()])] == ["f2", "g"]
+
+
+def test_resolve_call():
+    group = MethodGroup("f", _function("f0", 0), _function("f1", 1), _function("f1b", 1))
+    state = State()
+    resolver = Resolver(state, ContextManager())
+
+    call = resolver.resolve(Call(group))
+    assert call.callable.name == "f0"
+    assert resolver.resolve(Call(group, Object(), Object())) is None
+    assert resolver.resolve(Call(group, Object())) is None
+    assert [str(message.content) for message in state.messages] == [
+        "Could not find a suitable overload",
+        "Argument list matched more than 1 overload",
+    ]
+
+
+def test_mixed_native_and_zs_overloads():
+    from zs.base import NativeFunction
+
+    variadic = NativeFunction(lambda *args: len(args), "variadic")
+    pair = NativeFunction(lambda a, b: None, "pair")
+    group = MethodGroup("f", _function("f1", 1), variadic, pair)
+
+    # a Z# function with the right number of parameters beats a native that accepts anything
+    assert [fn.name for fn in group.find_overloads([Object()])] == ["f1"]
+    assert [fn.name for fn in group.find_overloads([Object()] * 3)] == ["variadic"]
+    assert [fn.name for fn in group.find_overloads([Object()] * 2)] == ["variadic", "pair"]
+
+
+def test_overload_gains_a_parameter():
+    f = _function("f", 1)
+    group = MethodGroup("f", f, _function("g", 2))
+    assert [fn.name for fn in group.find_overloads([Object(), Object()])] == ["g"]
+
+    # the group was already queried, and still sees the new parameter
+    f.add_parameter("extra", None)
+    assert [fn.name for fn in group.find_overloads([Object(), Object()])] == ["f", "g"]
+    assert group.get_overloads(1) == []
+
+
+    # only the groups the function is in are invalidated
+    other = MethodGroup("h", _function("h", 1))
+    other.find_overloads([Object()])
+    _function("unrelated", 0).add_parameter("x", None)
+    f.add_parameter("more", None)
+    assert other._memo and not group._memo
+
+
+def test_native_arguments():
+    group = MethodGroup("f", _function("f1", 1), _function("f2", 2))
+
+    # Python values have no runtime type, they're remembered by their Python type
+    assert [fn.name for fn in group.find_overloads([1])] == ["f1"]
+    assert [fn.name for fn in group.find_overloads([1, "x"])] == ["f2"]
+    assert (int,) in group._memo
+
+    resolver = Resolver(State(), ContextManager())
+    assert resolver.resolve(Call(group, 1, Object())).callable.name == "f2"
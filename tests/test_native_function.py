@@ -0,0 +1,80 @@
+from zs.base import NativeFunction, NativeMethod
+
+
+def _f(a, b=1, *, c, d=2): ...
+
+
+def test_call_shape():
+    shape = NativeFunction(_f).shape
+
+    assert (shape.min_positional, shape.max_positional) == (1, 2)
+    assert shape.required_keywords == {"c"}
+
+    assert shape.accepts(1, ("c",))
+    assert shape.accepts(0, ("a", "c"))
+    assert not shape.accepts(1)
+    assert not shape.accepts(3, ("c",))
+    assert not shape.accepts(1, ("a", "c"))
+    assert not shape.accepts(1, ("c", "unknown"))
+
+
+def test_match_score():
+    assert NativeFunction(_f).get_match_score(1, c=2) == -1
+    assert NativeFunction(_f).get_match_score(1) == 0
+    assert NativeFunction(lambda *args: None).get_match_score(1, 2, 3) == -1
+
+
+def test_method_shape_skips_the_bound_argument():
+    class A:
+        def method(self, x): ...
+
+    method = NativeMethod(A.method, A())
+    assert method.get_match_score(1) == -1
+    assert method.get_match_score(1, 2) == 0
+
+
+def test_bound_methods_are_cached_per_instance():
+    import gc
+    import weakref
+
+    from zs.interop import zs_function
+
+    class A:
+        @zs_function()
+        def method(self, x):
+            return self, x
+
+    a, b = A(), A()
+    assert a.method(1) == (a, 1) and b.method(2) == (b, 2)
+
+    # a second access returns the method bound by the first, even though nothing else held on to it
+    method = weakref.ref(a.method)
+    assert method() is not None and a.method is method()
+    assert a.method is not b.method
+    assert "method" not in vars(a)
+    assert a.method.shape is b.method.shape
+    assert isinstance(A.method, NativeFunction) and not isinstance(A.method, NativeMethod)
+
+    # the method lives as long as its instance, and doesn't keep it alive
+    ref = weakref.ref(a)
+    del a
+    gc.collect()
+    assert ref() is None and method() is None
+
+    # instances without a __dict__ still get bound methods, they're just not cached
+    class B:
+        __slots__ = ()
+
+        @zs_function()
+        def method(self, x):
+            return x
+
+    assert B().method(1) == 1
+
+    # replacing the function on the class isn't hidden by a cached method
+    A.method = zs_function()(lambda self, x: x)
+    assert b.method(3) == 3
+
+
+def test_signature_is_computed_once_per_function():
+    assert NativeFunction(_f).signature is NativeFunction(_f, "g").signature
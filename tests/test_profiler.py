@@ -0,0 +1,49 @@
+import threading
+import time
+
+from main import create_compiler
+from zs.ctrt.profiler import Profiler
+
+
+SOURCE = (
+    "import { Function, wait } from __srf__.builtins;\n"
+    "\n"
+    "fun inner() { wait() }\n"
+    "fun outer() { inner() }\n"
+    "\n"
+    "var result = outer()\n"
+)
+
+
+def test_profiler(tmp_path):
+    (tmp_path / "main.zs").write_text(SOURCE)
+
+    compiler = create_compiler()
+    profiler = Profiler(compiler.toolchain.interpreter, interval=0.0005)
+
+    sampled = threading.Event()
+
+    def wait():
+        # keep Z# code on the stack until the sampler thread caught it a few times
+        deadline = time.monotonic() + 5
+        while sum(profiler.samples.values()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        sampled.set()
+        return 1
+
+    setattr(compiler.builtins, "wait", wait)
+
+    with profiler:
+        [result] = compiler.compile_many([tmp_path / "main.zs"])
+
+    assert result.success and result.document.items["result"] == 1
+    assert sampled.is_set() and not profiler.running
+
+    path = str(tmp_path / "main.zs")
+    expected = (path, f"outer ({path}:4:1)", f"inner ({path}:3:1)", f"@ {path}:3:19")
+    assert profiler.samples[expected] >= 3
+    assert profiler.top(1)[0][0] == f"@ {path}:3:19"
+
+    out = tmp_path / "profile.txt"
+    profiler.write(out)
+    assert f"{';'.join(expected)} {profiler.samples[expected]}\n" in out.read_text()
@@ -0,0 +1,131 @@
+import gc
+import pickle
+import threading
+import time
+
+import pytest
+
+from zs.std.processing.resolution_cache import ResolutionCache
+
+
+class _Unhashable:
+    __hash__ = None
+
+
+def test_resolves_once_by_identity():
+    cache = ResolutionCache()
+    calls = []
+
+    def resolve(obj):
+        calls.append(obj)
+        return ["resolved", obj]
+
+    item = _Unhashable()
+    first = cache.resolve(item, resolve)
+    assert cache.resolve(item, resolve) is first
+    assert calls == [item]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # the result is resolved as well
+    assert first in cache and cache.resolve(first, resolve) is first
+    assert None in cache
+
+
+def test_reentrant_resolution_returns_the_object():
+    cache = ResolutionCache()
+    item = _Unhashable()
+
+    assert cache.resolve(item, lambda obj: cache.resolve(obj, lambda _: "inner")) is item
+
+
+def test_weak_entries_are_evicted():
+    cache = ResolutionCache()
+    item = _Unhashable()
+
+    cache.resolve(item, lambda obj: obj)
+    assert len(cache) == 1
+
+    del item
+    gc.collect()
+    assert len(cache) == 0
+
+
+def test_strong_entries_are_bounded():
+    cache = ResolutionCache(max_strong=2)
+    items = [(i,) for i in range(3)]
+    for item in items:
+        cache.resolve(item, lambda obj: obj)
+
+    assert items[0] not in cache
+    assert items[1] in cache and items[2] in cache
+
+
+def test_waiting_threads_get_the_error():
+    cache = ResolutionCache()
+    item = _Unhashable()
+    started, release = threading.Event(), threading.Event()
+
+    def resolve(_):
+        started.set()
+        release.wait(timeout=5)
+        raise LookupError("failed")
+
+    errors = []
+
+    def wait():
+        try:
+            cache.resolve(item, lambda obj: obj)
+        except LookupError as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=lambda: pytest.raises(LookupError, cache.resolve, item, resolve))
+    owner.start()
+    started.wait(timeout=5)
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    while not cache._waiting:
+        time.sleep(0.001)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert [str(e) for e in errors] == ["failed"]
+    assert item not in cache
+
+
+def test_cycle_across_threads_does_not_deadlock():
+    cache = ResolutionCache()
+    x, y = _Unhashable(), _Unhashable()
+    owns_x, owns_y = threading.Event(), threading.Event()
+    results = {}
+
+    def resolve_x(obj):
+        owns_x.set()
+        owns_y.wait(timeout=5)
+        return ["x", cache.resolve(y, resolve_y)]
+
+    def resolve_y(obj):
+        owns_y.set()
+        owns_x.wait(timeout=5)
+        return ["y", cache.resolve(x, resolve_x)]
+
+    threads = [
+        threading.Thread(target=lambda: results.__setitem__("x", cache.resolve(x, resolve_x))),
+        threading.Thread(target=lambda: results.__setitem__("y", cache.resolve(y, resolve_y))),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    # one of them got the other one unresolved, and the other one waited for its result
+    assert results["x"][1] is results["y"] or results["y"][1] is results["x"]
+
+
+def test_pickled_cache_is_empty():
+    cache = ResolutionCache(max_strong=7)
+    cache.resolve(_Unhashable(), lambda obj: obj)
+
+    copy = pickle.loads(pickle.dumps(cache))
+    assert len(copy) == 0 and copy._max_strong == 7
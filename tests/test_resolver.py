@@ -0,0 +1,76 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import singledispatchmethod
+
+from zs import EmptyObject
+from zs.processing import State
+from zs.std.objects.compilation_environment import ContextManager
+from zs.std.processing.interpreter import Resolver
+
+
+_barriers: dict[str, threading.Barrier] = {}
+
+
+class _Item(EmptyObject):
+    def __init__(self, name: str, barrier: str = None):
+        super().__init__()
+        self.name = name
+        self.barrier = barrier
+        self.resolved = False
+
+
+class _ItemResolver(Resolver):
+    # a dispatcher of its own, so the test doesn't add to the one of `Resolver`
+    @singledispatchmethod
+    def _resolve(self, obj):
+        return super()._resolve(obj)
+
+    @_resolve.register
+    def _(self, item: _Item):
+        if not item.resolved:
+            if item.barrier is not None:
+                # only passes if the whole layer is being resolved at the same time
+                _barriers[item.barrier].wait(timeout=5)
+            self.state.error(f"resolved {item.name}", item)
+            item.resolved = True
+        return item
+
+
+def test_resolve_layers_concurrently():
+    _barriers["first"] = threading.Barrier(3)
+    first = [_Item(name, "first") for name in "abc"]
+    second = [_Item(name) for name in "de"]
+
+    state = State()
+    with ThreadPoolExecutor(3) as executor:
+        resolver = _ItemResolver(state, ContextManager(), executor=executor)
+        resolver.resolve_layers([first, second])
+
+    assert all(item.resolved for item in first + second)
+    assert [str(message.content) for message in state.messages] == [f"resolved {name}" for name in "abcde"]
+    assert [message.origin for message in state.messages] == first + second
+
+    # everything is cached by the shared cache, so resolving again doesn't do anything
+    resolver.executor = None
+    resolver.resolve_layers([first, second])
+    assert len(state.messages) == 5
+
+
+def test_resolve_layers_in_processes():
+    items = [_Item(name) for name in "abc"]
+
+    state = State()
+    with ProcessPoolExecutor(2) as executor:
+        resolver = _ItemResolver(state, ContextManager(), executor=executor)
+        resolver.resolve_layers([items])
+
+    assert [str(message.content) for message in state.messages] == [f"resolved {name}" for name in "abc"]
+
+    # the resolved items are copies sent back by the workers
+    for item in items:
+        resolved = resolver.cache.get(item)
+        assert resolved is not item and resolved.resolved and resolved.name == item.name
+
+
+def test_resolver_registry_is_untouched():
+    assert _Item not in vars(Resolver)["_resolve"].dispatcher.registry
@@ -0,0 +1,79 @@
+import os
+import stat
+import threading
+
+from main import create_compiler, create_request_handler
+from zs.cli.server import CompileServer, send_request
+
+
+def test_compile_server(tmp_path, monkeypatch):
+    # the server resolves paths against the client's directory, and never changes its own
+    (tmp_path / "elsewhere").mkdir()
+    monkeypatch.chdir(tmp_path / "elsewhere")
+
+    (tmp_path / "lib.zs").write_text("var shared = 1")
+    (tmp_path / "main.zs").write_text("import { shared } from \"lib.zs\";\nvar a = shared")
+    (tmp_path / "bad.zs").write_text("import { missing } from \"lib.zs\";")
+
+    compiler = create_compiler()
+    compiler.toolchain.import_system.add_directory(tmp_path)
+
+    parsed = []
+    parse_document = compiler.toolchain.parse_document
+    compiler.toolchain.parse_document = lambda path: parsed.append(path.name) or parse_document(path)
+
+    server = CompileServer(str(tmp_path / "zs.sock"), create_request_handler(compiler))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    # only the user running the server may connect to it
+    assert stat.S_IMODE(os.stat(tmp_path / "zs.sock").st_mode) == 0o600
+
+    try:
+        def request(*args):
+            return list(send_request(server.server_address, list(args), str(tmp_path)))
+
+        *messages, done = request("main.zs")
+        assert done == {"done": True, "success": True, "error": None} and not messages
+
+        *messages, done = request("main.zs")
+        assert done["success"]
+        assert parsed.count("lib.zs") == 1 and parsed.count("main.zs") == 1
+
+        *messages, done = request("bad.zs")
+        assert not done["success"]
+        assert len(messages) == 1 and "missing" in messages[0]["message"]["content"]
+
+        (tmp_path / "lib.zs").write_text("var shared = 2\nvar missing = 3")
+        info = os.stat(tmp_path / "lib.zs")
+        os.utime(tmp_path / "lib.zs", ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+
+        *messages, done = request("bad.zs")
+        assert done["success"] and not messages
+        assert parsed.count("lib.zs") == 2
+
+        # bad arguments and unsupported options fail the request, not the server
+        [done] = request("-e", "bogus", "main.zs")
+        assert not done["success"] and "invalid choice: 'bogus'" in done["error"] and "usage:" in done["error"]
+
+        [done] = request("--timings", "-", "main.zs")
+        assert not done["success"] and "--timings" in done["error"]
+
+        [done] = request("--help")
+        assert not done["success"]
+
+        # per-request limits are applied, and removed again afterwards
+        (tmp_path / "loop.zs").write_text("import { Function } from __srf__.builtins;\nfun f(x) { f(x) }\nvar y = f(1)")
+        *messages, done = request("--max-depth", "20", "loop.zs")
+        assert not done["success"] and "nested more than 20 deep" in messages[0]["message"]["content"]
+        assert compiler.toolchain.interpreter.limits is None
+
+        *messages, done = request("main.zs")
+        assert done["success"]
+        assert os.getcwd() == str(tmp_path / "elsewhere")
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert not (tmp_path / "zs.sock").exists()
@@ -0,0 +1,93 @@
+import io
+import os
+import pickle
+from pathlib import Path
+
+from main import create_compiler
+from zs.ctrt.snapshot import MAGIC, Snapshot
+
+
+def test_snapshot_restore(tmp_path):
+    (tmp_path / "setup.zs").write_text(
+        "import { Object, setattr } from __srf__.builtins;\n"
+        "var config = Object()\n"
+        "setattr(config, \"name\", \"zs\")\n"
+        "setattr(__srf__.builtins, \"answer\", 42)"
+    )
+
+    compiler = create_compiler()
+    compiler.toolchain.import_system.caching = True
+    snapshot = Snapshot(compiler.natives())
+    compiler.toolchain.import_system.import_from(tmp_path / "setup.zs")
+    image = snapshot.capture(compiler.toolchain.import_system)
+
+    restored = create_compiler()
+    Snapshot.restore(image, restored.toolchain.import_system, restored.natives())
+
+    assert restored.builtins.answer == 42
+
+    result = restored.toolchain.import_system.import_from(Path(tmp_path / "setup.zs"))
+    assert result.item("config").name == "zs"
+    assert type(result.item("config")) is restored.builtins.Object
+
+
+def test_snapshot_is_current(tmp_path):
+    setup = tmp_path / "setup.zs"
+    setup.write_text("var answer = 42")
+    image = tmp_path / "setup.snapshot"
+
+    compiler = create_compiler()
+    compiler.toolchain.import_system.caching = True
+    snapshot = Snapshot(compiler.natives())
+    compiler.toolchain.import_system.import_from(setup)
+    snapshot.save(image, compiler.toolchain.import_system, setup)
+
+    assert Snapshot.header(image.read_bytes())["bootstrap"] == str(setup.resolve())
+    assert Snapshot.is_current(image) and Snapshot.is_current(image, setup)
+    assert not Snapshot.is_current(image, tmp_path / "other.zs")
+    assert not Snapshot.is_current(tmp_path / "missing.snapshot")
+
+    # the stamps are restored along with the cache, so changed sources are noticed after a restore
+    restored = create_compiler()
+    Snapshot.load(image, restored.toolchain.import_system, restored.natives())
+    assert restored.toolchain.import_system.stamps == compiler.toolchain.import_system.stamps
+
+    stamp = os.stat(setup).st_mtime_ns
+    os.utime(setup, ns=(stamp + 10 ** 9, stamp + 10 ** 9))
+    assert not Snapshot.is_current(image, setup)
+    assert restored.toolchain.import_system.invalidate_stale() == [str(setup.resolve())]
+
+
+def test_snapshot_header_of_other_files(tmp_path):
+    assert Snapshot.header(b"") is None
+    assert Snapshot.header(pickle.dumps({"zs": "0"})) is None
+
+    (tmp_path / "other").write_bytes(b"not a snapshot")
+    assert not Snapshot.is_current(tmp_path / "other")
+
+    assert Snapshot.header(MAGIC + b"\xff\xff\x00\x00{") is None
+
+
+class _Unpickled:
+    loaded = False
+
+    def __reduce__(self):
+        return _Unpickled._load, ()
+
+    @staticmethod
+    def _load():
+        _Unpickled.loaded = True
+
+
+def test_snapshot_header_is_read_without_unpickling(tmp_path):
+    compiler = create_compiler()
+    image = Snapshot(compiler.natives()).capture(compiler.toolchain.import_system)
+    buffer = io.BytesIO(image)
+    header = Snapshot.header(buffer)
+
+    # a body that runs code when it's unpickled is never loaded by reading the header
+    (tmp_path / "image").write_bytes(image[:buffer.tell()] + pickle.dumps(_Unpickled()))
+
+    assert Snapshot.header((tmp_path / "image").read_bytes()) == header
+    assert Snapshot.is_current(tmp_path / "image")
+    assert not _Unpickled.loaded
@@ -0,0 +1,67 @@
+from zs import EmptyObject
+from zs.base import NativeFunction, Type
+from zs.processing import State
+from zs.std.processing.interpreter import Interpreter
+
+
+_Number_Type = Type()
+
+
+class _Number(EmptyObject):
+    def __init__(self, value: int):
+        super().__init__()
+        self.value = value
+
+    @property
+    def runtime_type(self):
+        return _Number_Type
+
+
+def test_binary_operator_dispatch():
+    calls = []
+
+    def add(left, right):
+        calls.append((left, right))
+        return _Number(left.value + right.value)
+
+    _Number_Type._members["_+_"] = NativeFunction(add)
+
+    state = State()
+    interpreter = Interpreter(state=state)
+    one, two = _Number(1), _Number(2)
+
+    assert interpreter.execute_binary("+", one, two).value == 3
+    assert interpreter.execute_binary("+", two, two).value == 4
+    assert calls == [(one, two), (two, two)]
+
+    # changing the type is picked up by the dispatch cache
+    _Number_Type._members["_+_"] = NativeFunction(lambda left, right: _Number(left.value * 10 + right.value))
+    assert interpreter.execute_binary("+", one, two).value == 12
+
+    assert interpreter.execute_binary("-", one, two) is None
+    assert [str(message.content) for message in state.messages] == [f"Type \"{_Number_Type}\" does not define the \"-\" operator"]
+
+
+def test_binary_cache_survives_unrelated_types():
+    calls = []
+
+    def add(left, right):
+        calls.append("add")
+        return _Number(left.value + right.value)
+
+    typ = Type(None, {"_+_": NativeFunction(add)})
+
+    class Number(_Number):
+        @property
+        def runtime_type(self):
+            return typ
+
+    interpreter = Interpreter(state=State())
+    one, two = Number(1), Number(2)
+
+    assert interpreter.execute_binary("+", one, two).value == 3
+    implementation = interpreter._binary_cache[typ, typ, "+"]
+
+    Type(None)._members["_+_"] = NativeFunction(add)
+    assert interpreter.execute_binary("+", one, two).value == 3
+    assert interpreter._binary_cache[typ, typ, "+"] is implementation
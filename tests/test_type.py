@@ -0,0 +1,57 @@
+import pickle
+
+from zs.base import Type
+from zs.std import String
+
+
+def test_member_lookup_through_bases():
+    base = Type(None, {"a": 1, "b": 2})
+    derived = Type(base, {"b": 3})
+
+    assert derived.get("a") == 1
+    assert derived.get("b") == 3
+    assert derived.get(String("b")) == 3
+    assert derived.get("missing") is None
+
+
+def test_member_tables_follow_mutations():
+    base = Type(None, {"a": 1})
+    derived = Type(base)
+
+    assert derived.get("a") == 1
+
+    base._members["a"] = 2
+    base._members["c"] = 4
+    assert derived.get("a") == 2 and derived.get("c") == 4
+
+    derived._members["a"] = 3
+    assert derived.get("a") == 3 and base.get("a") == 2
+
+    del derived._members["a"]
+    assert derived.get("a") == 2
+
+
+def test_pickled_type_rebuilds_its_table():
+    typ = Type(None, {"a": 1})
+    assert typ.get("a") == 1
+
+    restored = pickle.loads(pickle.dumps(typ))
+    restored._members["a"] = 2
+    assert restored.get("a") == 2 and typ.get("a") == 1
+
+
+def test_unrelated_mutations_keep_the_table():
+    base = Type(None, {"a": 1})
+    derived = Type(base)
+    unrelated = Type(None, {"a": 1})
+
+    assert derived.get("a") == 1
+    table, version = derived._table, derived.version
+
+    unrelated._members["a"] = 2
+    assert derived.get("a") == 1
+    assert derived._table is table and derived.version == version
+
+    base._members["a"] = 3
+    assert derived.get("a") == 3
+    assert derived._table is not table and derived.version != version